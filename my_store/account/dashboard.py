@@ -0,0 +1,180 @@
+"""
+Statistiques du tableau de bord : une requête d'agrégats conditionnels
+(Count / Sum avec filter=Q(...)) par table, soit un nombre fixe de requêtes
+quel que soit le volume des registres.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+ZERO = Value(Decimal('0.00'), output_field=DecimalField(max_digits=12, decimal_places=2))
+BALANCE_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _float(value):
+    return float(value or 0)
+
+
+def _balances(rows):
+    """
+    Répartit des soldes par personne : ce qu'on nous doit (soldes positifs),
+    ce qu'on doit (soldes négatifs, en valeur absolue) et le nombre de chacun.
+    """
+    a_recevoir = a_payer = Decimal('0.00')
+    debiteurs = crediteurs = 0
+    for solde in rows:
+        solde = solde or Decimal('0.00')
+        if solde > 0:
+            a_recevoir += solde
+            debiteurs += 1
+        elif solde < 0:
+            a_payer -= solde
+            crediteurs += 1
+    return {
+        'a_recevoir': float(a_recevoir),
+        'a_payer': float(a_payer),
+        'solde': float(a_recevoir - a_payer),
+        'debiteurs': debiteurs,
+        'crediteurs': crediteurs,
+    }
+
+
+def product_stats():
+    from products.models import Product
+    return Product.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        low_stock=Count('id', filter=Q(is_active=True, stock__lt=10)),
+    )
+
+
+def order_stats(since):
+    from orders.models import Order
+    stats = Order.objects.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='pending')),
+        completed=Count('id', filter=Q(status='delivered')),
+        recent=Count('id', filter=Q(created_at__gte=since)),
+        revenue=Sum('total_amount', filter=Q(status__in=['delivered', 'shipped'])),
+    )
+    revenue = stats.pop('revenue')
+    return stats, {'total': _float(revenue)}
+
+
+def customer_stats(since):
+    from customers.models import Customer
+    return Customer.objects.aggregate(
+        total=Count('id'),
+        recent=Count('id', filter=Q(created_at__gte=since)),
+    )
+
+
+def stock_stats_by_magasin():
+    """Stock disponible par magasin, lu dans les soldes matérialisés (StockBalance)"""
+    from stock.models import StockEntry, StockBalance
+    rows = (
+        StockBalance.objects.order_by()
+        .values('numero_magasin')
+        .annotate(nombre_sacs=Sum('nombre_sacs'), tonnage=Sum('tonnage'))
+    )
+    by_code = {row['numero_magasin']: row for row in rows}
+    par_magasin = {}
+    for code, nom in StockEntry.MAGASIN_CHOICES:
+        row = by_code.get(code, {})
+        par_magasin[nom] = {
+            'nombre_sacs': row.get('nombre_sacs') or 0,
+            'tonnage': _float(row.get('tonnage')),
+        }
+    return {
+        'total_sacs': sum(values['nombre_sacs'] for values in par_magasin.values()),
+        'total_tonnage': sum(values['tonnage'] for values in par_magasin.values()),
+        'par_magasin': par_magasin,
+    }
+
+
+def client_receivables():
+    """
+    Créances clients : le solde d'un client est la dernière somme restante de
+    son registre, c'est-à-dire la somme de (somme_totale - avance) sur toutes
+    ses lignes (voir customers.ledger), calculée ici en un GROUP BY.
+    """
+    from customers.models import ClientChargement
+    soldes = (
+        ClientChargement.objects.order_by()
+        .values('client_id')
+        .annotate(solde=Sum(Coalesce('somme_totale', ZERO) - Coalesce('avance', ZERO), output_field=BALANCE_FIELD))
+        .values_list('solde', flat=True)
+    )
+    return _balances(soldes)
+
+
+def employee_balances():
+    """
+    Soldes des employés (somme remise - somme dépensée, voir employees.ledger).
+    Le tableau de bord est partagé par tous les utilisateurs : les tableaux
+    privés ou désactivés n'y sont pas comptés.
+    """
+    from employees.models import EmployeeExpense
+    soldes = (
+        EmployeeExpense.objects.filter(employee__is_private=False, employee__is_active=True)
+        .order_by()
+        .values('employee_id')
+        .annotate(solde=Sum(Coalesce('somme_remise', ZERO) - Coalesce('somme_depense', ZERO), output_field=BALANCE_FIELD))
+        .values_list('solde', flat=True)
+    )
+    return _balances(soldes)
+
+
+def expense_stats(month_start):
+    from expenses.models import Depense
+    stats = Depense.objects.aggregate(
+        total=Sum('somme'),
+        month_total=Sum('somme', filter=Q(date__gte=month_start)),
+        month_count=Count('id', filter=Q(date__gte=month_start)),
+    )
+    return {
+        'total': _float(stats['total']),
+        'mois': {'total': _float(stats['month_total']), 'nombre': stats['month_count']},
+    }
+
+
+def argent_stats(month_start):
+    from argent.models import ArgentEntry
+    stats = ArgentEntry.objects.aggregate(
+        entrees=Sum('somme'),
+        sorties=Sum('somme_sortie'),
+        month_entrees=Sum('somme', filter=Q(date__gte=month_start)),
+        month_sorties=Sum('somme_sortie', filter=Q(date_sortie__gte=month_start)),
+    )
+    entrees, sorties = _float(stats['entrees']), _float(stats['sorties'])
+    return {
+        'entrees': entrees,
+        'sorties': sorties,
+        'solde': entrees - sorties,
+        'mois': {'entrees': _float(stats['month_entrees']), 'sorties': _float(stats['month_sorties'])},
+    }
+
+
+def dashboard_stats(today):
+    """
+    Toutes les statistiques du tableau de bord pour la date `today`
+    (8 requêtes : une par table). Les compteurs "récents" portent sur les
+    30 derniers jours à partir de minuit, ceux "du mois" sur le mois en cours.
+    """
+    since = timezone.make_aware(datetime.combine(today - timedelta(days=30), time.min))
+    month_start = today.replace(day=1)
+    orders, revenue = order_stats(since)
+    return {
+        'products': product_stats(),
+        'orders': orders,
+        'customers': customer_stats(since),
+        'revenue': revenue,
+        'stock': stock_stats_by_magasin(),
+        'clients': client_receivables(),
+        'employes': employee_balances(),
+        'depenses': expense_stats(month_start),
+        'argent': argent_stats(month_start),
+    }
@@ -0,0 +1,437 @@
+import gc
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+from importlib import import_module
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from my_store.derived import derive
+
+
+# Volumes à l'échelle 1.0 (--scale) ; lignes enfants par parent entre parenthèses
+VOLUMES = {
+    'customers': 2_000,
+    'employees': 100,
+    'products': 200,
+    'stock_entries': 500_000,
+    'camions': 20_000,             # (2 lots de stock chacun)
+    'client_chargements': 200_000,
+    'employee_expenses': 50_000,
+    'depenses': 100_000,
+    'argent': 20_000,
+    'transiteur': 20_000,
+    'entrees_achat': 50_000,       # (5 achats chacune)
+    'orders': 10_000,              # (3 lignes chacune)
+    'sales': 10_000,               # (3 lignes chacune)
+    'invoices': 5_000,             # (3 lignes chacune)
+}
+
+# Applications dont le routeur DRF est parcouru pour trouver les endpoints
+API_APPS = [
+    'stock', 'customers', 'employees', 'expenses', 'argent', 'transiteur',
+    'purchases', 'products', 'orders', 'sales', 'invoices',
+]
+
+# Paramètres requis par certaines actions
+ACTION_PARAMS = {
+    'transactions_magasin': {'magasin': '1'},
+}
+
+# Endpoints hors routeur : (nom, URL, paramètres)
+EXTRA_ENDPOINTS = [
+    ('dashboard-stats', '/api/dashboard/stats/', {}),
+    ('employee-expense-list-solde', '/api/employee-expenses/', {'solde': 'calcule'}),
+]
+
+DENREES = ['Maïs', 'Soja', 'Karité', 'Anacarde', 'Sésame', 'Riz']
+VILLES = ['Bobo-Dioulasso', 'Ouagadougou', 'Banfora', 'Koudougou', 'Dédougou']
+BATCH_SIZE = 2000
+
+
+class _Rollback(Exception):
+    """Annule les données synthétiques une fois les mesures prises"""
+
+
+class SyntheticData:
+    """
+    Génère des volumes réalistes pour toutes les applications : dates étalées
+    sur deux ans, plusieurs magasins, denrées, clients et fournisseurs,
+    champs dérivés cohérents (tonnage, sommes), soldes recalculés à la fin.
+    Reproductible (graine fixe) ; insertion par bulk_create, après calcul des
+    champs dérivés par my_store.derived comme pour save() (tonnages en kg).
+    """
+
+    def __init__(self, scale, user, stdout):
+        self.scale = scale
+        self.user = user
+        self.stdout = stdout
+        self.random = random.Random(42)
+        self.today = date.today()
+
+    def count(self, name, minimum=5):
+        return max(minimum, int(VOLUMES[name] * self.scale))
+
+    def day(self):
+        return self.today - timedelta(days=self.random.randint(0, 730))
+
+    def money(self, low, high):
+        return Decimal(self.random.randint(low, high))
+
+    def bulk(self, model, rows):
+        """Insère un itérable de lignes par lots ; retourne les IDs créés"""
+        ids, batch = [], []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                ids += [obj.pk for obj in model.objects.bulk_create(derive(batch))]
+                batch = []
+        if batch:
+            ids += [obj.pk for obj in model.objects.bulk_create(derive(batch))]
+        self.stdout.write(f"  {model._meta.label:<28} {len(ids):>9} lignes")
+        return ids
+
+    def seed(self):
+        from argent.models import ArgentEntry
+        from customers.ledger import rebalance_clients
+        from customers.models import Customer, ClientChargement
+        from employees.ledger import rebalance_employee
+        from employees.models import Employee, EmployeeExpense
+        from expenses.models import Depense
+        from invoices.models import Invoice, InvoiceItem
+        from orders.models import Order, OrderItem
+        from products.models import Category, Product
+        from purchases.models import EntreeAchat, Achat
+        from sales.models import Sale, SaleItem
+        from stock.balances import rebuild_balances
+        from stock.models import StockEntry, CamionChargement, ChargementStockItem
+        from transiteur.models import TransiteurEntry
+
+        rnd, user = self.random, self.user
+        magasins = [code for code, _ in StockEntry.MAGASIN_CHOICES]
+
+        customers = self.bulk(Customer, (
+            Customer(first_name=f"Client{i}", last_name="Test", phone="", address="", city=rnd.choice(VILLES),
+                     postal_code="", country="")
+            for i in range(self.count('customers'))
+        ))
+        employees = self.bulk(Employee, (
+            Employee(first_name=f"Employé{i}", last_name="Test", phone="", address="", city="", postal_code="",
+                     country="", created_by=user)
+            for i in range(self.count('employees'))
+        ))
+        categories = self.bulk(Category, (Category(name=f"Catégorie {i}", description="") for i in range(10)))
+        products = self.bulk(Product, (
+            Product(name=f"Produit {i}", description="", price=self.money(500, 50000),
+                    category_id=rnd.choice(categories), created_by=user)
+            for i in range(self.count('products'))
+        ))
+
+        def stock_entry():
+            sacs, poids = rnd.randint(10, 400), rnd.choice([Decimal('80.00'), Decimal('100.00')])
+            return StockEntry(
+                date=self.day(), type_operation='entree' if rnd.random() < 0.8 else 'sortie',
+                nom_fournisseur=f"Fournisseur {rnd.randint(1, 200)}", type_denree=rnd.choice(DENREES),
+                nombre_sacs=sacs, poids_par_sac=poids,
+                numero_magasin=rnd.choice(magasins), notes="", created_by=user,
+            )
+        stock_entries = self.bulk(StockEntry, (stock_entry() for _ in range(self.count('stock_entries'))))
+
+        def camion():
+            sacs = rnd.randint(100, 600)
+            return CamionChargement(
+                date_chargement=self.day(), ville_depart=rnd.choice(VILLES), type_denree=rnd.choice(DENREES),
+                nombre_sacs=sacs, poids_par_sac=Decimal('80.00'), tonnage_total=Decimal('0.00'),
+                numero_camion=f"11 GN {rnd.randint(1000, 9999)}", numero_chauffeur="70000000",
+                proprietaire="Transport", numero_magasin=rnd.choice(magasins), destination=rnd.choice(VILLES),
+                chauffeur=f"Chauffeur {rnd.randint(1, 50)}", notes="", created_by=user,
+            )
+        camions = self.bulk(CamionChargement, (camion() for _ in range(self.count('camions'))))
+        self.bulk(ChargementStockItem, (
+            ChargementStockItem(chargement_id=camion_id, stock_entry_id=entry_id, nombre_sacs_utilises=rnd.randint(1, 50))
+            for camion_id in camions
+            for entry_id in rnd.sample(stock_entries, min(2, len(stock_entries)))
+        ))
+
+        def client_chargement():
+            operation = rnd.choices(['produit', 'avance', 'reglement'], [6, 3, 1])[0]
+            if operation == 'produit':
+                return ClientChargement(
+                    date_chargement=self.day(), client_id=rnd.choice(customers), type_operation=operation,
+                    nom_produit=rnd.choice(DENREES), nombre_sacs=rnd.randint(10, 300), poids=Decimal('80.00'),
+                    prix=self.money(150, 400), notes="", created_by=user,
+                )
+            return ClientChargement(
+                date_chargement=self.day(), client_id=rnd.choice(customers), type_operation=operation,
+                avance=self.money(10000, 2000000), notes="", created_by=user,
+            )
+        self.bulk(ClientChargement, (client_chargement() for _ in range(self.count('client_chargements'))))
+
+        def employee_expense():
+            tonnage, prix = self.money(1, 50), self.money(100, 500)
+            return EmployeeExpense(
+                date=self.day(), employee_id=rnd.choice(employees), somme_remise=self.money(0, 500000),
+                nom_depense=rnd.choice(['Carburant', 'Ration', 'Réparation', 'Achat']), tonnage=tonnage,
+                prix=prix, somme_depense=tonnage * prix, notes="", created_by=user,
+            )
+        self.bulk(EmployeeExpense, (employee_expense() for _ in range(self.count('employee_expenses'))))
+
+        self.bulk(Depense, (
+            Depense(date=self.day(), nom_personne=f"Personne {rnd.randint(1, 100)}",
+                    nom_depense=rnd.choice(['Carburant', 'Loyer', 'Salaire', 'Manutention', 'Divers']),
+                    somme=self.money(1000, 500000), notes="", created_by=user)
+            for _ in range(self.count('depenses'))
+        ))
+        self.bulk(ArgentEntry, (
+            ArgentEntry(date=self.day(), nom_recuperant=f"Agent {rnd.randint(1, 20)}", nom_boss="Boss",
+                        lieu_retrait=rnd.choice(VILLES), somme=self.money(10000, 5000000), created_by=user)
+            for _ in range(self.count('argent'))
+        ))
+        self.bulk(TransiteurEntry, (
+            TransiteurEntry(date=self.day(), nom_produit=rnd.choice(DENREES), ville_depart=rnd.choice(VILLES),
+                            ville_arrivant=rnd.choice(VILLES), depenses=self.money(10000, 300000),
+                            argent_donne=self.money(10000, 500000), created_by=user)
+            for _ in range(self.count('transiteur'))
+        ))
+
+        nb_entrees = self.count('entrees_achat')
+        entrees = self.bulk(EntreeAchat, (
+            EntreeAchat(numero_entree=str(i + 1), date=self.day(), client_id=rnd.choice(customers),
+                        nom_client="", transport=self.money(0, 50000), created_by=user)
+            for i in range(nb_entrees)
+        ))
+
+        def achat(entree_id):
+            return Achat(
+                entree_id=entree_id, date=self.day(), client_id=rnd.choice(customers), nom_client="",
+                produit_id=rnd.choice(products), nom_produit="", quantite_kg=self.money(50, 5000),
+                prix_unitaire=self.money(150, 400), notes="", created_by=user,
+            )
+        self.bulk(Achat, (achat(entree_id) for entree_id in entrees for _ in range(5)))
+
+        orders = self.bulk(Order, (
+            Order(customer_id=rnd.choice(customers), order_number=f"BENCH-{i:08d}",
+                  total_amount=self.money(1000, 100000), created_by=user)
+            for i in range(self.count('orders'))
+        ))
+        self.bulk(OrderItem, (
+            OrderItem(order_id=order_id, product_id=rnd.choice(products), quantity=rnd.randint(1, 10),
+                      price=self.money(500, 50000))
+            for order_id in orders for _ in range(3)
+        ))
+        sales = self.bulk(Sale, (
+            Sale(customer_id=rnd.choice(customers), total_amount=self.money(1000, 100000), notes="", created_by=user)
+            for _ in range(self.count('sales'))
+        ))
+        self.bulk(SaleItem, (
+            SaleItem(sale_id=sale_id, product_id=rnd.choice(products), quantity=rnd.randint(1, 10),
+                     unit_price=self.money(500, 50000))
+            for sale_id in sales for _ in range(3)
+        ))
+        invoices = self.bulk(Invoice, (
+            Invoice(invoice_number=f"BENCH-{i:08d}", customer_id=rnd.choice(customers), issue_date=self.day(),
+                    due_date=self.today, total_amount=self.money(1000, 100000), notes="", created_by=user)
+            for i in range(self.count('invoices'))
+        ))
+        self.bulk(InvoiceItem, (
+            InvoiceItem(invoice_id=invoice_id, description="Ligne", quantity=rnd.randint(1, 10),
+                        unit_price=self.money(500, 50000))
+            for invoice_id in invoices for _ in range(3)
+        ))
+
+        # Champs dérivés maintenus d'habitude par save() : soldes et stock courant
+        rebuild_balances()
+        rebalance_clients(customers)
+        for employee_id in employees:
+            rebalance_employee(employee_id)
+
+
+def discover_endpoints():
+    """
+    Liste (nom, URL, paramètres) de tous les endpoints GET des routeurs :
+    liste complète, première page paginée, détail (dernière ligne) et
+    actions de collection (stats, exports...), plus EXTRA_ENDPOINTS.
+    """
+    endpoints = []
+    for app in API_APPS:
+        router = import_module(f'{app}.urls').router
+        for prefix, viewset, basename in router.registry:
+            base = f'/api/{prefix}/'
+            endpoints.append((f'{basename}-list', base, {}))
+            endpoints.append((f'{basename}-list-page', base, {'page_size': 100}))
+            pk = viewset.queryset.model.objects.order_by('-pk').values_list('pk', flat=True).first()
+            if pk is not None:
+                endpoints.append((f'{basename}-detail', f'{base}{pk}/', {}))
+            for extra in viewset.get_extra_actions():
+                if extra.detail or 'get' not in extra.mapping:
+                    continue
+                endpoints.append(
+                    (f'{basename}-{extra.url_path}', f'{base}{extra.url_path}/', ACTION_PARAMS.get(extra.url_path, {}))
+                )
+    return endpoints + EXTRA_ENDPOINTS
+
+
+def without_aggregate_cache():
+    """CACHES avec le cache des agrégats (caching.cache) remplacé par un cache factice"""
+    alias = getattr(settings, 'AGGREGATE_CACHE_ALIAS', 'aggregates')
+    return {**settings.CACHES, alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def measure(client, url, params, repeat):
+    """Nombre de requêtes SQL, latences (ms) et pic mémoire (Ko) d'un endpoint"""
+    def call():
+        response = client.get(url, params)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        else:
+            response.content
+        return response
+
+    response = call()  # préchauffage
+    if response.status_code != 200:
+        raise CommandError(f"{url} {params or ''} a répondu {response.status_code}")
+
+    timings, queries = [], 0
+    for _ in range(repeat):
+        # Le ramasse-miettes provoque des pauses aléatoires : hors de la mesure
+        gc.collect()
+        gc.disable()
+        try:
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                call()
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            gc.enable()
+        queries = max(queries, len(ctx.captured_queries))
+
+    # Pic mémoire mesuré à part : tracemalloc ralentit l'exécution
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'queries': queries,
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def regressions(name, current, baseline, threshold, min_delta_ms, min_delta_kb):
+    """
+    Liste des régressions d'un endpoint par rapport à la référence : toute
+    requête SQL en plus, ou latence médiane / pic mémoire au-delà du seuil
+    (la médiane est retenue car le p95 sur quelques appels est trop bruité).
+    """
+    problems = []
+    if current['queries'] > baseline['queries']:
+        problems.append(f"{name}: requêtes {baseline['queries']} -> {current['queries']}")
+    for key, min_delta in (('p50_ms', min_delta_ms), ('peak_kb', min_delta_kb)):
+        before, after = baseline[key], current[key]
+        if after > before * (1 + threshold) and after - before > min_delta:
+            problems.append(f"{name}: {key} {before} -> {after} (+{(after / before - 1) * 100 if before else 100:.0f} %)")
+    return problems
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de l'API REST : génère des volumes synthétiques réalistes pour toutes "
+        "les applications, appelle chaque endpoint de liste, détail, stats et export et "
+        "mesure requêtes SQL, latence p50/p95 et pic mémoire. Compare à une référence JSON "
+        "et échoue en cas de régression. Fonctionne sur SQLite et PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=0.01,
+                            help="Facteur appliqué aux volumes (1.0 = 500k entrées de stock, 200k chargements...)")
+        parser.add_argument('--repeat', type=int, default=7, help="Nombre d'appels mesurés par endpoint")
+        parser.add_argument('--baseline', default=str(Path(settings.BASE_DIR) / 'benchmarks' / 'api_baseline.json'),
+                            help="Fichier JSON de référence")
+        parser.add_argument('--save-baseline', action='store_true',
+                            help="Enregistre les résultats comme nouvelle référence au lieu de comparer")
+        parser.add_argument('--threshold', type=float, default=0.5,
+                            help="Dégradation relative tolérée pour la latence médiane et la mémoire (0.5 = 50 %%)")
+        parser.add_argument('--min-delta-ms', type=float, default=10.0,
+                            help="Écart absolu de latence ignoré (bruit de mesure)")
+        parser.add_argument('--min-delta-kb', type=float, default=256.0,
+                            help="Écart absolu de mémoire ignoré")
+        parser.add_argument('--only', help="Ne mesurer que les endpoints dont le nom contient ce texte")
+        parser.add_argument('--keep', action='store_true', help="Conserver les données générées")
+        parser.add_argument('--no-seed', action='store_true', help="Utiliser les données déjà en base")
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        results = {}
+        try:
+            with transaction.atomic():
+                user, _ = get_user_model().objects.get_or_create(
+                    username='benchmark_api', defaults={'is_superuser': True, 'is_staff': True}
+                )
+                if not options['no_seed']:
+                    self.stdout.write(f"Génération des données (échelle {options['scale']})...")
+                    start = time.perf_counter()
+                    SyntheticData(options['scale'], user, self.stdout).seed()
+                    self.stdout.write(f"Données générées en {time.perf_counter() - start:.1f}s")
+
+                client = APIClient()
+                client.force_authenticate(user)
+                # Cache des agrégats désactivé : après le préchauffage, les stats et
+                # le tableau de bord seraient servis par le cache sans requête SQL
+                with override_settings(CACHES=without_aggregate_cache()):
+                    for name, url, params in discover_endpoints():
+                        if options['only'] and options['only'] not in name:
+                            continue
+                        results[name] = measure(client, url, params, options['repeat'])
+                        r = results[name]
+                        self.stdout.write(
+                            f"{name:<42} {r['queries']:>4} req  p50 {r['p50_ms']:>9.1f} ms  "
+                            f"p95 {r['p95_ms']:>9.1f} ms  pic {r['peak_kb']:>10.0f} Ko"
+                        )
+
+                if not options['keep']:
+                    raise _Rollback()
+        except _Rollback:
+            pass
+
+        self.compare_or_save(results, options)
+
+    def compare_or_save(self, results, options):
+        # Une référence par moteur et par échelle : les chiffres ne sont pas comparables entre eux
+        key = f"{connection.vendor}:scale={options['scale']}"
+        path = Path(options['baseline'])
+        baselines = json.loads(path.read_text()) if path.exists() else {}
+
+        if options['save_baseline']:
+            baselines.setdefault(key, {}).update(results)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(baselines, indent=2, sort_keys=True))
+            self.stdout.write(self.style.SUCCESS(f"Référence '{key}' enregistrée dans {path}"))
+            return
+
+        baseline = baselines.get(key)
+        if not baseline:
+            # Sans référence, le contrôle de régression ne vérifierait rien
+            raise CommandError(f"Pas de référence '{key}' dans {path} : relancer avec --save-baseline")
+
+        problems = []
+        for name, current in results.items():
+            if name in baseline:
+                problems += regressions(name, current, baseline[name], options['threshold'],
+                                        options['min_delta_ms'], options['min_delta_kb'])
+        if problems:
+            raise CommandError("Régressions détectées :\n  " + "\n  ".join(problems))
+        self.stdout.write(self.style.SUCCESS(f"Aucune régression par rapport à la référence '{key}'"))
@@ -0,0 +1,188 @@
+import re
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+
+class _Rollback(Exception):
+    """Annule la transaction de benchmark une fois les mesures prises"""
+
+
+# Modèles dont les Meta.indexes sont retirés pour la mesure "avant"
+INDEXED_MODELS = [
+    'stock.StockEntry',
+    'stock.CamionChargement',
+    'customers.ClientChargement',
+    'employees.EmployeeExpense',
+    'expenses.Depense',
+    'argent.ArgentEntry',
+    'transiteur.TransiteurEntry',
+    'purchases.EntreeAchat',
+    'purchases.Achat',
+]
+
+
+def _queries(ids):
+    """
+    Requêtes représentatives des listes (mêmes filtres et tris que les
+    get_queryset des ViewSets, première page de 50 lignes).
+    """
+    from argent.models import ArgentEntry
+    from customers.models import ClientChargement
+    from employees.models import EmployeeExpense
+    from expenses.models import Depense
+    from purchases.models import Achat, EntreeAchat
+    from stock.models import CamionChargement, StockEntry
+    from transiteur.models import TransiteurEntry
+
+    debut, fin = date.today() - timedelta(days=30), date.today()
+    return [
+        ("stock : liste par dates", StockEntry.objects.filter(date__range=(debut, fin))[:50]),
+        ("stock : magasin + denrée + opération", StockEntry.objects.filter(
+            numero_magasin='1', type_denree='Denrée 3', type_operation='entree')[:50]),
+        ("stock : transactions d'un magasin", StockEntry.objects.filter(numero_magasin='2')[:50]),
+        ("chargements camion : liste", CamionChargement.objects.all()[:50]),
+        ("client : registre par dates", ClientChargement.objects.filter(
+            client_id=ids['client'], date_chargement__range=(debut, fin))[:50]),
+        ("employé : registre par dates", EmployeeExpense.objects.filter(
+            employee_id=ids['employee'], date__range=(debut, fin))[:50]),
+        ("dépenses : liste par dates", Depense.objects.filter(date__range=(debut, fin))[:50]),
+        ("argent : dates, tri par ID", ArgentEntry.objects.filter(date__range=(debut, fin)).order_by('id')[:50]),
+        ("transiteur : dates, tri par ID", TransiteurEntry.objects.filter(date__range=(debut, fin)).order_by('id')[:50]),
+        ("achats d'une entrée", Achat.objects.filter(entree_id=ids['entree'])[:50]),
+        ("entrées d'achat : liste", EntreeAchat.objects.all()[:50]),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare les plans (EXPLAIN) et les temps des requêtes de liste avec et sans "
+        "les index Meta.indexes, sur des données générées (annulées à la fin)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help="Lignes générées par registre")
+        parser.add_argument('--repeat', type=int, default=20, help="Exécutions par requête (temps médian)")
+        parser.add_argument('--plans', action='store_true', help="Affiche les plans complets")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                ids = self.seed(options['rows'])
+                after = self.measure(ids, options['repeat'])
+                self.drop_indexes()
+                before = self.measure(ids, options['repeat'])
+                self.report(before, after, options['plans'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def seed(self, rows):
+        from argent.models import ArgentEntry
+        from customers.models import ClientChargement, Customer
+        from employees.models import Employee, EmployeeExpense
+        from expenses.models import Depense
+        from purchases.models import Achat, EntreeAchat
+        from stock.models import CamionChargement, StockEntry
+        from transiteur.models import TransiteurEntry
+
+        # bulk_create : pas de save() (soldes, numéros), seules les lignes comptent ici
+        jour = lambda i: date.today() - timedelta(days=i % 730)
+        magasins = ['1', '2', '3']
+        clients = Customer.objects.bulk_create([
+            Customer(first_name=f"Client {i}", last_name="Bench", email=f"bench{i}@example.com") for i in range(50)
+        ])
+        employees = Employee.objects.bulk_create([
+            Employee(first_name=f"Employé {i}", last_name="Bench", email=f"bench{i}@example.com") for i in range(50)
+        ])
+        entrees = EntreeAchat.objects.bulk_create([
+            EntreeAchat(numero_entree=f"B{i:07d}", date=jour(i), nom_client=f"Client {i % 50}") for i in range(rows // 10)
+        ], batch_size=1000)
+
+        StockEntry.objects.bulk_create([
+            StockEntry(
+                date=jour(i), type_operation='entree' if i % 3 else 'sortie', numero_magasin=magasins[i % 3],
+                type_denree=f"Denrée {i % 20}", nombre_sacs=10, poids_par_sac=Decimal('80.00'),
+                tonnage_total=Decimal('800.00'),
+            ) for i in range(rows)
+        ], batch_size=1000)
+        CamionChargement.objects.bulk_create([
+            CamionChargement(date_chargement=jour(i), numero_magasin=magasins[i % 3], type_denree=f"Denrée {i % 20}")
+            for i in range(rows)
+        ], batch_size=1000)
+        ClientChargement.objects.bulk_create([
+            ClientChargement(client=clients[i % 50], date_chargement=jour(i), somme_totale=Decimal('1000.00'))
+            for i in range(rows)
+        ], batch_size=1000)
+        EmployeeExpense.objects.bulk_create([
+            EmployeeExpense(employee=employees[i % 50], date=jour(i), somme_remise=Decimal('500.00'))
+            for i in range(rows)
+        ], batch_size=1000)
+        Depense.objects.bulk_create([
+            Depense(date=jour(i), nom_depense=f"Dépense {i}", somme=Decimal('100.00')) for i in range(rows)
+        ], batch_size=1000)
+        ArgentEntry.objects.bulk_create([
+            ArgentEntry(date=jour(i), somme=Decimal('100.00')) for i in range(rows)
+        ], batch_size=1000)
+        TransiteurEntry.objects.bulk_create([
+            TransiteurEntry(date=jour(i), argent_donne=Decimal('100.00')) for i in range(rows)
+        ], batch_size=1000)
+        Achat.objects.bulk_create([
+            Achat(
+                entree=entrees[i % len(entrees)], date=jour(i), nom_client="Bench",
+                quantite_kg=Decimal('1.00'), prix_unitaire=Decimal('10.00'), somme_totale=Decimal('10.00'),
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+
+        with connection.cursor() as cursor:
+            # Statistiques à jour pour le planificateur
+            cursor.execute('ANALYZE')
+        return {'client': clients[7].pk, 'employee': employees[7].pk, 'entree': entrees[7].pk}
+
+    def drop_indexes(self):
+        # Seul le gabarit DROP INDEX du backend sert : la suppression reste dans
+        # la transaction du benchmark et est annulée avec elle
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for label in INDEXED_MODELS:
+                model = apps.get_model(label)
+                for index in model._meta.indexes:
+                    cursor.execute(editor.sql_delete_index % {
+                        'table': editor.quote_name(model._meta.db_table),
+                        'name': editor.quote_name(index.name),
+                    })
+            cursor.execute('ANALYZE')
+
+    def measure(self, ids, repeat):
+        results = {}
+        for label, queryset in _queries(ids):
+            plan = queryset.explain()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset._chain())
+                timings.append((time.perf_counter() - start) * 1000)
+            results[label] = (plan, statistics.median(timings))
+        return results
+
+    def report(self, before, after, full_plans):
+        names = {index.name for label in INDEXED_MODELS for index in apps.get_model(label)._meta.indexes}
+        for label, (plan_before, ms_before) in before.items():
+            plan_after, ms_after = after[label]
+            used = sorted(name for name in names if re.search(rf'\b{name}\b', plan_after))
+            changed = "plan modifié" if plan_before != plan_after else "plan identique"
+            self.stdout.write(
+                f"{label:<40} avant {ms_before:>8.2f} ms  après {ms_after:>8.2f} ms  "
+                f"{changed}  index : {', '.join(used) or '-'}"
+            )
+            if full_plans:
+                for title, plan in (("avant", plan_before), ("après", plan_after)):
+                    self.stdout.write(f"    {title} :")
+                    for line in plan.splitlines():
+                        self.stdout.write(f"      {line}")
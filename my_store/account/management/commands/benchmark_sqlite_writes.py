@@ -0,0 +1,177 @@
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+
+# Réglages comparés : SQLite par défaut (journal rollback, BEGIN DEFERRED,
+# attente de 5 s) puis réglages de production (settings.SQLITE_PRAGMAS)
+MODES = [
+    ('avant', {'SQLITE_TUNING': '0'}),
+    ('après', {'SQLITE_TUNING': '1'}),
+]
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le débit d'écriture concurrent sur SQLite avec les réglages par défaut, "
+        "puis avec WAL, busy_timeout, pragmas et BEGIN IMMEDIATE (SQLITE_TUNING). "
+        "Chaque mode tourne dans un processus séparé sur une copie d'une base migrée "
+        "dans un dossier temporaire : plusieurs agents enregistrent des sorties de "
+        "stock (lecture du disponible puis écriture, dans une transaction) pendant que "
+        "d'autres lisent les statistiques."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help="Threads d'écriture")
+        parser.add_argument('--readers', type=int, default=2, help="Threads de lecture")
+        parser.add_argument('--seconds', type=float, default=5.0, help="Durée de chaque mode")
+        # Exécution d'un mode dans le processus enfant (DATABASE_URL et SQLITE_TUNING fixés)
+        parser.add_argument('--run-mode', action='store_true', help="Usage interne")
+
+    def handle(self, *args, **options):
+        if options['run_mode']:
+            self.stdout.write(json.dumps(self.run_mode(options)))
+            return
+
+        manage = os.path.join(settings.BASE_DIR, 'manage.py')
+        with tempfile.TemporaryDirectory() as directory:
+            template = os.path.join(directory, 'modele.sqlite3')
+            self.stdout.write("Préparation de la base (migrate)...")
+            self.child(manage, template, {'SQLITE_TUNING': '0'}, ['migrate', '-v0'])
+
+            results = []
+            for label, env in MODES:
+                path = os.path.join(directory, f'{label}.sqlite3')
+                shutil.copyfile(template, path)
+                output = self.child(manage, path, env, [
+                    'benchmark_sqlite_writes', '--run-mode',
+                    '--writers', str(options['writers']),
+                    '--readers', str(options['readers']),
+                    '--seconds', str(options['seconds']),
+                ])
+                results.append((label, json.loads(output.strip().splitlines()[-1])))
+
+        self.stdout.write(
+            f"\n{options['writers']} écrivains, {options['readers']} lecteurs, {options['seconds']:g} s par mode\n"
+        )
+        self.stdout.write(
+            f"{'Mode':<8} {'journal':<8} {'écritures/s':>12} {'verrouillées':>13} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'max ms':>8} {'lectures/s':>11}"
+        )
+        for label, result in results:
+            self.stdout.write(
+                f"{label:<8} {result['journal_mode']:<8} {result['writes_per_second']:>12.0f} "
+                f"{result['locked']:>13} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+                f"{result['max_ms']:>8.1f} {result['reads_per_second']:>11.0f}"
+            )
+        before, after = results[0][1], results[-1][1]
+        if before['writes_per_second']:
+            ratio = after['writes_per_second'] / before['writes_per_second']
+            self.stdout.write(self.style.SUCCESS(f"\nDébit d'écriture : x{ratio:.1f}"))
+        if after['locked']:
+            raise CommandError(f"{after['locked']} écriture(s) en échec 'database is locked' avec les réglages")
+
+    def child(self, manage, path, env, arguments):
+        """Lance manage.py sur la base `path` avec les variables `env`"""
+        environment = {**os.environ, **env, 'DATABASE_URL': f'sqlite:///{path}'}
+        environment.pop('DATABASE_REPLICA_URL', None)
+        completed = subprocess.run(
+            [sys.executable, manage, *arguments], env=environment, capture_output=True, text=True
+        )
+        if completed.returncode:
+            raise CommandError(completed.stderr.strip() or completed.stdout.strip())
+        return completed.stdout
+
+    def run_mode(self, options):
+        from stock.balances import available_sacs
+        from stock.models import StockEntry
+
+        # Stock initial : chaque agent sort 1 sac à la fois d'un lot suffisant
+        StockEntry.objects.create(
+            date=date.today(), type_operation='entree', type_denree='Banc', numero_magasin='1',
+            nombre_sacs=10 ** 6, poids_par_sac='50.00',
+        )
+        journal_mode = connection.cursor().execute('PRAGMA journal_mode').fetchone()[0]
+        connection.close()
+
+        deadline = time.monotonic() + options['seconds']
+        latencies, locked, reads = [], [0], [0]
+        lock = threading.Lock()
+
+        def writer(index):
+            own_latencies, own_locked = [], 0
+            try:
+                while time.monotonic() < deadline:
+                    started = time.monotonic()
+                    try:
+                        # Même enchaînement qu'une saisie de sortie : contrôle du
+                        # disponible puis écriture (solde mis à jour par signal)
+                        with transaction.atomic():
+                            if available_sacs('Banc', '1') < 1:
+                                break
+                            StockEntry.objects.create(
+                                date=date.today(), type_operation='sortie', type_denree='Banc',
+                                numero_magasin='1', nombre_sacs=1, poids_par_sac='50.00',
+                                nom_fournisseur=f'Agent {index}',
+                            )
+                        own_latencies.append((time.monotonic() - started) * 1000)
+                    except OperationalError as exc:
+                        if 'locked' not in str(exc):
+                            raise
+                        own_locked += 1
+            finally:
+                connection.close()
+            with lock:
+                latencies.extend(own_latencies)
+                locked[0] += own_locked
+
+        def reader():
+            count = 0
+            try:
+                while time.monotonic() < deadline:
+                    try:
+                        StockEntry.objects.filter(numero_magasin='1').count()
+                        count += 1
+                    except OperationalError:
+                        pass
+            finally:
+                connection.close()
+            with lock:
+                reads[0] += count
+
+        threads = [threading.Thread(target=writer, args=(index,)) for index in range(options['writers'])]
+        threads += [threading.Thread(target=reader) for _ in range(options['readers'])]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.monotonic() - started
+
+        return {
+            'journal_mode': journal_mode,
+            'writes': len(latencies),
+            'writes_per_second': len(latencies) / duration,
+            'locked': locked[0],
+            'p50_ms': statistics.median(latencies) if latencies else 0.0,
+            'p95_ms': _percentile(latencies, 0.95),
+            'max_ms': max(latencies, default=0.0),
+            'reads_per_second': reads[0] / duration,
+        }
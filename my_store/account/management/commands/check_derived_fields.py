@@ -0,0 +1,128 @@
+import random
+from datetime import date
+from decimal import Decimal
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from my_store.derived import DERIVED_FIELDS, derive, derive_columns, derived_fields
+
+
+class _Rollback(Exception):
+    """Annule les lignes écrites pour la comparaison save() / bulk_create()"""
+
+
+def _amount(rng, high):
+    """Montant à 2 décimales entre 0 et `high`"""
+    return Decimal(rng.randint(0, high * 100)).scaleb(-2)
+
+
+def _maybe(rng, value, none_rate=0.15):
+    return None if rng.random() < none_rate else value
+
+
+# Générateurs de lignes par modèle : champs sources (avec valeurs nulles, zéros
+# et saisies manuelles) et champs obligatoires pour l'écriture en base
+GENERATORS = {
+    'stock.StockEntry': lambda rng: {
+        'date': date(2025, 1, 1), 'type_denree': 'Contrôle', 'numero_magasin': '1',
+        'nombre_sacs': rng.randint(0, 1000),
+        'poids_par_sac': _amount(rng, 1000),
+    },
+    'stock.CamionChargement': lambda rng: {
+        'date_chargement': date(2025, 1, 1), 'type_denree': 'Contrôle',
+        'nombre_sacs': rng.choice([0, rng.randint(1, 1000)]),
+        'poids_par_sac': rng.choice([Decimal('0.00'), _amount(rng, 1000)]),
+        'tonnage_total': rng.choice([Decimal('0.00'), Decimal('0.00'), _amount(rng, 100000)]),
+    },
+    # Toutes les lignes vont au même client : montants bornés pour que le solde
+    # cumulé (somme_restante) reste dans sa colonne
+    'customers.ClientChargement': lambda rng: {
+        'date_chargement': date(2025, 1, 1),
+        'nombre_sacs': _maybe(rng, rng.randint(0, 100)),
+        'poids': _maybe(rng, _amount(rng, 1000)),
+        'poids_sac_vide': _maybe(rng, rng.choice([Decimal('0.00'), _amount(rng, 2)]), 0.3),
+        'tonnage': _maybe(rng, _amount(rng, 100000), 0.8),
+        'prix': _maybe(rng, _amount(rng, 10)),
+        'somme_totale': _maybe(rng, _amount(rng, 1000000), 0.8),
+    },
+    'purchases.Achat': lambda rng: {
+        'date': date(2025, 1, 1), 'nom_produit': 'Contrôle',
+        'quantite_kg': _amount(rng, 100000),
+        'prix_unitaire': _amount(rng, 10000),
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Vérifie sur des lignes aléatoires (graine fixe) que les champs dérivés "
+        "(my_store.derived) sont identiques ligne par ligne, par lot, par colonnes, "
+        "et en base via save() ou bulk_create(). Échoue sinon. Données annulées à la fin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=500, help="Lignes générées par modèle")
+        parser.add_argument('--seed', type=int, default=0, help="Graine du générateur")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        failures = []
+        for label in DERIVED_FIELDS:
+            model = apps.get_model(label)
+            fields = derived_fields(label)
+            rows = [GENERATORS[label](rng) for _ in range(options['samples'])]
+
+            # Une ligne à la fois (comme save()) et tout le lot en une fois
+            single = [derive([model(**row)])[0] for row in rows]
+            batch = derive([model(**row) for row in rows])
+            columns = derive_columns(label, {name: [row.get(name) for row in rows] for name in rows[0]})
+            errors = 0
+            for index, (one, many) in enumerate(zip(single, batch)):
+                for field in fields:
+                    values = (getattr(one, field), getattr(many, field), columns[field][index])
+                    if len(set(values)) != 1:
+                        errors += 1
+                        failures.append(f"{label} ligne {index} {field} : unitaire/lot/colonnes = {values}")
+
+            # En base : save() ligne par ligne contre bulk_create du lot calculé
+            stored_single, stored_batch = self.stored(model, rows, fields)
+            for index, (one, many) in enumerate(zip(stored_single, stored_batch)):
+                if one != many:
+                    errors += 1
+                    failures.append(f"{label} ligne {index} : save() {one} / bulk_create() {many}")
+
+            status = self.style.SUCCESS('OK') if not errors else self.style.ERROR(f'{errors} écart(s)')
+            self.stdout.write(f"{label:<30} {len(rows)} lignes  {', '.join(fields)}  {status}")
+
+        if failures:
+            for failure in failures[:20]:
+                self.stdout.write(f"  {failure}")
+            raise CommandError(f"{len(failures)} écart(s) entre calcul unitaire et calcul par lot")
+
+    def stored(self, model, rows, fields):
+        """Valeurs relues en base après save() unitaire et après bulk_create() du lot"""
+        from customers.models import Customer
+
+        result = ([], [])
+        try:
+            with transaction.atomic():
+                extra = {}
+                if model._meta.label == 'customers.ClientChargement':
+                    extra['client'] = Customer.objects.create(
+                        first_name='Contrôle', last_name='Dérivés', email='derives@example.com'
+                    )
+                single = []
+                for row in rows:
+                    instance = model(**row, **extra)
+                    instance.save()
+                    single.append(instance.pk)
+                batch = model.objects.bulk_create(derive([model(**row, **extra) for row in rows]), batch_size=500)
+                for pks, values in zip((single, [instance.pk for instance in batch]), result):
+                    stored = model.objects.in_bulk(pks)
+                    values.extend(tuple(getattr(stored[pk], field) for field in fields) for pk in pks)
+                raise _Rollback()
+        except _Rollback:
+            pass
+        return result
@@ -0,0 +1,153 @@
+from datetime import date
+from decimal import Decimal
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+
+# Endpoints de liste vérifiés : (URL, modèle, [(modèle enfant, champ FK vers le parent)])
+LIST_ENDPOINTS = [
+    ('/api/stock-entries/', 'stock.StockEntry', []),
+    ('/api/camion-chargements/', 'stock.CamionChargement', [('stock.ChargementStockItem', 'chargement')]),
+    ('/api/customers/', 'customers.Customer', []),
+    ('/api/client-chargements/', 'customers.ClientChargement', []),
+    ('/api/employees/', 'employees.Employee', []),
+    ('/api/employee-expenses/', 'employees.EmployeeExpense', []),
+    ('/api/depenses/', 'expenses.Depense', []),
+    ('/api/period-stops/', 'expenses.PeriodStop', []),
+    ('/api/argent/', 'argent.ArgentEntry', []),
+    ('/api/transiteur/', 'transiteur.TransiteurEntry', []),
+    ('/api/entrees-achat/', 'purchases.EntreeAchat', [('purchases.Achat', 'entree')]),
+    ('/api/achats/', 'purchases.Achat', []),
+    ('/api/categories/', 'products.Category', []),
+    ('/api/products/', 'products.Product', []),
+    ('/api/orders/', 'orders.Order', [('orders.OrderItem', 'order')]),
+    ('/api/sales/', 'sales.Sale', [('sales.SaleItem', 'sale')]),
+    ('/api/invoices/', 'invoices.Invoice', [('invoices.InvoiceItem', 'invoice')]),
+]
+
+
+class _Rollback(Exception):
+    """Annule les données de test une fois les mesures prises"""
+
+
+class RowFactory:
+    """
+    Génère des lignes minimales valides pour n'importe quel modèle : chaque
+    champ obligatoire reçoit une valeur selon son type, et chaque clé
+    étrangère (même facultative) pointe vers un objet partagé, pour que
+    toute jointure manquante se traduise par une requête par ligne.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.shared = {get_user_model(): user}
+        self.counter = 0
+
+    def related(self, model):
+        if model not in self.shared:
+            self.shared[model] = self.create(model, 1)[0]
+        return self.shared[model]
+
+    def value(self, field):
+        self.counter += 1
+        if field.choices:
+            return field.choices[0][0]
+        if isinstance(field, models.EmailField):
+            return f'test{self.counter}@example.com'
+        if isinstance(field, (models.CharField, models.TextField)):
+            return f'{field.name}-{self.counter}'[:field.max_length or 50]
+        if isinstance(field, models.DecimalField):
+            return Decimal('1.00')
+        if isinstance(field, (models.IntegerField, models.FloatField)):
+            return self.counter
+        if isinstance(field, models.BooleanField):
+            return False
+        if isinstance(field, models.DateTimeField):
+            return timezone.now()
+        if isinstance(field, models.DateField):
+            return date.today()
+        if isinstance(field, models.FileField):
+            return ''
+        return None
+
+    def create(self, model, count, **overrides):
+        rows = []
+        for _ in range(count):
+            values = dict(overrides)
+            for field in model._meta.concrete_fields:
+                if field.primary_key or field.name in values or getattr(field, 'auto_now', False) \
+                        or getattr(field, 'auto_now_add', False):
+                    continue
+                if field.is_relation:
+                    if field.related_model is not model:
+                        values[field.name] = self.related(field.related_model)
+                elif not (field.null or field.has_default()):
+                    values[field.name] = self.value(field)
+            rows.append(model(**values))
+        return model.objects.bulk_create(rows)
+
+    def create_with_children(self, model, count, children):
+        parents = self.create(model, count)
+        for label, fk_name in children:
+            child_model = apps.get_model(label)
+            for parent in parents:
+                self.create(child_model, 1, **{fk_name: parent})
+        return parents
+
+
+class Command(BaseCommand):
+    help = (
+        "Vérifie que le nombre de requêtes des endpoints de liste ne dépend pas "
+        "du nombre de lignes (détection des N+1). Échoue sinon. Données annulées à la fin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--small', type=int, default=3, help="Nombre de lignes de la première mesure")
+        parser.add_argument('--large', type=int, default=30, help="Nombre de lignes de la seconde mesure")
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        failures = []
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create_superuser(
+                    username='check_query_counts', password='unused', email='qc@example.com'
+                )
+                client = APIClient()
+                client.force_authenticate(user)
+                factory = RowFactory(user)
+
+                for url, label, children in LIST_ENDPOINTS:
+                    model = apps.get_model(label)
+                    counts = []
+                    seeded = 0
+                    for target in (options['small'], options['large']):
+                        factory.create_with_children(model, target - seeded, children)
+                        seeded = target
+                        with CaptureQueriesContext(connection) as ctx:
+                            response = client.get(url)
+                        if response.status_code != 200:
+                            raise CommandError(f"{url} a répondu {response.status_code}")
+                        counts.append(len(ctx.captured_queries))
+
+                    ok = counts[0] == counts[1]
+                    if not ok:
+                        failures.append(url)
+                    style = self.style.SUCCESS if ok else self.style.ERROR
+                    self.stdout.write(style(
+                        f"{url:<28} {options['small']:>4} lignes : {counts[0]:>3} requêtes | "
+                        f"{options['large']:>4} lignes : {counts[1]:>3} requêtes"
+                    ))
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"Requêtes par ligne (N+1) détectées sur : {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("Aucun N+1 : le nombre de requêtes est constant"))
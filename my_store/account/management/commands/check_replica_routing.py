@@ -0,0 +1,108 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from my_store.replica import replica_alias
+
+
+class _Rollback(Exception):
+    """Annule les écritures de la démonstration sur la base principale"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Montre la répartition des lectures entre 'default' et le réplica : rapports "
+        "sur le réplica, listes et écritures sur 'default', lecture de ses propres "
+        "écritures pendant la fenêtre de REPLICA_STICKY_SECONDS. Échoue si une requête "
+        "part sur la mauvaise base. À lancer sur deux bases locales, par exemple : "
+        "DATABASE_URL=sqlite:////tmp/primary.sqlite3 DATABASE_REPLICA_URL=sqlite:////tmp/replica.sqlite3 "
+        "(après migrate). Un réplica SQLite est d'abord recopié depuis la base principale. "
+        "Les écritures sont annulées à la fin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window', type=float, default=1.0, help="Fenêtre de lecture de ses écritures (s)")
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError("Aucun réplica configuré : définir DATABASE_REPLICA_URL")
+        primary, replica = connections['default'], connections[alias]
+
+        if replica.vendor == 'sqlite':
+            if primary.vendor != 'sqlite' or primary.settings_dict['NAME'] == replica.settings_dict['NAME']:
+                raise CommandError("Réplica SQLite : la base principale doit être un autre fichier SQLite")
+            # Pas de réplication entre fichiers SQLite : copie de la base principale
+            primary.ensure_connection()
+            replica.ensure_connection()
+            primary.connection.backup(replica.connection)
+            self.stdout.write(f"Réplica {replica.settings_dict['NAME']} recopié depuis {primary.settings_dict['NAME']}")
+
+        self.results = []
+        try:
+            with transaction.atomic(), override_settings(
+                REPLICA_STICKY_SECONDS=options['window'], ALLOWED_HOSTS=['testserver']
+            ):
+                self.scenario(alias, options['window'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        failures = 0
+        self.stdout.write(f"\n{'Requête':<48} {'attendu':<9} {'lu sur':<9} total")
+        for label, expected, used, total in self.results:
+            ok = used == expected
+            failures += not ok
+            line = f"{label:<48} {expected:<9} {used:<9} {total if total is not None else ''}"
+            self.stdout.write(line if ok else self.style.ERROR(line))
+        if failures:
+            raise CommandError(f"{failures} requête(s) routée(s) vers la mauvaise base")
+        self.stdout.write(self.style.SUCCESS("\nRoutage conforme"))
+
+    def request(self, client, method, path, label, expected, **extra):
+        """Exécute la requête et note la base qui a servi les lectures"""
+        alias = replica_alias()
+        with CaptureQueriesContext(connections['default']) as on_default, \
+                CaptureQueriesContext(connections[alias]) as on_replica:
+            response = getattr(client, method)(path, **extra)
+        if response.status_code >= 400:
+            raise CommandError(f"{label} : HTTP {response.status_code}")
+        if on_replica.captured_queries and not on_default.captured_queries:
+            used = alias
+        elif on_default.captured_queries and not on_replica.captured_queries:
+            used = 'default'
+        else:
+            used = 'mixte' if on_default.captured_queries else 'aucune'
+        data = response.json() if response.get('Content-Type', '').startswith('application/json') else {}
+        self.results.append((label, expected, used, data.get('total') if isinstance(data, dict) else None))
+        return data
+
+    def scenario(self, alias, window):
+        from expenses.models import Depense
+
+        # Écriture non validée sur la base principale : invisible du réplica,
+        # comme une écriture pas encore répliquée
+        Depense.objects.create(date=date.today(), nom_depense='Contrôle réplica', somme='123.45')
+
+        agent_a = Client(REMOTE_ADDR='10.0.0.1')
+        agent_b = Client(REMOTE_ADDR='10.0.0.2')
+        total = '/api/depenses/total/'
+        transactions = '/api/stock-entries/transactions_magasin/?magasin=1'
+
+        self.request(agent_a, 'get', total, "A : total des dépenses", alias)
+        self.request(agent_a, 'get', '/api/depenses/?search=Contrôle', "A : liste des dépenses", 'default')
+        self.request(
+            agent_b, 'post', '/api/depenses/', "B : saisie d'une dépense", 'default',
+            data={'date': date.today().isoformat(), 'nom_depense': 'Contrôle B', 'somme': '10.00'},
+            content_type='application/json',
+        )
+        self.request(agent_b, 'get', total, "B : total juste après sa saisie", 'default')
+        self.request(agent_a, 'get', total, "A : total (n'a rien écrit)", alias)
+        self.request(agent_b, 'get', transactions, "B : transactions magasin juste après", 'default')
+        time.sleep(window + 0.2)
+        self.request(agent_b, 'get', total, f"B : total après {window:g} s", alias)
+        self.request(agent_b, 'get', transactions, f"B : transactions magasin après {window:g} s", alias)
@@ -1,7 +1,5 @@
 from django.contrib.auth import authenticate
-from django.db.models import Sum, Count, Q
 from django.utils import timezone
-from datetime import timedelta
 
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
@@ -9,6 +7,10 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from caching.cache import cached_aggregate
+from my_store.replica import ReplicaReadMixin
+
+from .dashboard import dashboard_stats
 from .models import User
 from .serializers import UserSerializer
 
@@ -66,64 +68,25 @@ class ProfileView(APIView):
         )
 
 
-class DashboardStatsView(APIView):
-    """Return dashboard statistics."""
+class DashboardStatsView(ReplicaReadMixin, APIView):
+    """
+    Return dashboard statistics: produits, commandes, clients, chiffre
+    d'affaires, stock par magasin, créances clients, soldes employés,
+    dépenses et mouvements d'argent (voir account.dashboard).
+    """
 
     permission_classes = [IsAuthenticated]
+    # Lu sur le réplica s'il est configuré (voir my_store.replica)
+    replica_actions = ['get']
 
     def get(self, request):
         try:
-            from products.models import Product
-            from orders.models import Order
-            from customers.models import Customer
-
-            # Total products
-            total_products = Product.objects.count()
-            active_products = Product.objects.filter(is_active=True).count()
-
-            # Total orders
-            total_orders = Order.objects.count()
-            pending_orders = Order.objects.filter(status='pending').count()
-            completed_orders = Order.objects.filter(status='delivered').count()
-
-            # Total customers
-            total_customers = Customer.objects.count()
-
-            # Revenue
-            total_revenue = Order.objects.filter(
-                status__in=['delivered', 'shipped']
-            ).aggregate(total=Sum('total_amount'))['total'] or 0
-
-            # Recent orders (last 30 days)
-            thirty_days_ago = timezone.now() - timedelta(days=30)
-            recent_orders = Order.objects.filter(created_at__gte=thirty_days_ago).count()
-
-            # Recent customers (last 30 days)
-            recent_customers = Customer.objects.filter(created_at__gte=thirty_days_ago).count()
-
-            # Low stock products
-            low_stock_products = Product.objects.filter(stock__lt=10, is_active=True).count()
-
-            return Response({
-                'products': {
-                    'total': total_products,
-                    'active': active_products,
-                    'low_stock': low_stock_products,
-                },
-                'orders': {
-                    'total': total_orders,
-                    'pending': pending_orders,
-                    'completed': completed_orders,
-                    'recent': recent_orders,
-                },
-                'customers': {
-                    'total': total_customers,
-                    'recent': recent_customers,
-                },
-                'revenue': {
-                    'total': float(total_revenue),
-                },
-            })
+            # Mis en cache et invalidé à chaque écriture sur les tables
+            # agrégées ; la date fait partie de la clé car les compteurs
+            # "récents" et "du mois" en dépendent
+            today = timezone.localdate()
+            stats = cached_aggregate('dashboard', {'date': today.isoformat()}, lambda: dashboard_stats(today))
+            return Response(stats)
         except Exception as e:
             return Response(
                 {'error': str(e)},
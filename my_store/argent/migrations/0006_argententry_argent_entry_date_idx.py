@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-17 05:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('argent', '0005_alter_argententry_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='argententry',
+            index=models.Index(fields=['date', 'id'], name='argent_entry_date_idx'),
+        ),
+    ]
@@ -61,7 +61,7 @@ class ArgentEntry(models.Model):
         related_name='argent_entries_created'
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.date.strftime('%d/%m/%Y')} - {self.somme} FCFA"
@@ -70,4 +70,8 @@ class ArgentEntry(models.Model):
         verbose_name = "Entrée d'argent"
         verbose_name_plural = "Entrées d'argent"
         ordering = ['id']
+        indexes = [
+            # Filtres date_from / date_to, liste triée par ID
+            models.Index(fields=['date', 'id'], name='argent_entry_date_idx'),
+        ]
 
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class CachingConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'caching'
+
+    def ready(self):
+        # Invalider les agrégats en cache à chaque écriture sur leurs modèles
+        from .signals import connect_signals
+        connect_signals()
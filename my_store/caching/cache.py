@@ -0,0 +1,170 @@
+"""
+Cache des agrégats coûteux (tableau de bord, statistiques de stock).
+
+Chaque agrégat est rangé sous une clé (nom, génération, paramètres normalisés).
+La génération d'un agrégat change à chaque écriture sur l'un des modèles dont
+il dépend (CACHED_AGGREGATES, signaux post_save / post_delete) : les anciennes
+entrées ne sont plus jamais lues, sans avoir à les énumérer, quel que soit le
+backend (locmem, fichier, Redis). Le TIMEOUT du cache ne sert qu'à libérer la
+place des entrées orphelines, pas à borner leur fraîcheur.
+"""
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from my_store.replica import current_read_alias
+
+logger = logging.getLogger(__name__)
+
+# Agrégats en cache -> modèles dont ils dépendent
+CACHED_AGGREGATES = {
+    'dashboard': [
+        'products.Product', 'orders.Order', 'customers.Customer', 'customers.ClientChargement',
+        'stock.StockBalance', 'employees.Employee', 'employees.EmployeeExpense',
+        'expenses.Depense', 'argent.ArgentEntry',
+    ],
+    'stock-stats': ['stock.StockEntry'],
+    'stock-details': ['stock.StockEntry', 'stock.StockBalance'],
+}
+
+PREFIX = 'agg'
+COUNTERS = ('hits', 'misses', 'invalidations')
+
+
+def get_cache():
+    return caches[getattr(settings, 'AGGREGATE_CACHE_ALIAS', 'aggregates')]
+
+
+def dependents(label):
+    """Agrégats qui dépendent du modèle `label` (ex: 'stock.StockEntry')"""
+    label = label.lower()
+    return [name for name, models in CACHED_AGGREGATES.items() if label in (m.lower() for m in models)]
+
+
+def normalize_params(params):
+    """
+    Paramètres de requête sous forme canonique : clés triées, valeurs vides
+    ignorées (?magasin=&date_from=2025-01-01 équivaut à ?date_from=2025-01-01).
+    """
+    if params is None:
+        return []
+    if hasattr(params, 'lists'):
+        items = params.lists()
+    else:
+        items = ((key, value if isinstance(value, (list, tuple)) else [value]) for key, value in params.items())
+    normalized = []
+    for key, values in items:
+        values = sorted(str(value) for value in values if value not in (None, ''))
+        if values:
+            normalized.append([key, values])
+    return sorted(normalized)
+
+
+def _generation_key(name):
+    return f'{PREFIX}:gen:{name}'
+
+
+def _generation(cache, name):
+    """
+    Génération courante de l'agrégat. Une génération absente (jamais créée
+    ou évincée par le backend) est remplacée par une nouvelle valeur, jamais
+    par une ancienne : une entrée périmée ne peut pas redevenir lisible.
+    """
+    key = _generation_key(name)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def _count(cache, counter, name):
+    key = f'{PREFIX}:{counter}:{name}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Compteur absent : le créer (add ne l'écrase pas si un autre processus l'a créé entre-temps)
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def cached_aggregate(name, params, compute):
+    """
+    Retourne l'agrégat `name` pour ces paramètres, en le calculant avec
+    compute() (puis en le mettant en cache) s'il est absent.
+    """
+    cache = get_cache()
+    try:
+        generation = _generation(cache, name)
+        digest = hashlib.sha1(json.dumps(normalize_params(params)).encode()).hexdigest()
+        key = f'{PREFIX}:{name}:{generation}:{digest}'
+        value = cache.get(key)
+    except Exception:
+        # Cache indisponible (Redis arrêté...) : servir le calcul direct
+        logger.exception("Cache des agrégats indisponible (%s)", name)
+        return compute()
+
+    if value is not None:
+        _count(cache, 'hits', name)
+        return value
+
+    _count(cache, 'misses', name)
+    value = compute()
+    if current_read_alias():
+        # Calculé sur le réplica, qui peut être en retard sur la dernière
+        # invalidation : gardé seulement le temps qu'il la rattrape
+        cache.set(key, value, getattr(settings, 'REPLICA_STICKY_SECONDS', 5))
+    else:
+        cache.set(key, value)
+    return value
+
+
+def invalidate(*labels):
+    """
+    Invalide les agrégats qui dépendent des modèles `labels`. À appeler après
+    les écritures qui ne déclenchent pas de signal (QuerySet.update(),
+    bulk_create()...). La génération change tout de suite (lectures dans la
+    même transaction) et à nouveau après le commit : un agrégat calculé par
+    une autre requête avant le commit, donc sur les anciennes données, n'est
+    pas conservé.
+    """
+    names = sorted({name for label in labels for name in dependents(label)})
+    if not names:
+        return
+
+    def bump(count=False):
+        cache = get_cache()
+        try:
+            generation = time.time_ns()
+            cache.set_many({_generation_key(name): generation for name in names}, None)
+            if count:
+                for name in names:
+                    _count(cache, 'invalidations', name)
+        except Exception:
+            logger.exception("Invalidation du cache des agrégats impossible (%s)", ', '.join(names))
+
+    bump(count=True)
+    transaction.on_commit(bump)
+
+
+def cache_stats():
+    """Compteurs {agrégat: {hits, misses, invalidations, hit_ratio}} depuis le dernier reset"""
+    cache = get_cache()
+    keys = {(name, counter): f'{PREFIX}:{counter}:{name}' for name in CACHED_AGGREGATES for counter in COUNTERS}
+    values = cache.get_many(list(keys.values()))
+    stats = {}
+    for name in CACHED_AGGREGATES:
+        counts = {counter: values.get(keys[name, counter], 0) for counter in COUNTERS}
+        lookups = counts['hits'] + counts['misses']
+        counts['hit_ratio'] = round(counts['hits'] / lookups, 3) if lookups else None
+        stats[name] = counts
+    return stats
+
+
+def reset_stats():
+    get_cache().delete_many([f'{PREFIX}:{counter}:{name}' for name in CACHED_AGGREGATES for counter in COUNTERS])
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from caching.cache import cache_stats, get_cache, reset_stats
+
+
+class Command(BaseCommand):
+    help = "Affiche les compteurs du cache des agrégats (succès / échecs / invalidations)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Remet les compteurs à zéro après affichage")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Backend : {get_cache().__class__.__name__}")
+        for name, counts in cache_stats().items():
+            ratio = '-' if counts['hit_ratio'] is None else f"{counts['hit_ratio']:.1%}"
+            self.stdout.write(
+                f"{name:<15} succès {counts['hits']:>8}  échecs {counts['misses']:>8}  "
+                f"invalidations {counts['invalidations']:>6}  taux {ratio}"
+            )
+        if options['reset']:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS("Compteurs remis à zéro"))
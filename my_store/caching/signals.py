@@ -0,0 +1,18 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from .cache import CACHED_AGGREGATES, invalidate
+
+
+def invalidate_on_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate(sender._meta.label)
+
+
+def connect_signals():
+    labels = sorted({label for models in CACHED_AGGREGATES.values() for label in models})
+    for label in labels:
+        model = apps.get_model(label)
+        post_save.connect(invalidate_on_change, sender=model, dispatch_uid=f'cache_save_{label}')
+        post_delete.connect(invalidate_on_change, sender=model, dispatch_uid=f'cache_delete_{label}')
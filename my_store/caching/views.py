@@ -0,0 +1,19 @@
+from django.conf import settings
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache import cache_stats, get_cache
+
+
+class CacheStatsView(APIView):
+    """Compteurs du cache des agrégats (succès, échecs, invalidations) pour la supervision"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({
+            'backend': get_cache().__class__.__name__,
+            'alias': getattr(settings, 'AGGREGATE_CACHE_ALIAS', 'aggregates'),
+            'aggregates': cache_stats(),
+        })
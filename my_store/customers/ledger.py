@@ -0,0 +1,136 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, IntegerField, Q, Sum, Value, When, Window
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from my_store.bulk import write_column
+
+from .models import Customer, ClientChargement
+
+
+ZERO = Value(Decimal('0.00'), output_field=DecimalField(max_digits=12, decimal_places=2))
+BALANCE_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+# Ordre du registre client : lignes normales d'abord, règlements en bas, puis date et ID
+LEDGER_ORDER = ['type_order', 'date_chargement', 'id']
+
+
+def type_order():
+    """reglement = 1, autres opérations = 0"""
+    return Case(
+        When(type_operation='reglement', then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField()
+    )
+
+
+def ledger_key(chargement):
+    """Position d'une ligne dans le registre : (type_order, date, id)"""
+    date_chargement = ClientChargement._meta.get_field('date_chargement').to_python(chargement.date_chargement)
+    return (1 if chargement.type_operation == 'reglement' else 0, date_chargement, chargement.pk)
+
+
+def _running_balance(offset=None):
+    """
+    Somme cumulée de (somme_totale - avance) sur le registre de chaque client :
+    SUM(...) OVER (PARTITION BY client ORDER BY type_order, date_chargement, id).
+    offset : solde de la ligne précédant la portion recalculée.
+    """
+    running = Window(
+        expression=Sum(
+            Coalesce('somme_totale', ZERO) - Coalesce('avance', ZERO),
+            output_field=BALANCE_FIELD
+        ),
+        partition_by=[F('client_id')],
+        order_by=[F(field).asc() for field in LEDGER_ORDER],
+    )
+    if offset:
+        return running + Value(offset, output_field=BALANCE_FIELD)
+    return running
+
+
+def _suffix_filter(key):
+    """Lignes dont la position (type_order, date, id) est >= key"""
+    order, date_chargement, pk = key
+    return (
+        Q(type_order__gt=order)
+        | Q(type_order=order, date_chargement__gt=date_chargement)
+        | Q(type_order=order, date_chargement=date_chargement, id__gte=pk)
+    )
+
+
+def _write_balances(queryset):
+    """
+    Évalue la somme cumulée (lue en flux) et écrit les soldes modifiés en un
+    UPDATE groupé (my_store.bulk.write_column).
+    Retourne {id: somme_restante} pour toutes les lignes évaluées.
+    """
+    balances = {}
+    changed = {}
+    rows = queryset.values_list('id', 'somme_restante', 'solde_calcule').iterator(chunk_size=2000)
+    for pk, somme_restante, solde_calcule in rows:
+        nouveau = Decimal(solde_calcule).quantize(Decimal('0.01'))
+        balances[pk] = nouveau
+        if somme_restante != nouveau:
+            changed[pk] = nouveau
+    # updated_at mis à jour avec le solde : le flux ?since= doit voir le nouveau solde
+    write_column(ClientChargement, 'somme_restante', changed, timezone.now())
+    return balances
+
+
+def rebalance_client(client_id, start_key=None):
+    """
+    Recalcule somme_restante pour un client à partir de la position start_key
+    (toute la série si None). Seul le suffixe affecté est relu et réécrit :
+    une requête pour le solde précédent, une requête fenêtrée, un bulk_update.
+    Retourne {id: somme_restante} pour les lignes recalculées.
+    """
+    with transaction.atomic():
+        # Sérialiser les recalculs concurrents d'un même client
+        Customer.objects.select_for_update().filter(pk=client_id).first()
+
+        queryset = ClientChargement.objects.filter(client_id=client_id).annotate(type_order=type_order())
+        offset = None
+        if start_key is not None:
+            previous = queryset.exclude(_suffix_filter(start_key)).order_by(
+                *['-' + field for field in LEDGER_ORDER]
+            ).values_list('somme_restante', flat=True).first()
+            offset = previous or None
+            queryset = queryset.filter(_suffix_filter(start_key))
+
+        queryset = queryset.annotate(solde_calcule=_running_balance(offset))
+        return _write_balances(queryset)
+
+
+def rebalance_changes(changes):
+    """
+    Recalcule les registres touchés par une liste de changements (previous,
+    current) : création (previous=None), modification, suppression
+    (current=None). Un seul recalcul par client, à partir de la première
+    position affectée (ancienne ou nouvelle).
+    """
+    starts = {}
+    for previous, current in changes:
+        for chargement in (previous, current):
+            if chargement is not None:
+                key = ledger_key(chargement)
+                starts[chargement.client_id] = min(starts.get(chargement.client_id, key), key)
+    with transaction.atomic():
+        for client_id, start_key in starts.items():
+            rebalance_client(client_id, start_key)
+
+
+def rebalance_clients(client_ids):
+    """
+    Recalcule entièrement le registre de plusieurs clients avec une seule
+    requête fenêtrée (PARTITION BY client) et un bulk_update.
+    Retourne le nombre de lignes recalculées.
+    """
+    with transaction.atomic():
+        queryset = ClientChargement.objects.filter(client_id__in=client_ids).annotate(
+            type_order=type_order(),
+            solde_calcule=_running_balance(),
+        )
+        return len(_write_balances(queryset))
@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from customers.ledger import rebalance_clients
+from customers.models import ClientChargement
+
+
+class Command(BaseCommand):
+    help = "Recalcule la somme restante de tous les registres clients, par lots traités en parallèle."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help="Nombre de clients par lot")
+        parser.add_argument('--workers', type=int, default=4, help="Nombre de lots traités en parallèle")
+        parser.add_argument('--client', type=int, action='append', help="Limiter à un ou plusieurs clients")
+
+    def handle(self, *args, **options):
+        client_ids = options['client'] or list(
+            ClientChargement.objects.order_by('client_id').values_list('client_id', flat=True).distinct()
+        )
+        batch_size = max(1, options['batch_size'])
+        batches = [client_ids[i:i + batch_size] for i in range(0, len(client_ids), batch_size)]
+
+        def run(batch):
+            try:
+                return rebalance_clients(batch)
+            finally:
+                # Chaque thread utilise sa propre connexion
+                connection.close()
+
+        total = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            futures = [executor.submit(run, batch) for batch in batches]
+            for future in as_completed(futures):
+                total += future.result()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(client_ids)} client(s) recalculé(s) en {len(batches)} lot(s), {total} ligne(s)"
+        ))
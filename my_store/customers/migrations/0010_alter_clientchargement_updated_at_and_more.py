@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-17 04:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0009_clientchargement_n_camion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='clientchargement',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='customer',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-17 05:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0010_alter_clientchargement_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientchargement',
+            index=models.Index(fields=['-date_chargement', '-created_at'], name='client_chargement_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientchargement',
+            index=models.Index(fields=['client', 'date_chargement', 'id'], name='client_chargement_client_idx'),
+        ),
+    ]
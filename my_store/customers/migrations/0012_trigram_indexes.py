@@ -0,0 +1,17 @@
+from django.db import migrations
+
+from my_store.indexes import CreateTrigramIndex
+
+
+class Migration(migrations.Migration):
+    """Index trigrammes des recherches __icontains (PostgreSQL uniquement, voir my_store.indexes)"""
+
+    dependencies = [
+        ('customers', '0011_clientchargement_client_chargement_date_idx_and_more'),
+    ]
+
+    operations = [
+        CreateTrigramIndex('customer', 'first_name', 'customer_first_name_trgm'),
+        CreateTrigramIndex('customer', 'last_name', 'customer_last_name_trgm'),
+        CreateTrigramIndex('customer', 'email', 'customer_email_trgm'),
+    ]
@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from decimal import Decimal
 from account.models import User
+from my_store.derived import derive
 
 
 class Customer(models.Model):
@@ -13,7 +14,7 @@ class Customer(models.Model):
     postal_code = models.CharField(max_length=20, blank=True)
     country = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -123,74 +124,47 @@ class ClientChargement(models.Model):
         related_name='client_chargements_created'
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def save(self, *args, **kwargs):
-        # Calcul automatique du tonnage (nombre de sacs × poids) si les deux sont fournis
-        # SEULEMENT si le tonnage n'a pas déjà été défini manuellement
-        if self.tonnage is None and self.nombre_sacs is not None and self.poids is not None:
-            tonnage_brut = Decimal(self.nombre_sacs) * Decimal(self.poids)
-            
-            # Soustraire le poids des sacs vides si fourni
-            if self.poids_sac_vide is not None and self.poids_sac_vide > 0:
-                poids_total_sacs_vides = Decimal(self.nombre_sacs) * Decimal(self.poids_sac_vide)
-                self.tonnage = tonnage_brut - poids_total_sacs_vides
-            else:
-                self.tonnage = tonnage_brut
-        elif self.tonnage is None:
-            # Si le tonnage n'est pas défini et qu'on ne peut pas le calculer, le laisser à None
-            self.tonnage = None
-        
-        # Calcul automatique de la somme totale (tonnage × prix) si les deux sont fournis
-        # SEULEMENT si la somme_totale n'a pas déjà été définie manuellement
-        if self.somme_totale is None:
-            if self.tonnage is not None and self.prix is not None:
-                self.somme_totale = Decimal(self.tonnage) * Decimal(self.prix)
-            else:
-                self.somme_totale = None
+        # Tonnage (moins le poids des sacs vides) et somme totale, sauf saisie manuelle
+        derive([self])
         
         # Calcul automatique de la somme restante (formule Excel: I2+G3-H3)
         # I2 = somme_restante précédente, G3 = somme_totale actuelle, H3 = avance actuelle
-        somme_totale = Decimal(self.somme_totale) if self.somme_totale is not None else Decimal('0.00')
-        avance = Decimal(self.avance) if self.avance is not None else Decimal('0.00')
-        
-        # Récupérer la somme restante de la ligne précédente
         # IMPORTANT : Les lignes de règlement doivent toujours être en bas
-        # On trie d'abord par type_operation (règlements en dernier), puis par date et ID
-        somme_restante_precedente = Decimal('0.00')
-        
-        # Récupérer la dernière ligne précédente pour ce client (date <= date actuelle)
-        # Trier pour mettre les règlements en bas : type_operation != 'reglement' d'abord, puis date, puis ID
-        if self.pk:  # Si l'objet existe déjà, exclure cette ligne
-            queryset = ClientChargement.objects.filter(
-                client=self.client,
-                date_chargement__lte=self.date_chargement
-            ).exclude(pk=self.pk)
-        else:
-            # Nouvel objet : récupérer la dernière ligne pour ce client
-            queryset = ClientChargement.objects.filter(
-                client=self.client,
-                date_chargement__lte=self.date_chargement
-            )
-        
-        # Trier : lignes normales d'abord (type != 'reglement'), puis règlements, puis par date et ID
-        # Utiliser une expression Case pour forcer l'ordre : reglement = 1, autres = 0
-        from django.db.models import Case, When, IntegerField
-        derniere_ligne = queryset.annotate(
-            type_order=Case(
-                When(type_operation='reglement', then=1),
-                default=0,
-                output_field=IntegerField()
-            )
-        ).order_by('type_order', 'date_chargement', 'id').last()
-        
-        if derniere_ligne and derniere_ligne.somme_restante is not None:
-            somme_restante_precedente = Decimal(derniere_ligne.somme_restante)
-        
-        # Formule : somme_restante_précédente + somme_totale - avance
-        self.somme_restante = somme_restante_precedente + somme_totale - avance
-        
-        super().save(*args, **kwargs)
+        # Le registre est trié par type_operation (règlements en dernier), puis date et ID ;
+        # seules les lignes à partir de la position modifiée sont recalculées,
+        # y compris les lignes postérieures lors d'une saisie antidatée
+        from .ledger import ledger_key, rebalance_client
+        with transaction.atomic():
+            ancien = None
+            if self.pk:
+                ancien = ClientChargement.objects.filter(pk=self.pk).only(
+                    'client_id', 'type_operation', 'date_chargement'
+                ).first()
+            
+            super().save(*args, **kwargs)
+            
+            debut = ledger_key(self)
+            if ancien is not None:
+                if ancien.client_id != self.client_id:
+                    # Changement de client : recalculer aussi l'ancien registre
+                    rebalance_client(ancien.client_id, ledger_key(ancien))
+                else:
+                    debut = min(debut, ledger_key(ancien))
+            soldes = rebalance_client(self.client_id, debut)
+            self.somme_restante = soldes.get(self.pk, self.somme_restante)
+
+    def delete(self, *args, **kwargs):
+        # Recalculer les soldes des lignes suivantes après suppression
+        from .ledger import ledger_key, rebalance_client
+        with transaction.atomic():
+            client_id = self.client_id
+            debut = ledger_key(self)
+            result = super().delete(*args, **kwargs)
+            rebalance_client(client_id, debut)
+        return result
 
     @property
     def statut_dette(self):
@@ -214,4 +188,9 @@ class ClientChargement(models.Model):
         verbose_name = "Chargement client"
         verbose_name_plural = "Chargements clients"
         ordering = ['-date_chargement', '-created_at']
+        indexes = [
+            models.Index(fields=['-date_chargement', '-created_at'], name='client_chargement_date_idx'),
+            # Registre d'un client (filtre client + dates, recalcul des soldes par date puis ID)
+            models.Index(fields=['client', 'date_chargement', 'id'], name='client_chargement_client_idx'),
+        ]
 
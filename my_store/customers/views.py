@@ -2,16 +2,26 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from django.db.models import Value
+from django.db.models.functions import Concat
 from .models import Customer, ClientChargement
+from my_store.query_plans import QueryPlanMixin
+from my_store.conditional import ConditionalGetMixin
+from sync.mixins import DeltaSyncMixin
+from my_store.xlsx import XlsxExportMixin
+from my_store.bulk import BulkWriteMixin
+from .ledger import rebalance_changes, type_order
 from .serializers import (
     CustomerSerializer, CustomerListSerializer,
     ClientChargementSerializer, ClientChargementCreateSerializer, ClientChargementListSerializer
 )
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(QueryPlanMixin, ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     permission_classes = [AllowAny]
+    # Aucun champ lié dans les serializers clients : pas de jointure
+    query_plans = {}
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -61,10 +71,36 @@ class CustomerViewSet(viewsets.ModelViewSet):
             )
 
 
-class ClientChargementViewSet(viewsets.ModelViewSet):
+class ClientChargementViewSet(QueryPlanMixin, ConditionalGetMixin, DeltaSyncMixin, BulkWriteMixin, XlsxExportMixin, viewsets.ModelViewSet):
     """ViewSet pour gérer les chargements clients"""
     queryset = ClientChargement.objects.all()
     permission_classes = [AllowAny]
+    # Noms affichés depuis ces relations : inclus dans l'ETag
+    etag_related = ['client']
+    query_plans = {
+        'list': {'select_related': ['client']},
+        'default': {'select_related': ['client', 'created_by']},
+    }
+    # Export Excel du registre client (export_xlsx/), dans l'ordre du registre
+    export_title = "Suivi clients"
+    export_filename = "registre_clients"
+    export_ordering = ['client_id', type_order(), 'date_chargement', 'id']
+    export_columns = [
+        ('Date', 'date_chargement', 12),
+        ('Client', Concat('client__first_name', Value(' '), 'client__last_name'), 30),
+        ('Opération', 'type_operation', 12),
+        ('Produit', 'nom_produit', 20),
+        ('Camion', 'n_camion', 12),
+        ('Nombre de sacs', 'nombre_sacs', 14),
+        ('Poids (kg)', 'poids', 12),
+        ('Poids sac vide (kg)', 'poids_sac_vide', 16),
+        ('Tonnage (kg)', 'tonnage', 12),
+        ('Prix par kg', 'prix', 12),
+        ('Somme totale', 'somme_totale', 15),
+        ('Avance', 'avance', 15),
+        ('Somme restante', 'somme_restante', 15),
+    ]
+    export_totals = ['somme_totale', 'avance']
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -97,3 +133,10 @@ class ClientChargementViewSet(viewsets.ModelViewSet):
         else:
             serializer.save(created_by=None)
 
+    # Enregistrement groupé (bulk/) : soldes recalculés une fois par client
+    # à partir de la première ligne touchée
+    def bulk_after_write(self, created, updated, deleted):
+        rebalance_changes(
+            [(None, chargement) for chargement in created] + updated + [(chargement, None) for chargement in deleted]
+        )
+
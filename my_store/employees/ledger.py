@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value, Window
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from my_store.bulk import write_column
+
+from .models import Employee, EmployeeExpense
+
+
+ZERO = Value(Decimal('0.00'), output_field=DecimalField(max_digits=12, decimal_places=2))
+BALANCE_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+# Ordre du registre employé : date puis ID
+LEDGER_ORDER = ['date', 'id']
+
+
+def ledger_key(expense):
+    """Position d'une ligne dans le registre : (date, id)"""
+    return (EmployeeExpense._meta.get_field('date').to_python(expense.date), expense.pk)
+
+
+def _net():
+    """Variation apportée par une ligne : somme_remise - somme_depense"""
+    return Coalesce('somme_remise', ZERO) - Coalesce('somme_depense', ZERO)
+
+
+def _running_balance():
+    """SUM(somme_remise - somme_depense) OVER (PARTITION BY employee ORDER BY date, id)"""
+    return Window(
+        expression=Sum(_net(), output_field=BALANCE_FIELD),
+        partition_by=[F('employee_id')],
+        order_by=[F(field).asc() for field in LEDGER_ORDER],
+    )
+
+
+def _suffix_filter(key):
+    """Lignes dont la position (date, id) est >= key"""
+    date, pk = key
+    return Q(date__gt=date) | Q(date=date, id__gte=pk)
+
+
+def rebalance_employee(employee_id, start_key=None):
+    """
+    Recalcule somme_restante pour un employé à partir de la position start_key
+    (toute la série si None) : une requête pour le solde précédent, une requête
+    fenêtrée sur le suffixe, puis un UPDATE groupé des lignes modifiées.
+    Retourne {id: somme_restante} pour les lignes recalculées.
+    """
+    with transaction.atomic():
+        # Sérialiser les recalculs concurrents d'un même employé
+        Employee.objects.select_for_update().filter(pk=employee_id).first()
+
+        queryset = EmployeeExpense.objects.filter(employee_id=employee_id)
+        offset = Decimal('0.00')
+        if start_key is not None:
+            offset = queryset.exclude(_suffix_filter(start_key)).order_by('-date', '-id').values_list(
+                'somme_restante', flat=True
+            ).first() or Decimal('0.00')
+            queryset = queryset.filter(_suffix_filter(start_key))
+
+        soldes = {}
+        changed = {}
+        rows = queryset.annotate(solde_calcule=_running_balance()).values_list(
+            'id', 'somme_restante', 'solde_calcule'
+        ).iterator(chunk_size=2000)
+        for pk, somme_restante, solde_calcule in rows:
+            nouveau = (offset + Decimal(solde_calcule)).quantize(Decimal('0.01'))
+            soldes[pk] = nouveau
+            if somme_restante != nouveau:
+                changed[pk] = nouveau
+        # updated_at mis à jour avec le solde : le flux ?since= doit voir le nouveau solde
+        write_column(EmployeeExpense, 'somme_restante', changed, timezone.now())
+        return soldes
+
+
+def rebalance_changes(changes):
+    """
+    Recalcule les registres touchés par une liste de changements (previous,
+    current) : création (previous=None), modification, suppression
+    (current=None). Un seul recalcul par employé, à partir de la première
+    position affectée (ancienne ou nouvelle).
+    """
+    starts = {}
+    for previous, current in changes:
+        for expense in (previous, current):
+            if expense is not None:
+                key = ledger_key(expense)
+                starts[expense.employee_id] = min(starts.get(expense.employee_id, key), key)
+    with transaction.atomic():
+        for employee_id, start_key in starts.items():
+            rebalance_employee(employee_id, start_key)
+
+
+def with_running_balance(queryset):
+    """
+    Annote solde_calcule (solde cumulé calculé à la volée) sans dépendre de la
+    colonne stockée : somme de somme_remise - somme_depense sur le registre
+    complet de l'employé jusqu'à la ligne (date, id) incluse, par une
+    sous-requête corrélée (index employé, date, id). Une fenêtre sur le
+    queryset de la liste serait évaluée après son WHERE : les filtres ajoutés
+    ensuite (dates, ?since=, curseur de pagination) changeraient le solde.
+    """
+    anterieur = EmployeeExpense.objects.filter(
+        Q(date__lt=OuterRef('date')) | Q(date=OuterRef('date'), id__lte=OuterRef('id')),
+        employee=OuterRef('employee'),
+    ).order_by().values('employee').annotate(total=Sum(_net(), output_field=BALANCE_FIELD)).values('total')
+    return queryset.annotate(solde_calcule=Coalesce(Subquery(anterieur, output_field=BALANCE_FIELD), ZERO))
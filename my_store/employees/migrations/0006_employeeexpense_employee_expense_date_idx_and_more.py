@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-17 05:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0005_alter_employee_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employeeexpense',
+            index=models.Index(fields=['-date', '-created_at'], name='employee_expense_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeeexpense',
+            index=models.Index(fields=['employee', 'date', 'id'], name='employee_expense_emp_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+from my_store.indexes import CreateTrigramIndex
+
+
+class Migration(migrations.Migration):
+    """Index trigrammes des recherches __icontains (PostgreSQL uniquement, voir my_store.indexes)"""
+
+    dependencies = [
+        ('employees', '0006_employeeexpense_employee_expense_date_idx_and_more'),
+    ]
+
+    operations = [
+        CreateTrigramIndex('employee', 'first_name', 'employee_first_name_trgm'),
+        CreateTrigramIndex('employee', 'last_name', 'employee_last_name_trgm'),
+        CreateTrigramIndex('employee', 'email', 'employee_email_trgm'),
+    ]
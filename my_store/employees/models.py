@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from decimal import Decimal
 from account.models import User
 
@@ -35,7 +35,7 @@ class Employee(models.Model):
         related_name="employees_created",
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -111,37 +111,40 @@ class EmployeeExpense(models.Model):
         related_name='employee_expenses_created'
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def save(self, *args, **kwargs):
         # Calcul automatique de la somme restante de manière cumulative
         # Formule : somme_restante_précédente + somme_remise - somme_depense
-        somme_remise = Decimal(self.somme_remise) if self.somme_remise is not None else Decimal('0.00')
-        somme_depense = Decimal(self.somme_depense) if self.somme_depense is not None else Decimal('0.00')
-        
-        # Récupérer la somme restante de la ligne précédente (triée par date puis par ID)
-        somme_restante_precedente = Decimal('0.00')
-        
-        # Récupérer la dernière ligne précédente pour cet employé (date <= date actuelle)
-        if self.pk:  # Si l'objet existe déjà, exclure cette ligne
-            derniere_ligne = EmployeeExpense.objects.filter(
-                employee=self.employee,
-                date__lte=self.date
-            ).exclude(pk=self.pk).order_by('date', 'id').last()
-        else:
-            # Nouvel objet : récupérer la dernière ligne pour cet employé
-            derniere_ligne = EmployeeExpense.objects.filter(
-                employee=self.employee,
-                date__lte=self.date
-            ).order_by('date', 'id').last()
-        
-        if derniere_ligne and derniere_ligne.somme_restante is not None:
-            somme_restante_precedente = Decimal(derniere_ligne.somme_restante)
-        
-        # Formule : somme_restante_précédente + somme_remise - somme_depense
-        self.somme_restante = somme_restante_precedente + somme_remise - somme_depense
-        
-        super().save(*args, **kwargs)
+        # Le registre est trié par date puis par ID ; seules les lignes à partir de
+        # la position modifiée sont recalculées (y compris lors d'une saisie antidatée)
+        from .ledger import ledger_key, rebalance_employee
+        with transaction.atomic():
+            ancien = None
+            if self.pk:
+                ancien = EmployeeExpense.objects.filter(pk=self.pk).only('employee_id', 'date').first()
+            
+            super().save(*args, **kwargs)
+            
+            debut = ledger_key(self)
+            if ancien is not None:
+                if ancien.employee_id != self.employee_id:
+                    # Changement d'employé : recalculer aussi l'ancien registre
+                    rebalance_employee(ancien.employee_id, ledger_key(ancien))
+                else:
+                    debut = min(debut, ledger_key(ancien))
+            soldes = rebalance_employee(self.employee_id, debut)
+            self.somme_restante = soldes.get(self.pk, self.somme_restante)
+
+    def delete(self, *args, **kwargs):
+        # Recalculer les soldes des lignes suivantes après suppression
+        from .ledger import ledger_key, rebalance_employee
+        with transaction.atomic():
+            employee_id = self.employee_id
+            debut = ledger_key(self)
+            result = super().delete(*args, **kwargs)
+            rebalance_employee(employee_id, debut)
+        return result
 
     def __str__(self):
         return f"Dépense {self.employee.full_name} - {self.date.strftime('%d/%m/%Y')}"
@@ -150,4 +153,9 @@ class EmployeeExpense(models.Model):
         verbose_name = "Dépense employé"
         verbose_name_plural = "Dépenses employés"
         ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['-date', '-created_at'], name='employee_expense_date_idx'),
+            # Registre d'un employé (filtre employé + dates, recalcul des soldes par date puis ID)
+            models.Index(fields=['employee', 'date', 'id'], name='employee_expense_emp_idx'),
+        ]
 
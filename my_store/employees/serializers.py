@@ -82,7 +82,18 @@ class EmployeeListSerializer(serializers.ModelSerializer):
         fields = ['id', 'full_name', 'email', 'phone', 'city', 'is_private', 'is_active']
 
 
-class EmployeeExpenseSerializer(serializers.ModelSerializer):
+class SoldeCalculeMixin:
+    """Remplace somme_restante par le solde calculé à la volée s'il est annoté (?solde=calcule)"""
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        solde_calcule = getattr(instance, 'solde_calcule', None)
+        if solde_calcule is not None:
+            representation['somme_restante'] = self.fields['somme_restante'].to_representation(solde_calcule)
+        return representation
+
+
+class EmployeeExpenseSerializer(SoldeCalculeMixin, serializers.ModelSerializer):
     """Serializer pour les dépenses employés"""
     employee_name = serializers.CharField(source='employee.full_name', read_only=True)
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
@@ -111,7 +122,7 @@ class EmployeeExpenseCreateSerializer(serializers.ModelSerializer):
         return EmployeeExpense.objects.create(**validated_data)
 
 
-class EmployeeExpenseListSerializer(serializers.ModelSerializer):
+class EmployeeExpenseListSerializer(SoldeCalculeMixin, serializers.ModelSerializer):
     """Serializer pour la liste des dépenses employés"""
     employee_name = serializers.CharField(source='employee.full_name', read_only=True)
 
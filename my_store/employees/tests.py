@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Employee, EmployeeExpense
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class SoldeCalculeTests(TestCase):
+    """?solde=calcule doit donner le solde stocké quels que soient les filtres de la liste"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employee = Employee.objects.create(first_name="Awa", last_name="Diallo")
+        other = Employee.objects.create(first_name="Moussa", last_name="Traore")
+        for jour, remise, depense in [(1, 100, 10), (2, 50, 0), (3, 0, 5), (4, 20, 40)]:
+            for employee in (self.employee, other):
+                EmployeeExpense.objects.create(
+                    employee=employee, date=date(2025, 1, jour), nom_depense=f"Jour {jour}",
+                    somme_remise=Decimal(remise), somme_depense=Decimal(depense),
+                )
+        self.stored = dict(EmployeeExpense.objects.values_list('id', 'somme_restante'))
+
+    def assert_stored(self, rows):
+        self.assertTrue(rows)
+        for row in rows:
+            self.assertEqual(Decimal(str(row['somme_restante'])), self.stored[row['id']], row)
+
+    def test_pages(self):
+        seen, url = [], f'/api/employee-expenses/?solde=calcule&employee={self.employee.pk}&page_size=1'
+        while url:
+            data = self.client.get(url).json()
+            self.assert_stored(data['results'])
+            seen += [row['id'] for row in data['results']]
+            previous, url = data['previous'], data['next']
+        self.assertEqual(len(seen), 4)
+
+        # Retour par les curseurs précédents
+        while previous:
+            data = self.client.get(previous).json()
+            self.assert_stored(data['results'])
+            previous = data['previous']
+
+    def test_since(self):
+        cursor = timezone.now()
+        late = EmployeeExpense.objects.filter(employee=self.employee, date=date(2025, 1, 3)).get()
+        EmployeeExpense.objects.filter(pk=late.pk).update(updated_at=cursor + timedelta(seconds=1))
+
+        data = self.client.get(
+            '/api/employee-expenses/', {'solde': 'calcule', 'since': cursor.isoformat()}
+        ).json()
+        self.assertFalse(data['full'])
+        self.assertEqual([row['id'] for row in data['results']], [late.pk])
+        self.assert_stored(data['results'])
+
+    def test_date_range(self):
+        data = self.client.get(
+            '/api/employee-expenses/', {'solde': 'calcule', 'date_from': '2025-01-02', 'date_to': '2025-01-03'}
+        ).json()
+        self.assertEqual(len(data), 4)
+        self.assert_stored(data)
@@ -1,9 +1,16 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from django.db.models import Q
+from django.db.models import Q, Value
+from django.db.models.functions import Concat
 
 from .models import Employee, EmployeeExpense
+from my_store.query_plans import QueryPlanMixin
+from my_store.conditional import ConditionalGetMixin
+from sync.mixins import DeltaSyncMixin
+from my_store.xlsx import XlsxExportMixin
+from my_store.bulk import BulkWriteMixin
+from .ledger import rebalance_changes, with_running_balance
 from .serializers import (
     EmployeeSerializer,
     EmployeeListSerializer,
@@ -13,9 +20,13 @@ from .serializers import (
 )
 
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(QueryPlanMixin, ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Employee.objects.all()
     permission_classes = [AllowAny]
+    query_plans = {
+        'list': {},
+        'default': {'prefetch_related': ['allowed_users']},
+    }
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -104,10 +115,31 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             )
 
 
-class EmployeeExpenseViewSet(viewsets.ModelViewSet):
+class EmployeeExpenseViewSet(QueryPlanMixin, ConditionalGetMixin, DeltaSyncMixin, BulkWriteMixin, XlsxExportMixin, viewsets.ModelViewSet):
     """ViewSet pour gérer les dépenses employés"""
     queryset = EmployeeExpense.objects.all()
     permission_classes = [AllowAny]
+    # Noms affichés depuis ces relations : inclus dans l'ETag
+    etag_related = ['employee']
+    query_plans = {
+        'list': {'select_related': ['employee']},
+        'default': {'select_related': ['employee', 'created_by']},
+    }
+    # Export Excel du registre employé (export_xlsx/), dans l'ordre du registre
+    export_title = "Suivi employés"
+    export_filename = "registre_employes"
+    export_ordering = ['employee_id', 'date', 'id']
+    export_columns = [
+        ('Date', 'date', 12),
+        ('Employé', Concat('employee__first_name', Value(' '), 'employee__last_name'), 30),
+        ('Somme remise', 'somme_remise', 15),
+        ('Dépense', 'nom_depense', 30),
+        ('Tonnage', 'tonnage', 12),
+        ('Prix du jour', 'prix', 12),
+        ('Somme dépensée', 'somme_depense', 15),
+        ('Somme restante', 'somme_restante', 15),
+    ]
+    export_totals = ['somme_remise', 'somme_depense']
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -131,6 +163,11 @@ class EmployeeExpenseViewSet(viewsets.ModelViewSet):
         if date_to:
             queryset = queryset.filter(date__lte=date_to)
 
+        # ?solde=calcule : calculer la somme restante à la volée sur tout le
+        # registre de l'employé au lieu de lire la colonne stockée
+        if self.request.query_params.get('solde') == 'calcule':
+            queryset = with_running_balance(queryset)
+
         return queryset
 
     def perform_create(self, serializer):
@@ -140,3 +177,10 @@ class EmployeeExpenseViewSet(viewsets.ModelViewSet):
         else:
             serializer.save(created_by=None)
 
+    # Enregistrement groupé (bulk/) : soldes recalculés une fois par employé
+    # à partir de la première ligne touchée
+    def bulk_after_write(self, created, updated, deleted):
+        rebalance_changes(
+            [(None, expense) for expense in created] + updated + [(expense, None) for expense in deleted]
+        )
+
@@ -0,0 +1,75 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from expenses.models import Depense
+
+
+class _Rollback(Exception):
+    """Annule la transaction de benchmark une fois les mesures prises"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare le temps de réponse de depenses/ sans pagination et avec pagination "
+        "par curseur pour différents volumes (les données sont annulées à la fin)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', default='10000,100000,1000000',
+                            help="Volumes à tester, séparés par des virgules")
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--full-list-max', type=int, default=100000,
+                            help="Au-delà de ce volume, la liste complète n'est pas mesurée")
+
+    def _timed_get(self, client, url):
+        start = time.perf_counter()
+        response = client.get(url)
+        return response, (time.perf_counter() - start) * 1000
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        client = APIClient()
+        page_size = options['page_size']
+        for total in [int(n) for n in options['rows'].split(',') if n.strip()]:
+            try:
+                with transaction.atomic():
+                    debut = date.today() - timedelta(days=3650)
+                    for offset in range(0, total, 10000):
+                        Depense.objects.bulk_create([
+                            Depense(
+                                date=debut + timedelta(days=i % 3650),
+                                nom_depense=f"Dépense {i}",
+                                somme=Decimal(i % 50000),
+                            )
+                            for i in range(offset, min(offset + 10000, total))
+                        ], batch_size=2000)
+
+                    mesures = []
+                    if total <= options['full_list_max']:
+                        _, elapsed = self._timed_get(client, '/api/depenses/')
+                        mesures.append(f"liste complète={elapsed:.0f} ms")
+                    else:
+                        mesures.append("liste complète=ignorée")
+
+                    response, elapsed = self._timed_get(client, f'/api/depenses/?page_size={page_size}')
+                    mesures.append(f"1re page={elapsed:.0f} ms (X-Total-Count={response['X-Total-Count']})")
+
+                    # Suivre quelques curseurs pour mesurer une page profonde
+                    next_url = response.json()['next']
+                    for _ in range(9):
+                        if not next_url:
+                            break
+                        response, elapsed = self._timed_get(client, next_url)
+                        next_url = response.json()['next']
+                    mesures.append(f"10e page={elapsed:.0f} ms")
+
+                    self.stdout.write(f"lignes={total:>8} " + " ".join(mesures))
+                    raise _Rollback()
+            except _Rollback:
+                pass
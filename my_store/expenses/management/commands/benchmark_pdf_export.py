@@ -0,0 +1,85 @@
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from expenses.models import Depense
+
+BATCH_SIZE = 5000
+
+
+class _Rollback(Exception):
+    """Annule les dépenses générées une fois les mesures prises"""
+
+
+def _consume(response):
+    """Lit la réponse comme le ferait le client : morceau par morceau"""
+    if not response.streaming:
+        return len(response.content)
+    # Le client de test ferme la réponse à la fin de l'itération
+    return sum(len(chunk) for chunk in response.streaming_content)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de l'export PDF des dépenses (/api/depenses/export_pdf/) : "
+        "temps, pic mémoire Python et taille du fichier pour 10k, 100k et 500k lignes. "
+        "Les dépenses générées sont annulées à la fin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', default='10000,100000,500000',
+                            help="Volumes à tester, séparés par des virgules")
+        parser.add_argument('--no-memory', action='store_true',
+                            help="Ne pas mesurer le pic mémoire (tracemalloc double le temps d'exécution)")
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['rows'].split(','))
+        client = APIClient()
+        rnd = random.Random(42)
+        start_date = date(2025, 1, 1)
+        libelles = ['Carburant', 'Main d\'oeuvre', 'Transport', 'Sacs', 'Réparation camion', 'Électricité']
+
+        try:
+            with transaction.atomic():
+                created = 0
+                for size in sizes:
+                    # Compléter jusqu'à `size` lignes (les tailles sont cumulatives)
+                    while created < size:
+                        batch = min(BATCH_SIZE, size - created)
+                        Depense.objects.bulk_create([
+                            Depense(
+                                date=start_date + timedelta(days=rnd.randrange(365)),
+                                nom_depense=f"{rnd.choice(libelles)} {created + i}",
+                                somme=Decimal(rnd.randrange(500, 5_000_000)) / 100,
+                            )
+                            for i in range(batch)
+                        ])
+                        created += batch
+
+                    start = time.perf_counter()
+                    response = client.get('/api/depenses/export_pdf/')
+                    size_bytes = _consume(response)
+                    elapsed = time.perf_counter() - start
+                    if response.status_code != 200:
+                        self.stdout.write(self.style.ERROR(f"{size} lignes : HTTP {response.status_code}"))
+                        continue
+
+                    line = f"{size:>8} lignes : {elapsed:>7.2f} s  {size_bytes / 1024 / 1024:>7.1f} Mo"
+                    if not options['no_memory']:
+                        tracemalloc.start()
+                        _consume(client.get('/api/depenses/export_pdf/'))
+                        peak = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+                        line += f"  pic {peak / 1024 / 1024:>7.1f} Mo"
+                    self.stdout.write(line)
+                raise _Rollback()
+        except _Rollback:
+            pass
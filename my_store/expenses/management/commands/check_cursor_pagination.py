@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from expenses.models import Depense
+
+
+class _Rollback(Exception):
+    """Annule les dépenses créées pour la vérification"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Vérifie que la pagination par curseur de depenses/ parcourt toutes les "
+        "lignes une seule fois, dans l'ordre du tri, quand plus de 1000 dépenses "
+        "partagent la même date (et la même heure de saisie), en avant puis en "
+        "arrière. Échoue sinon. Les données sont annulées à la fin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ties', type=int, default=3000, help="Dépenses à la même date")
+        parser.add_argument('--page-size', type=int, default=1000)
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.check_walk(options['ties'], options['page_size'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def check_walk(self, ties, page_size):
+        # Quelques dates distinctes autour d'un bloc de `ties` lignes identiques
+        # (date et created_at) : la position se départage uniquement par l'ID
+        today = date.today()
+        rows = [Depense(date=today, nom_depense=f"Controle {i}", somme=Decimal(i)) for i in range(ties)]
+        rows += [
+            Depense(date=today + timedelta(days=offset), nom_depense=f"Controle autour {offset}", somme=Decimal(1))
+            for offset in (-2, -1, 1, 2)
+        ]
+        created = Depense.objects.bulk_create(rows, batch_size=2000)
+        ids = [row.pk for row in created]
+        Depense.objects.filter(pk__in=ids).update(created_at=created[0].created_at)
+
+        expected = list(
+            Depense.objects.filter(pk__in=ids).order_by('-date', '-created_at', '-id').values_list('pk', flat=True)
+        )
+        client = APIClient()
+
+        seen, pages = [], 0
+        url = f'/api/depenses/?search=Controle&page_size={page_size}'
+        while url:
+            data = self.get(client, url)
+            seen += [row['id'] for row in data['results']]
+            previous_url, url = data['previous'], data['next']
+            pages += 1
+            if pages > len(expected) // page_size + 2:
+                raise CommandError(f"Le parcours ne s'arrête pas ({pages} pages, {len(set(seen))} ID distincts)")
+        if seen != expected:
+            raise CommandError(
+                f"Parcours avant incorrect : {len(seen)} lignes lues, {len(set(seen))} distinctes, "
+                f"{len(expected)} attendues"
+            )
+        self.stdout.write(f"Avant : {pages} pages, {len(seen)} lignes, ordre conforme")
+
+        # Retour en arrière depuis la dernière page
+        back, url = [row['id'] for row in data['results']], previous_url
+        while url:
+            data = self.get(client, url)
+            back = [row['id'] for row in data['results']] + back
+            url = data['previous']
+        if back != expected:
+            raise CommandError(f"Parcours arrière incorrect : {len(back)} lignes lues, {len(set(back))} distinctes")
+        self.stdout.write(f"Arrière : {len(back)} lignes, ordre conforme")
+        self.stdout.write(self.style.SUCCESS(f"Pagination stable avec {ties} dépenses à la même date"))
+
+    def get(self, client, url):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f"{url} : HTTP {response.status_code}")
+        return response.json()
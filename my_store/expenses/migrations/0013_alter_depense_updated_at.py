@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-17 04:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0012_delete_argententry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='depense',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-17 05:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0013_alter_depense_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='depense',
+            index=models.Index(fields=['-date', '-created_at'], name='depense_date_idx'),
+        ),
+    ]
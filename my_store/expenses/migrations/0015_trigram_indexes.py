@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from my_store.indexes import CreateTrigramIndex
+
+
+class Migration(migrations.Migration):
+    """Index trigrammes des recherches __icontains (PostgreSQL uniquement, voir my_store.indexes)"""
+
+    dependencies = [
+        ('expenses', '0014_depense_depense_date_idx'),
+    ]
+
+    operations = [
+        CreateTrigramIndex('depense', 'nom_depense', 'depense_nom_trgm'),
+    ]
@@ -28,7 +28,7 @@ class Depense(models.Model):
         related_name='depenses_created'
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.nom_depense} - {self.date.strftime('%d/%m/%Y')} - {self.somme} FCFA"
@@ -37,6 +37,9 @@ class Depense(models.Model):
         verbose_name = "Dépense"
         verbose_name_plural = "Dépenses"
         ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['-date', '-created_at'], name='depense_date_idx'),
+        ]
 
 
 class PeriodStop(models.Model):
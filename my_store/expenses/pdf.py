@@ -0,0 +1,42 @@
+"""
+Rapport PDF des dépenses : une colonne Somme sommée par page, avec cumul
+(voir my_store.pdf pour la génération page par page).
+"""
+from decimal import Decimal
+
+from reportlab.lib.units import inch
+
+from my_store.pdf import write_table_pdf
+
+HEADERS = ['Date', 'Nom de la dépense', 'Somme (FCFA)']
+COL_WIDTHS = [1.5 * inch, 3.5 * inch, 1.5 * inch]
+
+
+def period_label(date_from=None, date_to=None):
+    period_text = "Période : "
+    if date_from and date_to:
+        period_text += f"Du {date_from} au {date_to}"
+    elif date_from:
+        period_text += f"À partir du {date_from}"
+    elif date_to:
+        period_text += f"Jusqu'au {date_to}"
+    else:
+        period_text += "Toutes les dépenses"
+    return period_text
+
+
+def write_depenses_pdf(rows, output, period_text):
+    """
+    Écrit le rapport dans `output` (fichier ou objet avec write()).
+    rows : itérable de tuples (date, nom_depense, somme), consommé une seule fois.
+    Retourne (nombre de lignes, nombre de pages, total).
+    """
+    rows = (
+        [date or 'N/A', nom or 'Sans nom', somme or Decimal('0.00')]
+        for date, nom, somme in rows
+    )
+    count, pages, totals = write_table_pdf(
+        output, "Rapport des Dépenses", HEADERS, rows, COL_WIDTHS,
+        totals=[2], label_column=1, subtitle=period_text,
+    )
+    return count, pages, totals[2]
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import ExportJob
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'ledger', 'format', 'status', 'row_count', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'format', 'ledger']
+    readonly_fields = ['id', 'spec_hash', 'created_at', 'started_at', 'finished_at']
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from exports.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = "Supprime les exports (fichiers et tâches) plus anciens que EXPORT_RETENTION_HOURS."
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(hours=getattr(settings, 'EXPORT_RETENTION_HOURS', 24))
+        jobs = ExportJob.objects.filter(created_at__lt=limite).exclude(status='running')
+        files = 0
+        for job in jobs.exclude(file='').iterator():
+            if job.file.storage.exists(job.file.name):
+                job.file.delete(save=False)
+                files += 1
+        deleted, _ = jobs.delete()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} export(s) supprimé(s), {files} fichier(s)"))
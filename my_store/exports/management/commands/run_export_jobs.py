@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from exports.models import ExportJob
+from exports.worker import requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Traite les exports en attente (à utiliser avec EXPORT_WORKERS=0, ou en "
+        "complément du pool du serveur web)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Traite la file une fois puis s'arrête")
+        parser.add_argument('--interval', type=float, default=2.0, help="Secondes entre deux passages")
+
+    def handle(self, *args, **options):
+        while True:
+            requeued = requeue_stale()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"{requeued} export(s) bloqué(s) remis en attente"))
+
+            pending = list(
+                ExportJob.objects.filter(status='pending').order_by('created_at').values_list('pk', flat=True)
+            )
+            for job_id in pending:
+                # run_job ignore les tâches déjà prises par un autre worker
+                run_job(job_id)
+                job = ExportJob.objects.only('status', 'row_count').get(pk=job_id)
+                self.stdout.write(f"{job_id} : {job.get_status_display()} ({job.row_count} lignes)")
+
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.9 on 2026-10-17 05:35
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('ledger', models.CharField(max_length=50, verbose_name='Registre')),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel'), ('pdf', 'PDF')], max_length=10, verbose_name='Format')),
+                ('filters', models.JSONField(blank=True, default=dict, verbose_name='Filtres')),
+                ('spec_hash', models.CharField(db_index=True, help_text='Registre, format, filtres et état des données : deux demandes identiques partagent la même tâche', max_length=64, verbose_name='Empreinte')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('done', 'Terminé'), ('failed', 'Échec')], db_index=True, default='pending', max_length=10)),
+                ('file', models.FileField(blank=True, upload_to='exports/', verbose_name='Fichier')),
+                ('filename', models.CharField(blank=True, max_length=255, verbose_name='Nom du fichier téléchargé')),
+                ('row_count', models.IntegerField(blank=True, null=True, verbose_name='Nombre de lignes')),
+                ('error', models.TextField(blank=True, verbose_name='Erreur')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': "Tâche d'export",
+                'verbose_name_plural': "Tâches d'export",
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
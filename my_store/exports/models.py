@@ -0,0 +1,58 @@
+import uuid
+
+from django.db import models
+from account.models import User
+
+
+class ExportJob(models.Model):
+    """
+    Export d'un registre (CSV, Excel ou PDF) généré en tâche de fond.
+    Le fichier est écrit sous MEDIA_ROOT/exports/ ; le client interroge la
+    tâche jusqu'à ce qu'elle soit terminée puis télécharge le fichier.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'En attente'),
+        ('running', 'En cours'),
+        ('done', 'Terminé'),
+        ('failed', 'Échec'),
+    ]
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel'),
+        ('pdf', 'PDF'),
+    ]
+
+    # UUID : l'identifiant sert aussi de lien de téléchargement, il ne doit pas se deviner
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    ledger = models.CharField(max_length=50, verbose_name="Registre")
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, verbose_name="Format")
+    filters = models.JSONField(default=dict, blank=True, verbose_name="Filtres")
+    spec_hash = models.CharField(
+        max_length=64,
+        db_index=True,
+        verbose_name="Empreinte",
+        help_text="Registre, format, filtres et état des données : deux demandes identiques partagent la même tâche"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    file = models.FileField(upload_to='exports/', blank=True, verbose_name="Fichier")
+    filename = models.CharField(max_length=255, blank=True, verbose_name="Nom du fichier téléchargé")
+    row_count = models.IntegerField(null=True, blank=True, verbose_name="Nombre de lignes")
+    error = models.TextField(blank=True, verbose_name="Erreur")
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='export_jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Export {self.ledger} ({self.format}) - {self.get_status_display()}"
+
+    class Meta:
+        verbose_name = "Tâche d'export"
+        verbose_name_plural = "Tâches d'export"
+        ordering = ['-created_at']
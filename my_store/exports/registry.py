@@ -0,0 +1,40 @@
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, QueryDict
+from django.utils.module_loading import import_string
+from rest_framework.request import Request
+
+# Registres exportables -> ViewSet qui fournit filtres (get_queryset) et
+# colonnes (export_columns, voir my_store.xlsx.XlsxExportMixin)
+LEDGERS = {
+    'stock': 'stock.views.StockEntryViewSet',
+    'chargements-camion': 'stock.views.CamionChargementViewSet',
+    'clients': 'customers.views.ClientChargementViewSet',
+    'employes': 'employees.views.EmployeeExpenseViewSet',
+    'depenses': 'expenses.views.DepenseViewSet',
+    'achats': 'purchases.views.AchatViewSet',
+}
+
+
+def build_view(ledger, filters, user=None):
+    """
+    Instance du ViewSet du registre, comme pour une requête GET portant
+    `filters` en paramètres : ses get_queryset() / get_export_queryset()
+    appliquent exactement les filtres de la liste.
+    """
+    viewset_class = import_string(LEDGERS[ledger])
+    http_request = HttpRequest()
+    http_request.method = 'GET'
+    query = QueryDict(mutable=True)
+    for key, value in (filters or {}).items():
+        query[key] = str(value)
+    http_request.GET = query
+    http_request.user = user or AnonymousUser()
+
+    request = Request(http_request)
+    request.user = http_request.user
+    view = viewset_class()
+    view.request = request
+    view.args, view.kwargs = (), {}
+    view.format_kwarg = None
+    view.action = 'export'
+    return view
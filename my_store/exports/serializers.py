@@ -0,0 +1,40 @@
+from rest_framework import serializers
+from .models import ExportJob
+from .registry import LEDGERS
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """Serializer pour les tâches d'export"""
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    download_url = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'ledger', 'format', 'filters', 'status', 'status_display', 'filename',
+            'row_count', 'error', 'download_url', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = [
+            'status', 'filename', 'row_count', 'error', 'created_at', 'started_at', 'finished_at'
+        ]
+
+    def get_download_url(self, obj):
+        if obj.status != 'done':
+            return None
+        request = self.context.get('request')
+        path = f'/api/exports/{obj.pk}/download/'
+        return request.build_absolute_uri(path) if request else path
+
+    def validate_ledger(self, value):
+        if value not in LEDGERS:
+            raise serializers.ValidationError(f"Registre inconnu. Choix possibles : {', '.join(sorted(LEDGERS))}")
+        return value
+
+    def validate_filters(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Les filtres doivent être un objet {paramètre: valeur}")
+        # Mêmes paramètres que la liste du registre (date_from, date_to, client...)
+        return {
+            str(key): str(item) for key, item in value.items()
+            if item not in (None, '') and not isinstance(item, (dict, list))
+        }
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import ExportJobViewSet
+
+router = DefaultRouter()
+router.register(r'exports', ExportJobViewSet, basename='export-job')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,101 @@
+import hashlib
+import json
+
+from django.http import FileResponse
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from .models import ExportJob
+from .registry import build_view
+from .serializers import ExportJobSerializer
+from .worker import enqueue, get_executor, stale_jobs
+from .writers import CONTENT_TYPES
+
+
+class ExportJobViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin,
+                       viewsets.GenericViewSet):
+    """
+    Exports de registres générés côté serveur :
+    - POST exports/ {ledger, format, filters} crée la tâche (202), ou renvoie
+      la tâche existante (200) si la même demande porte sur les mêmes données ;
+    - GET exports/{id}/ donne l'état (pending, running, done, failed) ;
+    - GET exports/{id}/download/ renvoie le fichier une fois terminé.
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [AllowAny]
+    list_limit = 50
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Démarre le pool du processus et reprend les tâches orphelines :
+        # un suivi d'export après redémarrage suffit à relancer la tâche
+        get_executor()
+
+    def get_queryset(self):
+        queryset = ExportJob.objects.all()
+        # La liste ne montre que les exports de l'utilisateur ; le détail reste
+        # accessible par son identifiant (UUID) comme lien de téléchargement
+        if self.action == 'list':
+            user = self.request.user
+            queryset = queryset.filter(created_by=user if user.is_authenticated else None)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        # Sans pagination (?page_size= / ?cursor=) : les 50 dernières tâches,
+        # limite appliquée après les filtres
+        return Response(self.get_serializer(queryset[:self.list_limit], many=True).data)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ledger = serializer.validated_data['ledger']
+        export_format = serializer.validated_data['format']
+        filters = serializer.validated_data.get('filters', {})
+        user = request.user if request.user.is_authenticated else None
+
+        # Empreinte de la demande : registre, format, filtres et état des
+        # données (même agrégat Count + Max(updated_at) que l'ETag des listes)
+        view = build_view(ledger, filters, user)
+        data_version = view.queryset_etag(view.request, view.get_export_queryset())
+        spec_hash = hashlib.sha256(json.dumps(
+            [ledger, export_format, sorted(filters.items()), data_version]
+        ).encode()).hexdigest()
+
+        # Une tâche bloquée (processus arrêté avant la fin) n'est pas réutilisée
+        existing = ExportJob.objects.filter(spec_hash=spec_hash).exclude(status='failed').exclude(
+            stale_jobs()
+        ).first()
+        if existing and (existing.status != 'done' or existing.file.storage.exists(existing.file.name)):
+            return Response(self.get_serializer(existing).data, status=status.HTTP_200_OK)
+
+        date_from, date_to = filters.get('date_from'), filters.get('date_to')
+        job = serializer.save(
+            filters=filters,
+            spec_hash=spec_hash,
+            created_by=user,
+            filename=f"{view.export_filename}_{date_from or 'all'}_{date_to or 'all'}.{export_format}",
+        )
+        enqueue(job)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Fichier de l'export terminé"""
+        job = self.get_object()
+        if job.status != 'done':
+            return Response(
+                {'error': f"Export non disponible ({job.get_status_display()})"},
+                status=status.HTTP_409_CONFLICT
+            )
+        if not job.file or not job.file.storage.exists(job.file.name):
+            return Response({'error': "Fichier d'export expiré, relancer l'export"}, status=status.HTTP_410_GONE)
+        return FileResponse(
+            job.file.open('rb'), as_attachment=True, filename=job.filename,
+            content_type=CONTENT_TYPES[job.format]
+        )
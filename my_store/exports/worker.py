@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ExportJob
+from .registry import build_view
+from .writers import write_export
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_next_recovery = 0.0
+
+
+def get_executor():
+    """
+    Pool de threads du processus, EXPORT_WORKERS threads (None si 0).
+    Au premier appel, puis au plus une fois par EXPORT_JOB_TIMEOUT_MINUTES,
+    reprend les tâches orphelines (voir recover_orphans).
+    """
+    global _executor, _next_recovery
+    workers = getattr(settings, 'EXPORT_WORKERS', 2)
+    if workers <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export')
+    now = time.monotonic()
+    if now >= _next_recovery:
+        with _executor_lock:
+            recover = now >= _next_recovery
+            if recover:
+                _next_recovery = now + _timeout_minutes() * 60
+        if recover:
+            recover_orphans(_executor)
+    return _executor
+
+
+def recover_orphans(executor):
+    """
+    Tâches laissées par un processus arrêté (redémarrage du serveur web) :
+    les tâches 'en cours' depuis plus d'EXPORT_JOB_TIMEOUT_MINUTES sont remises
+    en attente, et toutes les tâches en attente sont confiées au pool.
+    claim() garantit qu'une tâche déjà prise ailleurs n'est pas relancée.
+    """
+    requeued = requeue_stale()
+    if requeued:
+        logger.warning("%s export(s) bloqué(s) remis en attente", requeued)
+    pending = ExportJob.objects.filter(status='pending').order_by('created_at').values_list('pk', flat=True)
+    for job_id in list(pending):
+        executor.submit(run_job, job_id)
+
+
+def enqueue(job):
+    """
+    Lance la tâche dans le pool du processus après le commit. Avec
+    EXPORT_WORKERS = 0, elle reste en attente pour `manage.py run_export_jobs`.
+    """
+    executor = get_executor()
+    if executor is not None:
+        transaction.on_commit(lambda: executor.submit(run_job, job.pk))
+
+
+def claim(job_id):
+    """Passe la tâche en cours si elle est encore en attente (un seul worker la prend)"""
+    return ExportJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now()
+    ) == 1
+
+
+def run_job(job_id):
+    if not claim(job_id):
+        return
+    job = ExportJob.objects.select_related('created_by').get(pk=job_id)
+    directory = Path(settings.MEDIA_ROOT) / 'exports'
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f'exports/{job.pk}.{job.format}'
+    try:
+        view = build_view(job.ledger, job.filters, job.created_by)
+        job.row_count = write_export(view, job.format, Path(settings.MEDIA_ROOT) / name, job.filters)
+        job.file.name = name
+        job.status = 'done'
+    except Exception as exc:
+        logger.exception("Échec de l'export %s (%s, %s)", job.pk, job.ledger, job.format)
+        job.status = 'failed'
+        job.error = str(exc)
+    finally:
+        job.finished_at = timezone.now()
+        job.save(update_fields=['row_count', 'file', 'status', 'error', 'finished_at'])
+        # Thread du pool : ne pas garder la connexion ouverte entre deux tâches
+        close_old_connections()
+
+
+def _timeout_minutes():
+    return getattr(settings, 'EXPORT_JOB_TIMEOUT_MINUTES', 30)
+
+
+def stale_jobs(minutes=None):
+    """Tâches en attente ou en cours depuis plus d'EXPORT_JOB_TIMEOUT_MINUTES"""
+    limite = timezone.now() - timedelta(minutes=minutes or _timeout_minutes())
+    return Q(status='pending', created_at__lt=limite) | Q(status='running', started_at__lt=limite)
+
+
+def requeue_stale(minutes=None):
+    """Remet en attente les tâches 'en cours' abandonnées (processus redémarré)"""
+    limite = timezone.now() - timedelta(minutes=minutes or _timeout_minutes())
+    return ExportJob.objects.filter(status='running', started_at__lt=limite).update(status='pending', started_at=None)
@@ -0,0 +1,64 @@
+import csv
+
+from my_store.pdf import POINTS_PER_CHAR, write_table_pdf
+from my_store.xlsx import write_xlsx
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+}
+
+
+def _period(filters):
+    date_from, date_to = filters.get('date_from'), filters.get('date_to')
+    if date_from and date_to:
+        return f"Période : Du {date_from} au {date_to}"
+    if date_from:
+        return f"Période : À partir du {date_from}"
+    if date_to:
+        return f"Période : Jusqu'au {date_to}"
+    return None
+
+
+def write_export(view, export_format, path, filters=None):
+    """
+    Écrit le registre de `view` (voir exports.registry.build_view) dans `path`.
+    Les lignes sont lues en une requête, par paquets, et écrites au fil de
+    l'eau quel que soit le format. Retourne le nombre de lignes.
+    """
+    columns = view.get_export_columns()
+    queryset = view.get_export_queryset()
+    sums = {}
+    count = 0
+
+    def rows():
+        nonlocal count
+        for row in columns.rows(queryset, sums):
+            count += 1
+            yield row
+
+    if export_format == 'csv':
+        # BOM et point-virgule : ouverture directe dans Excel en français
+        with open(path, 'w', newline='', encoding='utf-8-sig') as output:
+            writer = csv.writer(output, delimiter=';')
+            writer.writerow(columns.headers)
+            writer.writerows(rows())
+            writer.writerows(columns.footer(sums))
+    elif export_format == 'xlsx':
+        with open(path, 'wb') as output:
+            write_xlsx(output, view.export_title, columns.headers, rows(),
+                       column_widths=columns.widths, footer=lambda: columns.footer(sums))
+    elif export_format == 'pdf':
+        totals = [columns.index(source) for source in columns.totals]
+        with open(path, 'wb') as output:
+            write_table_pdf(
+                output, view.export_title, columns.headers, rows(),
+                [width * POINTS_PER_CHAR for width in columns.widths],
+                totals=totals,
+                label_column=next((i for i in range(len(columns.headers)) if i not in totals), 0),
+                subtitle=_period(filters or {}),
+            )
+    else:
+        raise ValueError(f"Format d'export inconnu : {export_format}")
+    return count
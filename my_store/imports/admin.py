@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import ImportJob
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'filename', 'ledger', 'dry_run', 'status', 'row_count', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'dry_run', 'ledger']
+    readonly_fields = ['id', 'progress', 'report', 'created_at', 'started_at', 'finished_at']
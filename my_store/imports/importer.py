@@ -0,0 +1,433 @@
+"""
+Import d'un classeur Excel dans les registres (voir imports.ledgers).
+
+Le classeur est lu en flux (openpyxl read_only, valeurs calculées des
+formules) : seules les lignes d'un paquet (IMPORT_CHUNK_SIZE) sont en mémoire.
+Chaque paquet est validé champ par champ (field.clean du modèle), complété des
+champs dérivés (my_store.derived) puis écrit par bulk_create dans une
+transaction qui enregistre aussi l'avancement de la tâche : après une
+interruption, l'import reprend au premier paquet non écrit.
+
+Les lignes invalides sont écartées et listées dans le rapport ; les clients et
+employés inconnus sont créés à partir de leur nom (premier mot = prénom). En
+fin d'import, les soldes cumulés des clients et employés touchés sont
+recalculés et les agrégats en cache invalidés. Les sorties de stock ne sont
+pas contrôlées contre le disponible : l'import reprend un historique.
+"""
+import logging
+import re
+import time
+from datetime import date, datetime
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.backends.utils import format_number
+from openpyxl import load_workbook
+from openpyxl.utils.datetime import from_excel
+
+from my_store.derived import derive, derived_fields, to_decimal
+
+from .ledgers import LEDGERS, detect_ledger, map_columns, normalize_header
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMATS = ['%d/%m/%Y', '%d/%m/%y', '%Y-%m-%d', '%d-%m-%Y', '%d.%m.%Y']
+# Lignes parcourues pour trouver la ligne d'en-têtes d'une feuille
+HEADER_SCAN_ROWS = 10
+# Erreurs détaillées et noms créés gardés dans le rapport (les compteurs restent exacts)
+REPORT_LIMIT = 100
+
+
+def _is_blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _is_empty(value):
+    """Cellule sans saisie ; 0 compte comme vide (lignes de formules non remplies)"""
+    return _is_blank(value) or (value == 0 and not isinstance(value, bool))
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Date saisie sans format de cellule : numéro de série Excel
+        try:
+            return from_excel(value).date()
+        except (OverflowError, ValueError):
+            return value
+    if isinstance(value, str):
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(value.strip(), fmt).date()
+            except ValueError:
+                continue
+    return value
+
+
+def _to_int(value):
+    if isinstance(value, float):
+        # 12.0 -> 12 ; 12.5 reste refusé par la validation
+        return int(value) if value.is_integer() else str(value)
+    if isinstance(value, str):
+        text = value.strip().replace(' ', '')
+        if re.fullmatch(r'-?\d+(\.0+)?', text):
+            return int(text.split('.')[0])
+    return value
+
+
+def _decimal_converter(field):
+    quantum = Decimal(1).scaleb(-field.decimal_places)
+
+    def convert(value):
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str):
+            value = re.sub(r'[\s \xa0]', '', value).replace(',', '.')
+        try:
+            # Flottants Excel (12.300000000001) arrondis aux décimales de la colonne
+            return to_decimal(value).quantize(quantum, rounding=ROUND_HALF_UP)
+        except (InvalidOperation, TypeError, ValueError):
+            return value
+    return convert
+
+
+def _char_converter(field):
+    # Choix reconnus par leur code ou leur libellé ('Entrée', 'entree', 'Djaradougou', '1')
+    choices = {}
+    for code, label in field.flatchoices:
+        choices[normalize_header(code)] = code
+        choices[normalize_header(label)] = code
+
+    def convert(value):
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        value = str(value).strip()
+        if choices:
+            return choices.get(normalize_header(value), value)
+        return value
+    return convert
+
+
+def converter(field):
+    """Conversion d'une valeur de cellule vers le type du champ, avant field.clean"""
+    if isinstance(field, models.DateField):
+        return _to_date
+    if isinstance(field, models.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, models.IntegerField):
+        return _to_int
+    if isinstance(field, (models.CharField, models.TextField)):
+        return _char_converter(field)
+    return lambda value: value
+
+
+def person_key(name):
+    return ' '.join(str(name).split()).casefold()
+
+
+class People:
+    """
+    Clients ou employés indexés par nom complet, chargés une seule fois.
+    Un nom inconnu est créé (sauf en simulation) et compté dans le rapport.
+    """
+
+    def __init__(self, label, create, user=None):
+        self.model = apps.get_model(label)
+        self.create = create
+        self.extra = {'created_by': user} if any(f.name == 'created_by' for f in self.model._meta.fields) else {}
+        self.ids = {}
+        for pk, first_name, last_name in self.model.objects.order_by('id').values_list('id', 'first_name', 'last_name'):
+            self.ids.setdefault(person_key(f'{first_name} {last_name}'), pk)
+        self.new = {}
+
+    def resolve(self, name):
+        key = person_key(name)
+        pk = self.ids.get(key)
+        if pk is None and key not in self.new:
+            self.new[key] = ' '.join(str(name).split())
+            if self.create:
+                # Même découpage que la saisie : premier mot = prénom, reste = nom
+                parts = self.new[key].split(None, 1)
+                person = self.model.objects.create(
+                    first_name=parts[0], last_name=parts[1] if len(parts) > 1 else '', **self.extra
+                )
+                pk = self.ids[key] = person.pk
+        return pk
+
+
+class LedgerImport:
+    """Exécution d'une tâche d'import (reprise à partir de job.progress)"""
+
+    def __init__(self, job, chunk_size=None, log=None):
+        self.job = job
+        self.chunk_size = chunk_size or getattr(settings, 'IMPORT_CHUNK_SIZE', 2000)
+        self.log = log or (lambda message: logger.info(message))
+        self.people = {}
+
+        if job.dry_run:
+            # Simulation : rien n'a été écrit, on repart du début
+            job.progress, job.report, job.row_count = {}, {}, 0
+        self.progress = job.progress or {}
+        self.progress.setdefault('sheets', {})
+        self.progress.setdefault('touched', {})
+        self.report = job.report or {}
+        self.report['dry_run'] = job.dry_run
+        self.report.setdefault('sheets', [])
+
+    def run(self):
+        started = time.monotonic()
+        resumed_rows = sum(sheet.get('rows', 0) + sheet.get('empty', 0) for sheet in self.report['sheets'])
+        workbook = load_workbook(self.job.source, read_only=True, data_only=True)
+        try:
+            for worksheet in workbook.worksheets:
+                self.import_sheet(worksheet)
+        finally:
+            workbook.close()
+        if not self.job.dry_run:
+            self.finalize()
+
+        sheets = self.report['sheets']
+        for total in ('rows', 'valid', 'invalid', 'imported'):
+            self.report[total] = sum(sheet.get(total, 0) for sheet in sheets)
+        self.report['new_people'] = {
+            label: {'count': len(people.new), 'names': list(people.new.values())[:REPORT_LIMIT]}
+            for label, people in self.people.items()
+        }
+        duration = time.monotonic() - started
+        self.report['duration'] = round(duration, 2)
+        # Débit de cette exécution (sans les lignes écrites avant une reprise)
+        read = sum(sheet.get('rows', 0) + sheet.get('empty', 0) for sheet in sheets) - resumed_rows
+        self.report['rows_per_second'] = round(read / duration) if duration else None
+        self.job.progress, self.job.report = self.progress, self.report
+        self.job.row_count = self.report['imported']
+        return self.report
+
+    def sheet_report(self, title):
+        for sheet in self.report['sheets']:
+            if sheet['sheet'] == title:
+                return sheet
+        sheet = {'sheet': title}
+        self.report['sheets'].append(sheet)
+        return sheet
+
+    def import_sheet(self, worksheet):
+        title = worksheet.title
+        done = self.progress['sheets'].get(title)
+        if done == 'done':
+            return
+        report = self.sheet_report(title)
+        rows = worksheet.iter_rows(values_only=True)
+
+        # Ligne d'en-têtes : la première avec au moins deux libellés
+        header_row, headers = None, None
+        for number, row in enumerate(islice(rows, HEADER_SCAN_ROWS), start=1):
+            labels = [normalize_header(value) if isinstance(value, str) else '' for value in row]
+            if sum(1 for label in labels if label) >= 2:
+                header_row, headers = number, labels
+                break
+        if headers is None:
+            report['skipped'] = "Aucune ligne d'en-têtes"
+            self.progress['sheets'][title] = 'done'
+            return
+
+        key = self.job.ledger or detect_ledger(title, headers)
+        mapping, computed, unknown = map_columns(key, headers) if key else ({}, [], [])
+        report.update({
+            'ledger': key,
+            'header_row': header_row,
+            'columns': {field: headers[index] for field, index in mapping.items()},
+            'computed': computed,
+            'unknown': unknown,
+        })
+        if key is None:
+            report['skipped'] = "Registre non reconnu (nom de feuille ou en-têtes)"
+            self.progress['sheets'][title] = 'done'
+            return
+        missing = [field for field in LEDGERS[key]['required'] if field not in mapping]
+        if missing:
+            report['skipped'] = f"Colonnes manquantes : {', '.join(missing)}"
+            self.progress['sheets'][title] = 'done'
+            return
+
+        for counter in ('rows', 'empty', 'valid', 'invalid', 'imported'):
+            report.setdefault(counter, 0)
+        report.setdefault('errors', [])
+        sheet = SheetImport(self, key, mapping, report)
+
+        # Reprise : les lignes déjà écrites sont sautées sans être validées
+        done = done or 0
+        first = header_row + 1 + done
+        chunk = []
+        for number, row in enumerate(islice(rows, done, None), start=first):
+            chunk.append((number, row))
+            if len(chunk) >= self.chunk_size:
+                self.write_chunk(title, sheet, chunk)
+                chunk = []
+        if chunk:
+            self.write_chunk(title, sheet, chunk)
+        self.progress['sheets'][title] = 'done'
+        self.save_progress()
+
+    def write_chunk(self, title, sheet, chunk):
+        with transaction.atomic():
+            sheet.write(chunk)
+            self.progress['sheets'][title] = self.progress['sheets'].get(title, 0) + len(chunk)
+            self.save_progress()
+        self.log(
+            f"{title} ({sheet.key}) : {self.progress['sheets'][title]} lignes lues, "
+            f"{sheet.report['valid']} valides, {sheet.report['imported']} importées"
+        )
+
+    def save_progress(self):
+        """Avancement et rapport, dans la transaction du paquet écrit"""
+        if self.job.dry_run:
+            return
+        ImportJob.objects.filter(pk=self.job.pk).update(
+            progress=self.progress,
+            report=self.report,
+            row_count=sum(sheet.get('imported', 0) for sheet in self.report['sheets']),
+        )
+
+    def get_people(self, label):
+        if label not in self.people:
+            self.people[label] = People(label, create=not self.job.dry_run, user=self.job.created_by)
+        return self.people[label]
+
+    def finalize(self):
+        """Soldes cumulés des clients / employés touchés, puis caches des registres importés"""
+        from caching.cache import invalidate
+        from customers.ledger import rebalance_clients
+        from employees.ledger import rebalance_employee
+
+        touched = self.progress['touched']
+        client_ids = sorted(touched.get('clients', []))
+        # Par groupes de clients : une requête fenêtrée par groupe, mémoire bornée
+        for start in range(0, len(client_ids), 100):
+            rebalance_clients(client_ids[start:start + 100])
+        for employee_id in sorted(touched.get('employes', [])):
+            rebalance_employee(employee_id)
+
+        labels = {LEDGERS[sheet['ledger']]['model'] for sheet in self.report['sheets'] if sheet.get('imported')}
+        if labels:
+            invalidate(*labels)
+        self.progress['finalized'] = True
+        self.save_progress()
+
+
+class SheetImport:
+    """Validation et écriture des paquets de lignes d'une feuille"""
+
+    def __init__(self, importer, key, mapping, report):
+        self.importer = importer
+        self.user = importer.job.created_by
+        self.key = key
+        self.report = report
+        spec = LEDGERS[key]
+        self.model = apps.get_model(spec['model'])
+        self.prepare = spec.get('prepare')
+        self.mapping = list(mapping.items())
+        self.person_field, person_label = spec.get('person', (None, None))
+        self.people = importer.get_people(person_label) if person_label else None
+
+        # (nom, champ, conversion) des colonnes lues ; les champs '_...' ne
+        # servent qu'à prepare()
+        self.fields = []
+        for name, _index in self.mapping:
+            if name.startswith('_') or name == self.person_field:
+                continue
+            field = self.model._meta.get_field(name)
+            self.fields.append((name, field, converter(field)))
+        self.derived = [self.model._meta.get_field(name) for name in derived_fields(self.model._meta.label)]
+
+    def build(self, values):
+        """Instance validée d'une ligne, ou (None, erreurs par champ)"""
+        instance = self.model(created_by=self.user)
+        errors = {}
+        for name, field, convert in self.fields:
+            value = values.get(name)
+            if _is_blank(value):
+                if field.has_default() or field.blank:
+                    # Cellule vide : valeur par défaut du modèle
+                    continue
+                value = '' if isinstance(field, (models.CharField, models.TextField)) else None
+            try:
+                setattr(instance, name, field.clean(value if value in (None, '') else convert(value), instance))
+            except ValidationError as exc:
+                errors[name] = exc.messages
+
+        # Client / employé résolu (ou créé) seulement pour une ligne valide, voir write()
+        if self.person_field and _is_blank(values.get(self.person_field)):
+            errors[self.person_field] = ["Nom requis"]
+        return instance, errors
+
+    def check_derived(self, instance):
+        """Champs calculés représentables dans leur colonne (même formatage qu'à l'écriture)"""
+        errors = {}
+        for field in self.derived:
+            value = getattr(instance, field.name)
+            if value is None:
+                continue
+            try:
+                format_number(to_decimal(value), field.max_digits, field.decimal_places)
+            except (InvalidOperation, ValueError):
+                errors[field.name] = [f"Valeur calculée trop grande ({value})"]
+        return errors
+
+    def reject(self, number, errors):
+        self.report['invalid'] += 1
+        if len(self.report['errors']) < REPORT_LIMIT:
+            self.report['errors'].append({'row': number, 'errors': errors})
+
+    def write(self, chunk):
+        rows = []
+        for number, row in chunk:
+            values = {name: row[index] if index < len(row) else None for name, index in self.mapping}
+            if all(_is_empty(value) for value in values.values()):
+                self.report['empty'] += 1
+                continue
+            self.report['rows'] += 1
+            if self.prepare:
+                values = self.prepare(values)
+            instance, errors = self.build(values)
+            if errors:
+                self.reject(number, errors)
+                continue
+            rows.append((number, instance, values.get(self.person_field) if self.person_field else None))
+
+        derive([instance for _number, instance, _name in rows])
+        instances = []
+        for number, instance, name in rows:
+            errors = self.check_derived(instance)
+            if errors:
+                self.reject(number, errors)
+                continue
+            if name is not None:
+                # Après toutes les validations : une ligne refusée ne crée
+                # personne et n'apparaît pas dans les nouveaux noms du rapport
+                pk = self.people.resolve(name)
+                if pk is not None:
+                    setattr(instance, f'{self.person_field}_id', pk)
+            instances.append(instance)
+        self.report['valid'] += len(instances)
+        if self.importer.job.dry_run or not instances:
+            return
+
+        created = self.model.objects.bulk_create(instances, batch_size=self.importer.chunk_size)
+        self.report['imported'] += len(created)
+        if self.key == 'stock':
+            # bulk_create sans signaux : soldes de stock dans la même transaction
+            from stock.balances import apply_deltas, change_deltas
+            apply_deltas(change_deltas([(None, entry) for entry in created]))
+        elif self.person_field:
+            touched = self.importer.progress['touched'].setdefault(self.key, [])
+            ids = set(touched)
+            ids.update(getattr(instance, f'{self.person_field}_id') for instance in created)
+            touched[:] = sorted(ids)
@@ -0,0 +1,205 @@
+"""
+Registres importables depuis un classeur Excel.
+
+Pour chaque registre : le modèle, les noms de feuille reconnus, et pour chaque
+champ les en-têtes acceptés, par ordre de préférence (ceux des feuilles tenues
+à la main, type KSS.xlsx, et ceux des exports Excel de l'application). Les
+en-têtes sont comparés après normalize_header() : sans accents, unités entre
+parenthèses ni ponctuation, en majuscules.
+
+- person : champ lié à un client / employé, retrouvé par son nom complet ;
+- computed : colonnes recalculées à l'import (soldes cumulés), ignorées ;
+- required : champs sans lesquels une feuille n'est pas de ce registre ;
+- prepare : ajustement des valeurs brutes d'une ligne avant validation.
+"""
+import re
+import unicodedata
+from decimal import Decimal, InvalidOperation
+
+from my_store.derived import to_decimal
+
+# Poids d'un sac vide dans les registres clients tenus sur Excel (KSS.xlsx :
+# POID NET = TONNAGE - No SAC × 0,5)
+POIDS_SAC_VIDE_REGISTRE = Decimal('0.5')
+
+
+def normalize_header(value):
+    """'Poids par sac (kg)' -> 'POIDS PAR SAC'"""
+    text = unicodedata.normalize('NFKD', str(value or '')).encode('ascii', 'ignore').decode()
+    text = re.sub(r'\(.*?\)', ' ', text)
+    return ' '.join(re.sub(r'[^A-Za-z0-9]+', ' ', text).upper().split())
+
+
+def _client_gross_tonnage(values):
+    """
+    Registre client : sans poids net, le tonnage vient de la colonne TONNAGE
+    brute (quand une colonne POID NET existe) moins le poids des sacs vides.
+    """
+    brut = values.pop('_tonnage_brut', None)
+    if values.get('tonnage') not in (None, '') or brut in (None, ''):
+        return values
+    try:
+        sacs = to_decimal(values.get('nombre_sacs') or 0)
+        vide = values.get('poids_sac_vide')
+        vide = POIDS_SAC_VIDE_REGISTRE if vide in (None, '') else to_decimal(vide)
+        values['tonnage'] = to_decimal(brut) - sacs * vide
+    except (InvalidOperation, TypeError, ValueError):
+        # Valeur non numérique : la validation du champ tonnage la signalera
+        values['tonnage'] = brut
+    return values
+
+
+LEDGERS = {
+    'stock': {
+        'model': 'stock.StockEntry',
+        'sheets': ['STOCK', 'ENTREES STOCK', 'ENTREES DE STOCK', 'REGISTRE STOCK'],
+        'columns': {
+            'date': ['DATE'],
+            'type_operation': ['OPERATION', 'TYPE OPERATION', 'TYPE D OPERATION'],
+            'numero_magasin': ['MAGASIN', 'NUMERO MAGASIN', 'NO MAGASIN'],
+            'nom_fournisseur': ['FOURNISSEUR CLIENT', 'FOURNISSEUR', 'NOM FOURNISSEUR', 'NOM DU FOURNISSEUR'],
+            'type_denree': ['DENREE', 'TYPE DENREE', 'TYPE DE DENREE', 'PRODUIT'],
+            'nombre_sacs': ['NOMBRE DE SACS', 'NOMBRE SACS', 'NB SACS', 'NO SAC', 'SACS'],
+            'poids_par_sac': ['POIDS PAR SAC', 'POIDS SAC', 'POID PAR SAC'],
+            'notes': ['NOTES', 'OBSERVATIONS'],
+        },
+        'computed': ['TONNAGE TOTAL', 'TONNAGE'],
+        'required': ['date', 'type_denree'],
+    },
+    'clients': {
+        'model': 'customers.ClientChargement',
+        'sheets': ['CLIENTS', 'SUIVI CLIENTS', 'REGISTRE CLIENTS'],
+        'person': ('client', 'customers.Customer'),
+        'columns': {
+            'date_chargement': ['DATE', 'DATE CHARGEMENT', 'DATE DU CHARGEMENT'],
+            'client': ['CLIENT', 'NOM', 'NOM CLIENT', 'NOM DU CLIENT'],
+            'type_operation': ['OPERATION', 'TYPE OPERATION'],
+            'nom_produit': ['PRODUIT', 'NOM PRODUIT', 'NOM DU PRODUIT'],
+            'n_camion': ['CAMION', 'NO CAMION', 'NUMERO CAMION'],
+            'nombre_sacs': ['NOMBRE DE SACS', 'NO SAC', 'NB SACS', 'SACS'],
+            'poids': ['POIDS', 'POIDS PAR SAC'],
+            'poids_sac_vide': ['POIDS SAC VIDE'],
+            # Poids net ; TONNAGE seul est le tonnage net des exports
+            'tonnage': ['POID NET', 'POIDS NET', 'TONNAGE NET', 'TONNAGE'],
+            # TONNAGE à côté d'un POID NET : poids brut (KSS.xlsx)
+            '_tonnage_brut': ['TONNAGE', 'TONNAGE BRUT', 'POIDS BRUT'],
+            'prix': ['PRIX', 'PRIX PAR KG', 'PRIX KG'],
+            'somme_totale': ['SOMME TOTALE', 'ARGENT', 'MONTANT'],
+            'avance': ['AVANCE'],
+            'notes': ['NOTES'],
+        },
+        'computed': ['SOMME RESTANTE', 'REST ARGENT', 'RESTE ARGENT', 'RESTE'],
+        'required': ['date_chargement', 'client'],
+        'prepare': _client_gross_tonnage,
+    },
+    'employes': {
+        'model': 'employees.EmployeeExpense',
+        'sheets': ['EMPLOYES', 'SUIVI EMPLOYES', 'REGISTRE EMPLOYES'],
+        'person': ('employee', 'employees.Employee'),
+        'columns': {
+            'date': ['DATE'],
+            'employee': ['EMPLOYE', 'NOM', 'NOM EMPLOYE'],
+            'somme_remise': ['SOMME REMISE', 'REMISE', 'ARGENT REMIS'],
+            'nom_depense': ['DEPENSE', 'NOM DEPENSE', 'NOM DE LA DEPENSE', 'LIBELLE'],
+            'tonnage': ['TONNAGE', 'POID NET', 'POIDS NET'],
+            'prix': ['PRIX DU JOUR', 'PRIX'],
+            'somme_depense': ['SOMME DEPENSEE', 'SOMME DEPENSE', 'DEPENSE SOMME'],
+            'notes': ['NOTES'],
+        },
+        'computed': ['SOMME RESTANTE', 'REST ARGENT', 'RESTE'],
+        'required': ['date', 'employee'],
+    },
+    'depenses': {
+        'model': 'expenses.Depense',
+        'sheets': ['DEPENSES', 'REGISTRE DEPENSES'],
+        'columns': {
+            'date': ['DATE'],
+            'nom_personne': ['PERSONNE', 'NOM PERSONNE', 'NOM DE LA PERSONNE', 'NOM'],
+            'nom_depense': ['NOM DE LA DEPENSE', 'NOM DEPENSE', 'DEPENSE', 'LIBELLE'],
+            'somme': ['SOMME', 'MONTANT'],
+            'notes': ['NOTES'],
+        },
+        'computed': [],
+        'required': ['date', 'nom_depense', 'somme'],
+    },
+    'achats': {
+        'model': 'purchases.Achat',
+        'sheets': ['ACHATS', 'REGISTRE ACHATS'],
+        'columns': {
+            'date': ['DATE'],
+            'nom_client': ['CLIENT', 'NOM CLIENT', 'NOM DU CLIENT'],
+            'nom_produit': ['PRODUIT', 'NOM PRODUIT', 'NOM DU PRODUIT'],
+            'quantite_kg': ['QUANTITE', 'QUANTITE KG', 'POIDS'],
+            'prix_unitaire': ['PRIX UNITAIRE', 'PRIX'],
+            'gros': ['GROS'],
+            'unit': ['UNIT', 'UNITE'],
+            'notes': ['NOTES'],
+        },
+        'computed': ['SOMME TOTALE', 'MONTANT'],
+        'required': ['date', 'nom_produit', 'quantite_kg', 'prix_unitaire'],
+    },
+    'argent': {
+        'model': 'argent.ArgentEntry',
+        'sheets': ['ARGENT', 'ENTREES ARGENT', 'REGISTRE ARGENT'],
+        'columns': {
+            'date': ['DATE'],
+            'nom_recuperant': ['RECUPERANT', 'NOM DE RECUPERANT', 'NOM RECUPERANT'],
+            'nom_boss': ['BOSS', 'NOM DU BOSS', 'NOM BOSS'],
+            'lieu_retrait': ['LIEU DE RETRAIT', 'LIEU RETRAIT', 'LIEU'],
+            'somme': ['SOMME', 'MONTANT'],
+            'nom_recevant': ['RECEVANT', 'NOM DE RECEVANT', 'NOM RECEVANT'],
+            'date_sortie': ['DATE SORTIE', 'DATE DE SORTIE'],
+            'somme_sortie': ['SOMME SORTIE', 'SORTIE'],
+        },
+        'computed': [],
+        'required': ['date', 'somme'],
+    },
+}
+
+
+def map_columns(key, headers):
+    """
+    Associe les en-têtes normalisés d'une feuille aux champs du registre :
+    ({champ: index de colonne}, en-têtes calculés ignorés, en-têtes inconnus).
+    Chaque colonne sert au plus une fois, les champs étant servis dans leur
+    ordre de déclaration.
+    """
+    spec = LEDGERS[key]
+    positions = {}
+    for index, header in enumerate(headers):
+        if header:
+            positions.setdefault(header, index)
+    used = set()
+    mapping = {}
+    for field, aliases in spec['columns'].items():
+        for alias in aliases:
+            index = positions.get(alias)
+            if index is not None and index not in used:
+                mapping[field] = index
+                used.add(index)
+                break
+    computed = [header for header, index in positions.items() if index not in used and header in spec['computed']]
+    unknown = [header for header, index in positions.items() if index not in used and header not in spec['computed']]
+    return mapping, computed, unknown
+
+
+def detect_ledger(title, headers):
+    """
+    Registre d'une feuille : par son nom, sinon par ses en-têtes (le registre
+    dont les champs obligatoires sont présents et qui reconnaît le plus de
+    colonnes). None si aucun ne convient ou en cas d'égalité.
+    """
+    name = normalize_header(title)
+    for key, spec in LEDGERS.items():
+        if name in spec['sheets']:
+            return key
+
+    scores = []
+    for key, spec in LEDGERS.items():
+        mapping, _computed, _unknown = map_columns(key, headers)
+        if all(field in mapping for field in spec['required']):
+            scores.append((len(mapping), key))
+    scores.sort(reverse=True)
+    if not scores or (len(scores) > 1 and scores[0][0] == scores[1][0]):
+        return None
+    return scores[0][1]
@@ -0,0 +1,118 @@
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from imports.ledgers import LEDGERS
+from imports.models import ImportJob
+from imports.worker import requeue_for_resume, requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe un classeur Excel dans les registres (stock, clients, employés, "
+        "dépenses, achats, argent), par paquets et avec reprise après interruption. "
+        "--dry-run valide tout sans rien écrire et affiche le rapport."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help="Classeur .xlsx à importer")
+        parser.add_argument('--ledger', choices=sorted(LEDGERS), help="Registre de toutes les feuilles (détecté par défaut)")
+        parser.add_argument('--dry-run', action='store_true', help="Simulation : rapport sans écriture")
+        parser.add_argument('--chunk-size', type=int, help="Lignes par transaction (IMPORT_CHUNK_SIZE par défaut)")
+        parser.add_argument('--resume', metavar='JOB_ID', help="Reprend une tâche interrompue ou échouée")
+        parser.add_argument('--pending', action='store_true', help="Traite les imports en attente (IMPORT_WORKERS=0)")
+        parser.add_argument('--json', action='store_true', help="Affiche le rapport complet en JSON")
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            requeued = requeue_stale()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"{requeued} import(s) bloqué(s) remis en attente"))
+            pending = ImportJob.objects.filter(status='pending').order_by('created_at').values_list('pk', flat=True)
+            for job_id in list(pending):
+                self.run(job_id, options)
+            return
+
+        if options['resume']:
+            job = ImportJob.objects.filter(pk=options['resume']).first()
+            if job is None:
+                raise CommandError(f"Tâche d'import introuvable : {options['resume']}")
+            if job.status == 'done':
+                raise CommandError("Cette tâche est déjà terminée")
+            # Tâche échouée, ou restée 'en cours' après l'arrêt du processus ;
+            # une tâche en attente est simplement lancée
+            if job.status != 'pending' and not requeue_for_resume(job.pk):
+                raise CommandError(
+                    f"Tâche en cours depuis {timezone.localtime(job.started_at):%H:%M:%S} : reprise possible après "
+                    f"{settings.IMPORT_JOB_TIMEOUT_MINUTES} min sans fin d'exécution"
+                )
+        elif options['path']:
+            path = os.path.abspath(options['path'])
+            if not os.path.exists(path):
+                raise CommandError(f"Fichier introuvable : {path}")
+            job = ImportJob.objects.create(
+                path=path,
+                filename=os.path.basename(path),
+                ledger=options['ledger'] or '',
+                dry_run=options['dry_run'],
+            )
+            self.stdout.write(f"Tâche {job.pk} (reprise : --resume {job.pk})")
+        else:
+            raise CommandError("Indiquer un classeur, --resume JOB_ID ou --pending")
+
+        job = self.run(job.pk, options)
+        if job.status == 'failed':
+            raise CommandError(f"Import interrompu : {job.error} (reprendre avec --resume {job.pk})")
+
+    def run(self, job_id, options):
+        started = time.monotonic()
+        run_job(job_id, chunk_size=options['chunk_size'], log=self.stdout.write)
+        job = ImportJob.objects.get(pk=job_id)
+        self.print_report(job, time.monotonic() - started, options['json'])
+        return job
+
+    def print_report(self, job, duration, as_json):
+        report = job.report
+        if as_json:
+            self.stdout.write(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+            return
+
+        mode = "Simulation" if job.dry_run else "Import"
+        for sheet in report.get('sheets', []):
+            self.stdout.write(f"\n[{sheet['sheet']}] registre : {sheet.get('ledger') or '-'}")
+            if sheet.get('skipped'):
+                self.stdout.write(self.style.WARNING(f"  ignorée : {sheet['skipped']}"))
+                continue
+            columns = ', '.join(f"{header} -> {field}" for field, header in sheet['columns'].items())
+            self.stdout.write(f"  colonnes : {columns}")
+            if sheet['computed']:
+                self.stdout.write(f"  recalculées : {', '.join(sheet['computed'])}")
+            if sheet['unknown']:
+                self.stdout.write(self.style.WARNING(f"  non reconnues : {', '.join(sheet['unknown'])}"))
+            self.stdout.write(
+                f"  {sheet['rows']} lignes, {sheet['empty']} vides, {sheet['valid']} valides, "
+                f"{sheet['invalid']} refusées, {sheet['imported']} importées"
+            )
+            for error in sheet['errors'][:10]:
+                details = '; '.join(f"{field}: {' '.join(messages)}" for field, messages in error['errors'].items())
+                self.stdout.write(f"    ligne {error['row']} : {details}")
+            if sheet['invalid'] > 10:
+                self.stdout.write(f"    ... {sheet['invalid'] - 10} autre(s)")
+
+        for label, people in report.get('new_people', {}).items():
+            if people['count']:
+                verbe = "à créer" if job.dry_run else "créés"
+                names = ', '.join(people['names'][:10])
+                self.stdout.write(f"\n{label} {verbe} : {people['count']} ({names}{', ...' if people['count'] > 10 else ''})")
+
+        summary = (
+            f"\n{mode} ({job.get_status_display().lower()}) : {report.get('rows', 0)} lignes, "
+            f"{report.get('invalid', 0)} refusées, {job.row_count} importées en {duration:.1f} s "
+            f"({report.get('rows_per_second') or 0} lignes/s)"
+        )
+        style = self.style.SUCCESS if job.status == 'done' else self.style.ERROR
+        self.stdout.write(style(summary))
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.9 on 2026-10-17 05:58
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file', models.FileField(blank=True, upload_to='imports/', verbose_name='Classeur envoyé')),
+                ('path', models.CharField(blank=True, help_text='Classeur lu sur le disque du serveur (manage.py import_ledger)', max_length=500, verbose_name='Chemin du classeur')),
+                ('filename', models.CharField(blank=True, max_length=255, verbose_name='Nom du fichier')),
+                ('ledger', models.CharField(blank=True, help_text='Registre de toutes les feuilles ; vide : détecté par feuille (nom ou en-têtes)', max_length=50, verbose_name='Registre')),
+                ('dry_run', models.BooleanField(default=False, verbose_name='Simulation')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('done', 'Terminé'), ('failed', 'Échec')], db_index=True, default='pending', max_length=10)),
+                ('progress', models.JSONField(blank=True, default=dict, verbose_name='Avancement')),
+                ('report', models.JSONField(blank=True, default=dict, verbose_name='Rapport')),
+                ('row_count', models.IntegerField(default=0, verbose_name='Lignes importées')),
+                ('error', models.TextField(blank=True, verbose_name='Erreur')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': "Tâche d'import",
+                'verbose_name_plural': "Tâches d'import",
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
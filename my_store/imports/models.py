@@ -0,0 +1,65 @@
+import uuid
+
+from django.db import models
+from account.models import User
+
+
+class ImportJob(models.Model):
+    """
+    Import d'un classeur Excel (feuilles de registres) exécuté en tâche de fond.
+    L'avancement est enregistré avec chaque paquet de lignes importé : une
+    tâche interrompue reprend là où elle s'était arrêtée. En simulation
+    (dry_run), rien n'est écrit, seul le rapport est produit.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'En attente'),
+        ('running', 'En cours'),
+        ('done', 'Terminé'),
+        ('failed', 'Échec'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    file = models.FileField(upload_to='imports/', blank=True, verbose_name="Classeur envoyé")
+    path = models.CharField(
+        max_length=500,
+        blank=True,
+        verbose_name="Chemin du classeur",
+        help_text="Classeur lu sur le disque du serveur (manage.py import_ledger)"
+    )
+    filename = models.CharField(max_length=255, blank=True, verbose_name="Nom du fichier")
+    ledger = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name="Registre",
+        help_text="Registre de toutes les feuilles ; vide : détecté par feuille (nom ou en-têtes)"
+    )
+    dry_run = models.BooleanField(default=False, verbose_name="Simulation")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    progress = models.JSONField(default=dict, blank=True, verbose_name="Avancement")
+    report = models.JSONField(default=dict, blank=True, verbose_name="Rapport")
+    row_count = models.IntegerField(default=0, verbose_name="Lignes importées")
+    error = models.TextField(blank=True, verbose_name="Erreur")
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='import_jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def source(self):
+        """Chemin du classeur à lire"""
+        return self.path or self.file.path
+
+    def __str__(self):
+        mode = "simulation" if self.dry_run else "import"
+        return f"Import {self.filename} ({mode}) - {self.get_status_display()}"
+
+    class Meta:
+        verbose_name = "Tâche d'import"
+        verbose_name_plural = "Tâches d'import"
+        ordering = ['-created_at']
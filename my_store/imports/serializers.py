@@ -0,0 +1,31 @@
+import os
+
+from rest_framework import serializers
+from .ledgers import LEDGERS
+from .models import ImportJob
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """Serializer pour les tâches d'import"""
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    file = serializers.FileField(write_only=True)
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'file', 'filename', 'ledger', 'dry_run', 'status', 'status_display',
+            'row_count', 'report', 'error', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = [
+            'filename', 'status', 'row_count', 'report', 'error', 'created_at', 'started_at', 'finished_at'
+        ]
+
+    def validate_file(self, value):
+        if os.path.splitext(value.name)[1].lower() not in ('.xlsx', '.xlsm'):
+            raise serializers.ValidationError("Classeur Excel attendu (.xlsx)")
+        return value
+
+    def validate_ledger(self, value):
+        if value and value not in LEDGERS:
+            raise serializers.ValidationError(f"Registre inconnu. Choix possibles : {', '.join(sorted(LEDGERS))}")
+        return value
@@ -0,0 +1,89 @@
+from django.conf import settings
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from .models import ImportJob
+from .serializers import ImportJobSerializer
+from .worker import enqueue, requeue_for_resume
+
+
+class ImportJobViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin,
+                       viewsets.GenericViewSet):
+    """
+    Imports de classeurs Excel dans les registres :
+    - POST imports/ (multipart : file, ledger optionnel, dry_run) crée la tâche (202) ;
+    - GET imports/{id}/ donne l'état et le rapport (lignes valides, erreurs,
+      colonnes reconnues, clients / employés à créer) ;
+    - POST imports/{id}/resume/ relance une tâche échouée (ou interrompue par
+      un redémarrage) là où elle s'était arrêtée ;
+    - POST imports/{id}/apply/ importe pour de bon le classeur d'une simulation.
+    """
+    serializer_class = ImportJobSerializer
+    permission_classes = [AllowAny]
+    list_limit = 50
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
+
+    def get_queryset(self):
+        queryset = ImportJob.objects.all()
+        if self.action == 'list':
+            user = self.request.user
+            queryset = queryset.filter(created_by=user if user.is_authenticated else None)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        # Sans pagination (?page_size= / ?cursor=) : les 50 dernières tâches,
+        # limite appliquée après les filtres
+        return Response(self.get_serializer(queryset[:self.list_limit], many=True).data)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save(
+            filename=serializer.validated_data['file'].name,
+            created_by=request.user if request.user.is_authenticated else None,
+        )
+        enqueue(job)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['post'])
+    def resume(self, request, pk=None):
+        """Reprend une tâche échouée ou abandonnée au premier paquet non écrit"""
+        job = self.get_object()
+        if not requeue_for_resume(job.pk):
+            return Response(
+                {'error': (
+                    "Seule une tâche en échec, ou en cours depuis plus de "
+                    f"{settings.IMPORT_JOB_TIMEOUT_MINUTES} min, peut être reprise ({job.get_status_display()})"
+                )},
+                status=status.HTTP_409_CONFLICT
+            )
+        job.refresh_from_db()
+        enqueue(job)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['post'])
+    def apply(self, request, pk=None):
+        """Nouvelle tâche d'import réel sur le classeur d'une simulation terminée"""
+        job = self.get_object()
+        if not job.dry_run or job.status != 'done':
+            return Response(
+                {'error': "Seule une simulation terminée peut être appliquée"},
+                status=status.HTTP_409_CONFLICT
+            )
+        applied = ImportJob.objects.create(
+            file=job.file.name,
+            path=job.path,
+            filename=job.filename,
+            ledger=job.ledger,
+            dry_run=False,
+            created_by=request.user if request.user.is_authenticated else job.created_by,
+        )
+        enqueue(applied)
+        return Response(self.get_serializer(applied).data, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,92 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .importer import LedgerImport
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Pool de threads du processus, IMPORT_WORKERS threads (None si 0)"""
+    global _executor
+    workers = getattr(settings, 'IMPORT_WORKERS', 1)
+    if workers <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='import')
+    return _executor
+
+
+def enqueue(job):
+    """
+    Lance la tâche dans le pool du processus après le commit. Avec
+    IMPORT_WORKERS = 0, elle reste en attente pour `manage.py import_ledger --pending`.
+    """
+    executor = get_executor()
+    if executor is not None:
+        transaction.on_commit(lambda: executor.submit(run_job, job.pk))
+
+
+def claim(job_id):
+    """Passe la tâche en cours si elle est encore en attente (un seul worker la prend)"""
+    return ImportJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now(), error=''
+    ) == 1
+
+
+def run_job(job_id, chunk_size=None, log=None):
+    """Exécute (ou reprend) l'import ; False si la tâche était déjà prise"""
+    if not claim(job_id):
+        return False
+    job = ImportJob.objects.select_related('created_by').get(pk=job_id)
+    try:
+        LedgerImport(job, chunk_size=chunk_size, log=log).run()
+        job.status = 'done'
+    except Exception as exc:
+        # L'avancement écrit paquet par paquet est conservé : la tâche reprendra
+        # au premier paquet non écrit (resume/)
+        logger.exception("Échec de l'import %s (%s)", job.pk, job.filename)
+        job.refresh_from_db(fields=['progress', 'report', 'row_count'])
+        job.status = 'failed'
+        job.error = str(exc)
+    finally:
+        job.finished_at = timezone.now()
+        job.save(update_fields=['progress', 'report', 'row_count', 'status', 'error', 'finished_at'])
+        # Thread du pool : ne pas garder la connexion ouverte entre deux tâches
+        close_old_connections()
+    return True
+
+
+def _stale_limit(minutes=None):
+    return timezone.now() - timedelta(minutes=minutes or getattr(settings, 'IMPORT_JOB_TIMEOUT_MINUTES', 60))
+
+
+def requeue_stale(minutes=None):
+    """Remet en attente les tâches 'en cours' abandonnées (processus redémarré) ; elles reprennent où elles en étaient"""
+    return ImportJob.objects.filter(status='running', started_at__lt=_stale_limit(minutes)).update(
+        status='pending', started_at=None
+    )
+
+
+def requeue_for_resume(job_id, minutes=None):
+    """
+    Remet en attente une tâche échouée, ou restée 'en cours' depuis plus
+    d'IMPORT_JOB_TIMEOUT_MINUTES (processus arrêté). False si la tâche tourne
+    encore : deux exécutions écriraient les mêmes paquets.
+    """
+    return ImportJob.objects.filter(pk=job_id).filter(
+        Q(status='failed') | Q(status='running', started_at__lt=_stale_limit(minutes))
+    ).update(status='pending', started_at=None) == 1
@@ -43,22 +43,13 @@ class InvoiceCreateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         items_data = validated_data.pop('items')
+
+        # Generate invoice number (annual sequence: INV-2026-00001)
+        # before the first save: invoice_number is unique
+        from sequences.services import next_number
+        validated_data['invoice_number'] = next_number('INV', yearly=True)
         invoice = Invoice.objects.create(**validated_data)
-        
-        # Generate invoice number
-        import random
-        from django.utils import timezone
-        timestamp = timezone.now().strftime('%Y%m%d%H%M%S')
-        random_suffix = random.randint(1000, 9999)
-        invoice_number = f"INV-{timestamp}-{random_suffix}"
-        
-        # Ensure uniqueness
-        while Invoice.objects.filter(invoice_number=invoice_number).exists():
-            random_suffix = random.randint(1000, 9999)
-            invoice_number = f"INV-{timestamp}-{random_suffix}"
-        
-        invoice.invoice_number = invoice_number
-        
+
         # Create invoice items
         for item_data in items_data:
             InvoiceItem.objects.create(
@@ -3,14 +3,23 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Invoice, InvoiceItem
+from my_store.query_plans import QueryPlanMixin
+from my_store.conditional import ConditionalGetMixin
+from sync.mixins import DeltaSyncMixin
 from .serializers import (
     InvoiceSerializer, InvoiceCreateSerializer, InvoiceListSerializer, InvoiceItemSerializer
 )
 
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(QueryPlanMixin, ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Invoice.objects.all()
     permission_classes = [IsAuthenticated]
+    # Client et lignes imbriquées : inclus dans l'ETag
+    etag_related = ['customer', 'order', 'items']
+    query_plans = {
+        'list': {'select_related': ['customer']},
+        'default': {'select_related': ['customer', 'order'], 'prefetch_related': ['items']},
+    }
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Le flux temps réel /api/events/ (Server-Sent Events, app sync) nécessite ce
+point d'entrée : uvicorn my_store.asgi:application
 """
 
 import os
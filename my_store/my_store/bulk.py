@@ -0,0 +1,256 @@
+"""
+Enregistrement groupé pour les pages de type tableur : une seule requête
+POST <liste>/bulk/ au lieu d'un POST / PUT / DELETE par ligne.
+
+    {
+        "upserts": [
+            {"id": 12, "somme": "1500"},                     # modification (partielle)
+            {"ref": "ligne-3", "date": "2025-01-02", ...},   # création
+        ],
+        "deletes": [7, 8]
+    }
+
+Chaque ligne est validée par le serializer de création ou de modification du
+ViewSet ; les lignes invalides sont renvoyées une par une dans "errors" et les
+autres sont écrites dans une seule transaction (bulk_create, bulk_update,
+une suppression groupée). "ref" (facultatif) est renvoyé tel quel avec la
+ligne créée ou l'erreur, pour retrouver la ligne côté frontend. Une ligne
+modifiée et supprimée dans la même requête est refusée (la suppression est
+faite).
+
+    {"created": [...], "updated": [...], "deleted": [7, 8], "errors": [
+        {"operation": "upsert", "index": 1, "ref": "ligne-3", "id": null, "errors": {...}}
+    ]}
+"""
+import copy
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .derived import derive, derived_fields
+
+
+def write_column(model, field, values, updated_at=None):
+    """
+    Écrit {pk: valeur} dans une colonne (et updated_at) par un UPDATE
+    paramétré exécuté en executemany, par paquets de 2000 lignes. Pour les
+    réécritures de milliers de lignes (soldes cumulés), où bulk_update()
+    construit et compile un CASE WHEN par ligne. Retourne le nombre de lignes.
+    """
+    if not values:
+        return 0
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    opts = model._meta
+    target = opts.get_field(field)
+    stamp = opts.get_field('updated_at')
+    sql = (
+        f"UPDATE {quote(opts.db_table)} SET {quote(target.column)} = %s, {quote(stamp.column)} = %s "
+        f"WHERE {quote(opts.pk.column)} = %s"
+    )
+    stamp_value = stamp.get_db_prep_save(updated_at or timezone.now(), connection)
+    params = [(target.get_db_prep_save(value, connection), stamp_value, pk) for pk, value in values.items()]
+    with connection.cursor() as cursor:
+        for start in range(0, len(params), 2000):
+            cursor.executemany(sql, params[start:start + 2000])
+    return len(params)
+
+
+class BulkRow:
+    """Une ligne de la requête : position, instance à écrire et état précédent"""
+
+    def __init__(self, index, ref, instance, previous=None, fields=()):
+        self.index = index
+        self.ref = ref
+        self.instance = instance
+        self.previous = previous
+        self.fields = list(fields)
+
+    @property
+    def created(self):
+        return self.previous is None
+
+
+class BulkWriteMixin:
+    """
+    Action POST bulk/ pour les ModelViewSet (voir le format ci-dessus).
+
+    Les champs dérivés (tonnages, sommes totales) sont calculés pour tout le
+    lot par my_store.derived, comme dans save().
+
+    Points d'extension, appelés dans la transaction :
+    - bulk_validate(rows, deleted) : contrôles portant sur tout le lot,
+      retourne {index: erreurs} ;
+    - bulk_after_write(created, updated, deleted) : recalculs groupés après
+      écriture (soldes, projections).
+    """
+    bulk_max_rows = 1000
+
+    def get_bulk_serializer_class(self, instance):
+        # Mêmes serializers que POST (création) et PATCH (modification)
+        current = self.action
+        self.action = 'partial_update' if instance is not None else 'create'
+        try:
+            return self.get_serializer_class()
+        finally:
+            self.action = current
+
+    def bulk_validate(self, rows, deleted):
+        return {}
+
+    def bulk_after_write(self, created, updated, deleted):
+        pass
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Créations, modifications et suppressions groupées dans une seule transaction"""
+        upserts = request.data.get('upserts', [])
+        deletes = request.data.get('deletes', [])
+        if not isinstance(upserts, list) or not isinstance(deletes, list):
+            return Response(
+                {'error': "Format attendu : {\"upserts\": [...], \"deletes\": [...]}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(upserts) + len(deletes) > self.bulk_max_rows:
+            return Response(
+                {'error': f"Trop de lignes dans un même enregistrement (maximum {self.bulk_max_rows})"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            delete_ids = [int(pk) for pk in deletes]
+        except (TypeError, ValueError):
+            return Response({'error': "deletes doit être une liste d'IDs"}, status=status.HTTP_400_BAD_REQUEST)
+
+        model = self.get_queryset().model
+        errors = []
+
+        # IDs des modifications contrôlés avant toute lecture : une ligne à
+        # l'ID invalide, ou aussi supprimée dans la même requête, est refusée
+        # seule (sans quoi son écart de stock serait appliqué à une ligne supprimée)
+        parsed = []
+        for index, data in enumerate(upserts):
+            if not isinstance(data, dict):
+                errors.append(self._bulk_error(index, None, None, {'non_field_errors': ["Ligne invalide"]}))
+                continue
+            data = dict(data)
+            ref = data.pop('ref', None)
+            raw_pk = data.pop('id', None)
+            try:
+                pk = int(raw_pk) if raw_pk not in (None, '') else None
+            except (TypeError, ValueError):
+                errors.append(self._bulk_error(index, ref, raw_pk, {'id': ["ID invalide"]}))
+                continue
+            if pk is not None and pk in delete_ids:
+                errors.append(self._bulk_error(
+                    index, ref, pk, {'id': ["Ligne également supprimée dans cet enregistrement"]}
+                ))
+                continue
+            parsed.append((index, ref, pk or None, data))
+
+        with transaction.atomic():
+            ids = [pk for _, _, pk, _ in parsed if pk]
+            existing = model._default_manager.select_for_update().in_bulk(ids + delete_ids)
+
+            rows = []
+            for index, ref, pk, data in parsed:
+                instance = existing.get(pk) if pk else None
+                if pk and instance is None:
+                    errors.append(self._bulk_error(index, ref, pk, {'id': ["Ligne introuvable"]}))
+                    continue
+
+                serializer_class = self.get_bulk_serializer_class(instance)
+                serializer = serializer_class(
+                    instance, data=data, partial=instance is not None,
+                    context={**self.get_serializer_context(), 'bulk': True}
+                )
+                if not serializer.is_valid():
+                    errors.append(self._bulk_error(index, ref, pk, serializer.errors))
+                    continue
+
+                if instance is None:
+                    row = BulkRow(index, ref, model(**serializer.validated_data))
+                    if request.user and request.user.is_authenticated:
+                        row.instance.created_by = request.user
+                else:
+                    row = BulkRow(index, ref, instance, copy.copy(instance), serializer.validated_data)
+                    for field, value in serializer.validated_data.items():
+                        setattr(instance, field, value)
+                rows.append(row)
+            derive([row.instance for row in rows])
+
+            missing = [pk for pk in delete_ids if pk not in existing]
+            for pk in missing:
+                errors.append({'operation': 'delete', 'index': None, 'ref': None, 'id': pk,
+                               'errors': {'id': ["Ligne introuvable"]}})
+            deleted = [existing[pk] for pk in delete_ids if pk in existing]
+
+            batch_errors = self.bulk_validate(rows, deleted)
+            for row in rows:
+                if row.index in batch_errors:
+                    errors.append(self._bulk_error(row.index, row.ref, row.instance.pk, batch_errors[row.index]))
+            rows = [row for row in rows if row.index not in batch_errors]
+
+            created = [row for row in rows if row.created]
+            updated = [row for row in rows if not row.created]
+            self._bulk_write(model, created, updated, deleted)
+            self.bulk_after_write(
+                [row.instance for row in created],
+                [(row.previous, row.instance) for row in updated],
+                deleted,
+            )
+
+        return Response(self._bulk_response(created, updated, deleted, errors))
+
+    def _bulk_error(self, index, ref, pk, detail):
+        return {'operation': 'upsert', 'index': index, 'ref': ref, 'id': pk, 'errors': detail}
+
+    def _bulk_write(self, model, created, updated, deleted):
+        if deleted:
+            # QuerySet.delete() envoie post_delete pour chaque ligne (tombstones, soldes de stock)
+            model._default_manager.filter(pk__in=[instance.pk for instance in deleted]).delete()
+        if created:
+            model._default_manager.bulk_create([row.instance for row in created], batch_size=500)
+        if updated:
+            now = timezone.now()
+            fields = {'updated_at'}
+            for row in updated:
+                # bulk_update ne déclenche pas auto_now : le flux ?since= doit voir la modification
+                row.instance.updated_at = now
+                fields.update(row.fields)
+            fields.update(derived_fields(model._meta.label))
+            model._default_manager.bulk_update([row.instance for row in updated], sorted(fields), batch_size=500)
+
+        # bulk_create / bulk_update n'envoient pas post_save : diffuser les
+        # changements (SSE) et invalider les agrégats en cache explicitement
+        from caching.cache import invalidate
+        from sync.signals import publish_change
+        label = model._meta.label_lower
+        for row in created:
+            publish_change(label, row.instance.pk, 'create')
+        for row in updated:
+            publish_change(label, row.instance.pk, 'update')
+        if created or updated:
+            invalidate(model._meta.label)
+
+    def _bulk_response(self, created, updated, deleted, errors):
+        ids = [row.instance.pk for row in created + updated]
+        # Relire les lignes écrites : les soldes recalculés après écriture sont à jour
+        instances = self.filter_queryset(self.get_queryset()).filter(pk__in=ids).in_bulk() if ids else {}
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+
+        def serialize(row):
+            data = serializer_class(instances[row.instance.pk], context=context).data
+            if row.ref is not None:
+                data = {**data, 'ref': row.ref}
+            return data
+
+        return {
+            'created': [serialize(row) for row in created if row.instance.pk in instances],
+            'updated': [serialize(row) for row in updated if row.instance.pk in instances],
+            'deleted': [instance.pk for instance in deleted],
+            'errors': sorted(errors, key=lambda error: (error['index'] is None, error['index'] or 0)),
+        }
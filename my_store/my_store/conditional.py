@@ -0,0 +1,79 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    GET conditionnel (ETag / If-None-Match) pour les listes et les détails.
+
+    Le validateur est calculé sans sérialiser les lignes :
+    - liste : une seule requête Count + Max(updated_at) sur le queryset filtré,
+      combinée aux paramètres de la requête et à l'utilisateur ;
+    - détail : updated_at de l'objet.
+    Si le client renvoie le même ETag, la réponse est 304 Not Modified
+    avant toute sérialisation.
+
+    etag_related : relations directes (ex: ['client'], ['achats']) dont le
+    contenu change aussi la réponse (nom du client affiché, lignes imbriquées...) :
+    leur nombre et, si elles l'ont, leur dernière modification entrent dans
+    le validateur.
+    """
+    etag_field = 'updated_at'
+    etag_related = ()
+
+    def _etag(self, request, *parts):
+        user = getattr(request, 'user', None)
+        signature = '|'.join(str(part) for part in (
+            self.get_queryset().model._meta.label_lower,
+            getattr(user, 'pk', None),
+            getattr(request, 'accepted_media_type', ''),
+            sorted(request.query_params.lists()),
+            *parts,
+        ))
+        return quote_etag(hashlib.md5(signature.encode()).hexdigest())
+
+    def _not_modified(self, request, etag):
+        etags = parse_etags(request.headers.get('If-None-Match', ''))
+        return etag in etags or '*' in etags
+
+    def _with_etag(self, response, etag):
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+            # Le navigateur doit revalider à chaque fois (données qui changent souvent)
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def queryset_etag(self, request, queryset):
+        aggregates = {
+            'nombre': Count('pk', distinct=True),
+            'derniere_modification': Max(self.etag_field),
+        }
+        for path in self.etag_related:
+            aggregates[f'{path}_nombre'] = Count(path, distinct=True)
+            related_model = queryset.model._meta.get_field(path).related_model
+            if any(field.name == self.etag_field for field in related_model._meta.get_fields()):
+                aggregates[path] = Max(f'{path}__{self.etag_field}')
+        values = queryset.order_by().aggregate(**aggregates)
+        return self._etag(request, *(values[name] for name in aggregates))
+
+    def list(self, request, *args, **kwargs):
+        etag = self.queryset_etag(request, self.filter_queryset(self.get_queryset()))
+        if self._not_modified(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return self._with_etag(super().list(request, *args, **kwargs), etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        if self.etag_related:
+            etag = self.queryset_etag(request, self.get_queryset().filter(pk=instance.pk))
+        else:
+            etag = self._etag(request, instance.pk, getattr(instance, self.etag_field))
+        if self._not_modified(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        serializer = self.get_serializer(instance)
+        return self._with_etag(Response(serializer.data), etag)
@@ -0,0 +1,126 @@
+"""
+Champs dérivés des registres (tonnages, sommes totales), en un seul endroit
+pour save() et pour les écritures groupées (bulk_create / bulk_update), qui
+ne passent pas par save().
+
+Chaque règle est une fonction pure des valeurs d'une ligne, déclarée dans
+DERIVED_FIELDS avec le champ calculé et ses champs sources. Elle s'applique :
+- à une liste d'instances : derive(instances), une règle à la fois sur tout
+  le lot (save() appelle derive([self])) ;
+- à des colonnes {champ: [valeurs]} : derive_columns(label, colonnes), pour
+  les imports qui construisent les instances après coup.
+
+Les calculs sont faits en Decimal exact (les floats sont convertis par leur
+représentation texte) ; l'arrondi aux décimales de la colonne est fait par
+le champ à l'écriture, de la même façon pour save() et bulk_create().
+"""
+from decimal import Decimal
+
+ZERO = Decimal('0.00')
+
+
+def to_decimal(value):
+    """Decimal exact d'un nombre (int, str, Decimal ou float saisi) ; None reste None"""
+    if value is None or isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        return Decimal(str(value))
+    return Decimal(value)
+
+
+def stock_tonnage(nombre_sacs, poids_par_sac):
+    """StockEntry : tonnage total = nombre de sacs × poids par sac"""
+    return to_decimal(nombre_sacs) * to_decimal(poids_par_sac)
+
+
+def camion_tonnage(nombre_sacs, poids_par_sac, tonnage_total):
+    """
+    CamionChargement : nombre de sacs × poids par sac, seulement si les deux
+    sont renseignés et que le tonnage n'a pas été saisi manuellement (0 ou vide).
+    """
+    if nombre_sacs is None or poids_par_sac is None or tonnage_total:
+        return tonnage_total
+    if to_decimal(nombre_sacs) > 0 and to_decimal(poids_par_sac) > 0:
+        return to_decimal(nombre_sacs) * to_decimal(poids_par_sac)
+    return tonnage_total
+
+
+def client_tonnage(nombre_sacs, poids, poids_sac_vide, tonnage):
+    """
+    ClientChargement : nombre de sacs × (poids - poids du sac vide), si le
+    tonnage n'a pas été saisi manuellement et que sacs et poids sont fournis.
+    """
+    if tonnage is not None or nombre_sacs is None or poids is None:
+        return tonnage
+    tonnage = to_decimal(nombre_sacs) * to_decimal(poids)
+    if poids_sac_vide is not None and to_decimal(poids_sac_vide) > 0:
+        tonnage -= to_decimal(nombre_sacs) * to_decimal(poids_sac_vide)
+    return tonnage
+
+
+def client_somme_totale(tonnage, prix, somme_totale):
+    """ClientChargement : tonnage × prix, sauf somme saisie manuellement"""
+    if somme_totale is not None:
+        return somme_totale
+    if tonnage is None or prix is None:
+        return None
+    return to_decimal(tonnage) * to_decimal(prix)
+
+
+def achat_somme_totale(quantite_kg, prix_unitaire):
+    """Achat : quantité × prix unitaire (0 si l'un des deux manque)"""
+    if quantite_kg is None or prix_unitaire is None:
+        return ZERO
+    return to_decimal(quantite_kg) * to_decimal(prix_unitaire)
+
+
+# Règles par modèle, appliquées dans l'ordre : (champ calculé, fonction, champs sources)
+DERIVED_FIELDS = {
+    'stock.StockEntry': [
+        ('tonnage_total', stock_tonnage, ['nombre_sacs', 'poids_par_sac']),
+    ],
+    'stock.CamionChargement': [
+        ('tonnage_total', camion_tonnage, ['nombre_sacs', 'poids_par_sac', 'tonnage_total']),
+    ],
+    'customers.ClientChargement': [
+        ('tonnage', client_tonnage, ['nombre_sacs', 'poids', 'poids_sac_vide', 'tonnage']),
+        ('somme_totale', client_somme_totale, ['tonnage', 'prix', 'somme_totale']),
+    ],
+    'purchases.Achat': [
+        ('somme_totale', achat_somme_totale, ['quantite_kg', 'prix_unitaire']),
+    ],
+}
+
+
+def derived_fields(label):
+    """Champs calculés d'un modèle ('app.Model'), à inclure dans un bulk_update"""
+    return [field for field, _function, _sources in DERIVED_FIELDS.get(label, [])]
+
+
+def derive(instances):
+    """
+    Calcule les champs dérivés d'instances d'un même modèle, en place.
+    Retourne la liste des instances.
+    """
+    instances = list(instances)
+    if not instances:
+        return instances
+    rules = DERIVED_FIELDS.get(instances[0]._meta.label, [])
+    for field, function, sources in rules:
+        for instance in instances:
+            setattr(instance, field, function(*[getattr(instance, source) for source in sources]))
+    return instances
+
+
+def derive_columns(label, columns):
+    """
+    Calcule les champs dérivés à partir de colonnes {champ: [valeurs]} de même
+    longueur (une colonne absente vaut None partout). Retourne un nouveau dict
+    avec les colonnes calculées ajoutées ou remplacées.
+    """
+    columns = dict(columns)
+    size = max((len(values) for values in columns.values()), default=0)
+    for field, function, sources in DERIVED_FIELDS.get(label, []):
+        inputs = [columns.get(source) or [None] * size for source in sources]
+        columns[field] = [function(*values) for values in zip(*inputs)]
+    return columns
@@ -0,0 +1,52 @@
+"""
+Index trigrammes (pg_trgm) pour les recherches __icontains, PostgreSQL uniquement.
+
+Sur PostgreSQL, `champ__icontains=x` devient UPPER("champ"::text) LIKE UPPER('%x%') :
+aucun index B-tree ne sert, mais un index GIN trigrammes sur UPPER(champ) si.
+L'opération est sans effet sur les autres bases (SQLite en développement) et
+ne modifie pas l'état des modèles : makemigrations ne la voit pas.
+
+    operations = [
+        CreateTrigramIndex('stockentry', 'type_denree', 'stock_entry_denree_trgm'),
+    ]
+"""
+from django.db.migrations.operations.base import Operation
+
+
+class CreateTrigramIndex(Operation):
+    reversible = True
+
+    def __init__(self, model_name, field_name, name):
+        self.model_name = model_name
+        self.field_name = field_name
+        self.name = name
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        column = model._meta.get_field(self.field_name).column
+        quote = schema_editor.quote_name
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(self.name)} ON {quote(model._meta.db_table)} '
+            f'USING gin (UPPER({quote(column)}) gin_trgm_ops)'
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(self.name)}')
+
+    def describe(self):
+        return f"Create trigram index {self.name} on {self.model_name}.{self.field_name} (PostgreSQL)"
+
+    @property
+    def migration_name_fragment(self):
+        return self.name
+
+    def deconstruct(self):
+        return self.__class__.__name__, [self.model_name, self.field_name, self.name], {}
@@ -0,0 +1,185 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class OptionalCursorPagination(CursorPagination):
+    """
+    Pagination par curseur (keyset) activable à la demande.
+
+    - Sans paramètre ?cursor= ni ?page_size=, la liste complète est renvoyée
+      comme avant (compatibilité avec le frontend existant).
+    - Le tri suit celui du queryset de la vue (ou Meta.ordering du modèle),
+      avec l'ID en départage. Le curseur contient la valeur de tous les champs
+      du tri (ex: date, created_at, id) et la page suivante est filtrée par
+      comparaison de ligne : curseurs stables malgré les insertions et quel que
+      soit le nombre de lignes de même date (pas de décalage offset_cutoff).
+    - Les valeurs NULL sont placées en fin de tri croissant (début de tri
+      décroissant), sur toutes les bases.
+    - L'en-tête X-Total-Count donne une estimation peu coûteuse du total.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    total_count_header = 'X-Total-Count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        self.total_count = estimate_count(queryset)
+
+        # Même déroulé que CursorPagination.paginate_queryset, avec une
+        # position composite : chaque position est unique, l'offset reste à 0
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        queryset = queryset.order_by(*_order_expressions(self.ordering, reverse))
+        if current_position is not None:
+            queryset = queryset.filter(_after(self.ordering, self._decode_position(current_position), reverse))
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = list(results[:self.page_size])
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering is None:
+            ordering = list(queryset.query.order_by or queryset.model._meta.ordering or ['-pk'])
+        pk_name = queryset.model._meta.pk.name
+        ordering = [
+            field.replace('pk', pk_name) if field.lstrip('-') == 'pk' else field
+            for field in ordering if isinstance(field, str)
+        ]
+        # Départager les lignes de même valeur (ex: même date) par l'ID
+        if not any(field.lstrip('-') == pk_name for field in ordering):
+            ordering.append(f'-{pk_name}' if ordering and ordering[0].startswith('-') else pk_name)
+        return tuple(ordering)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            if isinstance(instance, dict):
+                value = instance[name]
+            else:
+                value = instance
+                for attr in name.split('__'):
+                    value = getattr(value, attr) if value is not None else None
+            values.append(_position_value(value))
+        return json.dumps(values, separators=(',', ':'))
+
+    def _decode_position(self, position):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response[self.total_count_header] = str(self.total_count)
+        return response
+
+
+def _position_value(value):
+    """Valeur d'un champ de tri sérialisable dans le curseur (relue par le champ du modèle)"""
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def _order_expressions(ordering, reverse=False):
+    """Tri explicite des NULL pour que le sens inverse soit exactement l'opposé"""
+    expressions = []
+    for field in ordering:
+        descending = field.startswith('-') != reverse
+        column = F(field.lstrip('-'))
+        expressions.append(column.desc(nulls_first=True) if descending else column.asc(nulls_last=True))
+    return expressions
+
+
+def _after(ordering, values, reverse=False):
+    """
+    Lignes situées après la position `values` dans le tri (avant si `reverse`) :
+    comparaison de ligne (a, b, c) > (x, y, z) développée en
+    a > x OU (a = x ET b > y) OU (a = x ET b = y ET c > z),
+    chaque champ dans son propre sens.
+    """
+    condition = Q(pk__in=[])
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        descending = field.startswith('-') != reverse
+        if value is None:
+            # NULL en tête du tri décroissant, en fin du tri croissant
+            strictly = Q(**{f'{name}__isnull': False}) if descending else Q(pk__in=[])
+            same = Q(**{f'{name}__isnull': True})
+        else:
+            strictly = Q(**{f'{name}__lt': value}) if descending else (
+                Q(**{f'{name}__gt': value}) | Q(**{f'{name}__isnull': True})
+            )
+            same = Q(**{name: value})
+        condition |= equal & strictly
+        equal &= same
+    return condition
+
+
+def estimate_count(queryset):
+    """
+    Estimation du nombre de lignes d'un queryset.
+    Sur PostgreSQL, on lit l'estimation du planificateur (EXPLAIN) au lieu d'un
+    COUNT(*) complet ; sur les autres bases, on fait un COUNT(*) classique.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
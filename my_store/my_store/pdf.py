@@ -0,0 +1,295 @@
+"""
+Rapports PDF tabulaires générés page par page.
+
+Les lignes sont lues au fil de l'eau et chaque page reçoit son propre petit
+tableau : en-tête de colonnes répété et, pour les colonnes sommées, sous-total
+de la page et cumul depuis le début du rapport. La mémoire ne dépend plus du
+nombre de lignes mais seulement des pages déjà dessinées, compressées au fur
+et à mesure (reportlab n'écrit le fichier qu'à save()), et aucune page ne
+déborde puisque la hauteur des lignes est fixe.
+"""
+import datetime
+from decimal import Decimal
+from itertools import islice
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfdoc import PDFArray, PDFDictionary, PDFName, PDFStream, PDFZCompress
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas as pdf_canvas
+from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+
+MARGIN = 30
+FOOTER_HEIGHT = 20
+CELL_PADDING = 6
+# Largeur d'un caractère de colonne Excel, pour convertir les largeurs d'export
+POINTS_PER_CHAR = 5.5
+
+
+class _PageCompressingCanvas(pdf_canvas.Canvas):
+    """
+    reportlab garde le contenu de chaque page en clair jusqu'à save() et ne le
+    compresse qu'au moment d'écrire le fichier (~10 Ko par page de tableau).
+    Ici chaque page est compressée dès qu'elle est terminée : un flux dont le
+    dictionnaire porte déjà /Filter est écrit tel quel par reportlab.
+    """
+
+    def showPage(self):
+        super().showPage()
+        page = self._doc.Pages.pages[-1]
+        if page.stream:
+            page.Contents = PDFStream(
+                dictionary=PDFDictionary({'Filter': PDFArray([PDFName(PDFZCompress.pdfname)])}),
+                content=PDFZCompress.encode(page.stream),
+            )
+            page.stream = None
+
+
+def format_somme(value):
+    """Somme avec des espaces pour les milliers : 1 234 567,00"""
+    return f"{float(value):,.2f}".replace(',', ' ').replace('.', ',')
+
+
+def format_cell(value):
+    """Texte affiché dans une cellule : dates JJ/MM/AAAA, montants 1 234,00"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Oui' if value else 'Non'
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime('%d/%m/%Y')
+    if isinstance(value, int):
+        return f"{value:,}".replace(',', ' ')
+    if isinstance(value, (Decimal, float)):
+        return format_somme(value)
+    return str(value)
+
+
+class _Layout:
+    """Dimensions d'une page de tableau (portrait, ou paysage si trop large)"""
+
+    def __init__(self, col_widths):
+        pagesize = A4
+        if sum(col_widths) > A4[0] - 2 * MARGIN:
+            pagesize = landscape(A4)
+        self.pagesize = pagesize
+        self.page_width, self.page_height = pagesize
+        self.frame_width = self.page_width - 2 * MARGIN
+
+        # Réduire les colonnes (et la police) si elles dépassent encore la page
+        scale = min(1.0, self.frame_width / sum(col_widths))
+        self.col_widths = [width * scale for width in col_widths]
+        self.font_size = 10 if scale == 1.0 else 7
+        self.header_font_size = 12 if scale == 1.0 else 8
+        self.header_row_height = 28 if scale == 1.0 else 22
+        self.row_height = 20 if scale == 1.0 else 14
+        self.subtotal_row_height = 22 if scale == 1.0 else 16
+        self.table_x = MARGIN + (self.frame_width - sum(self.col_widths)) / 2
+
+    def capacity(self, available_height, with_totals):
+        """Nombre de lignes de données qui tiennent dans la hauteur disponible"""
+        reserved = self.header_row_height + (2 * self.subtotal_row_height if with_totals else 0)
+        return max(1, int((available_height - reserved) // self.row_height))
+
+    def fit(self, text, index, bold=False):
+        """Tronque le texte trop long pour sa colonne"""
+        font = 'Helvetica-Bold' if bold else 'Helvetica'
+        available = self.col_widths[index] - 2 * CELL_PADDING
+        if stringWidth(text, font, self.font_size) <= available:
+            return text
+        while text and stringWidth(text + '…', font, self.font_size) > available:
+            text = text[:-1]
+        return text + '…'
+
+
+def _title_flowables(title, subtitle, page_width):
+    """En-tête de l'entreprise, titre et sous-titre (première page uniquement)"""
+    styles = getSampleStyleSheet()
+    header_style = ParagraphStyle(
+        'HeaderStyle',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.HexColor('#000000'),
+        alignment=TA_LEFT,
+        fontName='Helvetica-Bold'
+    )
+    header_right_style = ParagraphStyle(
+        'HeaderRightStyle',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=colors.HexColor('#000000'),
+        alignment=TA_RIGHT,
+        fontName='Helvetica-Bold'
+    )
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        textColor=colors.HexColor('#1a1a1a'),
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+
+    header_table = Table([
+        [
+            Paragraph("ETABLISSEMENT KADER SAWADOGO<br/>ET FRERE", header_style),
+            Paragraph("BURKINA FASSO<br/>LA PATRIE OU LA MORT<br/>NOUS VAINCRONS", header_right_style)
+        ],
+        [
+            Paragraph("Tel BF    : +226 75 58 57 76 | 76 54 71 71<br/>Tel Mali : +223 73 73 73 44 | 74 52 11 47", styles['Normal']),
+            ""
+        ]
+    ], colWidths=[page_width / 2, page_width / 2])
+    header_table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+        ('TOPPADDING', (0, 0), (-1, -1), 0),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+    ]))
+
+    separator = Table([['']], colWidths=[page_width])
+    separator.setStyle(TableStyle([
+        ('LINEBELOW', (0, 0), (0, 0), 0.5, colors.black),
+    ]))
+
+    flowables = [
+        header_table,
+        Spacer(1, 0.1 * inch),
+        separator,
+        Spacer(1, 0.2 * inch),
+        Paragraph(title, title_style),
+        Spacer(1, 0.2 * inch),
+    ]
+    if subtitle:
+        flowables += [Paragraph(subtitle, styles['Normal']), Spacer(1, 0.3 * inch)]
+    return flowables
+
+
+def _page_table(layout, headers, cells, totals, page_totals, running_totals, label_column, last):
+    data = [[layout.fit(header, index, bold=True) for index, header in enumerate(headers)]]
+    data.extend(cells)
+    row_heights = [layout.header_row_height] + [layout.row_height] * len(cells)
+    if totals:
+        subtotal = [''] * len(headers)
+        cumul = [''] * len(headers)
+        subtotal[label_column] = 'Sous-total de la page'
+        cumul[label_column] = 'TOTAL' if last else 'Cumul'
+        for index in totals:
+            subtotal[index] = format_cell(page_totals[index])
+            cumul[index] = format_cell(running_totals[index])
+        data += [subtotal, cumul]
+        row_heights += [layout.subtotal_row_height] * 2
+    body_end = -3 if totals else -1
+
+    style = [
+        # En-tête
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f0f0f0')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#000000')),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), layout.header_font_size),
+
+        # Lignes de données
+        ('FONTNAME', (0, 1), (-1, body_end), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, body_end), layout.font_size),
+        ('ROWBACKGROUNDS', (0, 1), (-1, body_end), [colors.white, colors.HexColor('#f9f9f9')]),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#cccccc')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LEFTPADDING', (0, 0), (-1, -1), CELL_PADDING),
+        ('RIGHTPADDING', (0, 0), (-1, -1), CELL_PADDING),
+    ]
+    for index in totals:
+        style.append(('ALIGN', (index, 0), (index, -1), 'RIGHT'))
+    if totals:
+        # Sous-total et cumul / total
+        style += [
+            ('BACKGROUND', (0, -2), (-1, -1), colors.HexColor('#e0e0e0')),
+            ('FONTNAME', (0, -2), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, -2), (-1, -2), layout.font_size),
+            ('FONTSIZE', (0, -1), (-1, -1), layout.header_font_size if last else layout.font_size),
+        ]
+
+    table = Table(data, colWidths=layout.col_widths, rowHeights=row_heights)
+    table.setStyle(TableStyle(style))
+    return table
+
+
+def write_table_pdf(output, title, headers, rows, col_widths, totals=(), label_column=0, subtitle=None):
+    """
+    Écrit un rapport tabulaire dans `output` (fichier ou objet avec write()).
+
+    rows : itérable de listes de valeurs brutes, consommé une seule fois.
+    col_widths : largeurs en points (paysage et réduction automatiques si le
+    tableau dépasse la page).
+    totals : indices des colonnes sommées (sous-total par page, cumul, TOTAL) ;
+    label_column : colonne où écrire les libellés de ces lignes.
+    Retourne (nombre de lignes, nombre de pages, {indice: total}).
+    """
+    layout = _Layout(col_widths)
+    totals = list(totals)
+    generated = f"Généré le {datetime.datetime.now().strftime('%d/%m/%Y à %H:%M')}"
+
+    canvas = _PageCompressingCanvas(output, pagesize=layout.pagesize)
+    canvas.setTitle(title)
+
+    rows = iter(rows)
+    running_totals = {index: Decimal('0.00') for index in totals}
+    count = 0
+    page = 0
+    full_height = layout.page_height - 2 * MARGIN - FOOTER_HEIGHT
+
+    # Première page : en-tête de l'entreprise au-dessus du tableau
+    top = layout.page_height - MARGIN
+    for flowable in _title_flowables(title, subtitle, layout.frame_width):
+        _, height = flowable.wrapOn(canvas, layout.frame_width, top - MARGIN)
+        top -= height
+        flowable.drawOn(canvas, MARGIN, top)
+        top -= flowable.getSpaceAfter()
+    first_height = top - MARGIN - FOOTER_HEIGHT
+
+    page_rows = list(islice(rows, layout.capacity(first_height, bool(totals))))
+    while True:
+        page += 1
+        # Lire la page suivante d'avance pour savoir si celle-ci est la dernière
+        next_rows = list(islice(rows, layout.capacity(full_height, bool(totals)))) if page_rows else []
+        last = not next_rows
+
+        page_totals = {index: Decimal('0.00') for index in totals}
+        cells = []
+        for row in page_rows:
+            try:
+                formatted = [layout.fit(format_cell(value), index) for index, value in enumerate(row)]
+                for index in totals:
+                    if row[index] is not None:
+                        page_totals[index] += Decimal(str(row[index]))
+            except Exception:
+                # Ignorer les lignes avec des erreurs et continuer
+                continue
+            cells.append(formatted)
+        for index in totals:
+            running_totals[index] += page_totals[index]
+        count += len(cells)
+
+        table = _page_table(layout, headers, cells, totals, page_totals, running_totals, label_column, last)
+        _, height = table.wrapOn(canvas, layout.frame_width, layout.page_height)
+        if page > 1:
+            top = layout.page_height - MARGIN
+        table.drawOn(canvas, layout.table_x, top - height)
+
+        canvas.setFont('Helvetica', 8)
+        canvas.drawString(MARGIN, MARGIN, generated)
+        canvas.drawRightString(layout.page_width - MARGIN, MARGIN, f"Page {page}")
+        canvas.showPage()
+
+        if last:
+            break
+        page_rows = next_rows
+
+    canvas.save()
+    return count, page, running_totals
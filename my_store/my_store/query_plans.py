@@ -0,0 +1,38 @@
+class QueryPlanMixin:
+    """
+    Plan de requête par action pour les ModelViewSet.
+
+    query_plans associe une action ('list', 'retrieve', une @action...) aux
+    jointures nécessaires au serializer de cette action, pour éviter une
+    requête par ligne (N+1) :
+
+        query_plans = {
+            'list': {'select_related': ['client']},
+            'default': {'select_related': ['client', 'created_by']},
+        }
+
+    Clés reconnues : select_related, prefetch_related, annotate (dict nom ->
+    expression). 'default' s'applique aux actions sans plan dédié.
+    Le plan est appliqué dans filter_queryset(), appelé par list() et
+    get_object() : les get_queryset() existants n'ont pas à changer.
+    """
+    query_plans = {}
+
+    def get_query_plan(self):
+        return self.query_plans.get(self.action, self.query_plans.get('default'))
+
+    def filter_queryset(self, queryset):
+        return apply_query_plan(super().filter_queryset(queryset), self.get_query_plan())
+
+
+def apply_query_plan(queryset, plan):
+    """Applique un plan {select_related, prefetch_related, annotate} à un queryset"""
+    if not plan:
+        return queryset
+    if plan.get('select_related'):
+        queryset = queryset.select_related(*plan['select_related'])
+    if plan.get('prefetch_related'):
+        queryset = queryset.prefetch_related(*plan['prefetch_related'])
+    if plan.get('annotate'):
+        queryset = queryset.annotate(**plan['annotate'])
+    return queryset
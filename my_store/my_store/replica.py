@@ -0,0 +1,128 @@
+"""
+Lectures des rapports sur un réplica de la base (DATABASE_REPLICA_URL).
+
+Les écritures et toutes les autres lectures restent sur 'default'. Seules
+les actions déclarées dans replica_actions (statistiques, totaux, exports
+PDF / Excel) lisent sur le réplica, pour ne pas concurrencer les saisies des
+agents. Le choix est fait par requête via une ContextVar lue par le routeur.
+
+Lecture de ses propres écritures : après une écriture réussie (POST, PUT,
+PATCH, DELETE), ReplicaStickinessMiddleware note l'utilisateur (ou l'adresse
+IP pour les requêtes anonymes) pendant REPLICA_STICKY_SECONDS ; ses rapports
+sont alors lus sur 'default', le temps que le réplica rattrape son retard.
+La note est gardée dans le cache REPLICA_STICKY_CACHE, à partager entre les
+workers (file / redis) ; avec un cache factice, tout reste sur 'default'.
+Un agrégat mis en cache (caching.cache) calculé sur le réplica n'y reste que
+REPLICA_STICKY_SECONDS.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.db import DEFAULT_DB_ALIAS
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_alias():
+    """Alias du réplica s'il est configuré, sinon None"""
+    alias = getattr(settings, 'REPLICA_DB_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def current_read_alias():
+    """Alias des lectures de la requête en cours (None : base par défaut)"""
+    return _read_alias.get()
+
+
+@contextmanager
+def read_from(alias):
+    """Lectures du bloc sur `alias` (None : base par défaut)"""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """Lectures sur l'alias choisi pour la requête en cours, écritures et migrations sur 'default'"""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Le réplica est une copie de 'default' : mêmes lignes des deux côtés
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def _sticky_key(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        ident = f'user:{user.pk}'
+    else:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0].strip()
+        ident = f"ip:{forwarded or request.META.get('REMOTE_ADDR', '')}"
+    return f'replica-sticky:{ident}'
+
+
+def _sticky_cache():
+    return caches[getattr(settings, 'REPLICA_STICKY_CACHE', 'default')]
+
+
+def mark_write(request):
+    """Lectures de l'auteur sur 'default' pendant REPLICA_STICKY_SECONDS"""
+    _sticky_cache().set(_sticky_key(request), True, getattr(settings, 'REPLICA_STICKY_SECONDS', 5))
+
+
+def recently_wrote(request):
+    cache = _sticky_cache()
+    if isinstance(cache, DummyCache):
+        # Écritures non suivies : lire sur 'default' pour ne jamais servir de données périmées
+        return True
+    return cache.get(_sticky_key(request)) is not None
+
+
+class ReplicaReadMixin:
+    """
+    Actions de rapport lues sur le réplica (replica_actions : noms d'actions
+    du ViewSet, ou méthodes HTTP en minuscules pour une APIView), sauf juste
+    après une écriture du même utilisateur.
+    """
+    replica_actions = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        # La requête repart de 'default' et le choix ne survit pas à la requête
+        with read_from(None):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Après l'authentification : l'utilisateur est connu pour la lecture de ses écritures
+        action = getattr(self, 'action', None) or request.method.lower()
+        alias = replica_alias()
+        if alias and action in self.replica_actions and not recently_wrote(request):
+            _read_alias.set(alias)
+
+
+class ReplicaStickinessMiddleware:
+    """Note les auteurs d'écritures réussies (voir mark_write)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_alias():
+            mark_write(request)
+        return response
@@ -54,6 +54,11 @@ INSTALLED_APPS = [
     'argent',
     'transiteur',
     'purchases',
+    'sync',
+    'sequences',
+    'exports',
+    'imports',
+    'caching',
 ]
 
 MIDDLEWARE = [
@@ -64,6 +69,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'my_store.replica.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -91,13 +97,100 @@ WSGI_APPLICATION = 'my_store.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connexions persistantes désactivées par défaut : le serveur est lancé en
+# ASGI (uvicorn, pour le flux SSE) et le code ORM synchrone de chaque requête
+# tourne dans un thread d'exécution ; une connexion gardée ouverte n'y est ni
+# réutilisée ni fermée de façon fiable (fuites, connexions périmées). À ne
+# relever (ex: 600) que pour un déploiement WSGI (gunicorn).
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', '0'))
+
 DATABASES = {
     'default': dj_database_url.config(
         default=f'sqlite:///{BASE_DIR / "db.sqlite3"}',
-        conn_max_age=600
+        conn_max_age=DATABASE_CONN_MAX_AGE
     )
 }
 
+# Réplica en lecture pour les rapports (stats, details, totaux, exports PDF /
+# Excel, voir my_store.replica) : DATABASE_REPLICA_URL, sinon tout va sur
+# 'default'. Après une écriture, les rapports de son auteur restent sur
+# 'default' pendant REPLICA_STICKY_SECONDS (suivi dans le cache REPLICA_STICKY_CACHE,
+# à partager entre workers : 'aggregates' en file ou redis).
+REPLICA_DB_ALIAS = 'replica'
+if os.environ.get('DATABASE_REPLICA_URL'):
+    DATABASES[REPLICA_DB_ALIAS] = dj_database_url.parse(
+        os.environ['DATABASE_REPLICA_URL'], conn_max_age=DATABASE_CONN_MAX_AGE
+    )
+    DATABASES[REPLICA_DB_ALIAS]['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['my_store.replica.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', '5'))
+REPLICA_STICKY_CACHE = os.environ.get('REPLICA_STICKY_CACHE', 'default')
+
+# SQLite en production (dépôts sans serveur de base de données) : à chaque
+# connexion (init_command), attente du verrou (busy_timeout) au lieu d'une
+# erreur "database is locked", journal WAL (les lectures ne bloquent plus
+# l'écriture), synchronous=NORMAL (sûr avec WAL), mmap et cache de pages ; et
+# BEGIN IMMEDIATE pour les transactions : le verrou d'écriture est pris dès le
+# début, sans échec au passage lecture -> écriture. SQLITE_TUNING=0 : réglages
+# SQLite par défaut (voir `manage.py benchmark_sqlite_writes`).
+SQLITE_TUNING = os.environ.get('SQLITE_TUNING', '1') != '0'
+SQLITE_PRAGMAS = {
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '10000')),
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    # Négatif : taille en Kio
+    'cache_size': -int(os.environ.get('SQLITE_CACHE_KB', '65536')),
+}
+if SQLITE_TUNING:
+    for _database in DATABASES.values():
+        if _database['ENGINE'] == 'django.db.backends.sqlite3':
+            _database.setdefault('OPTIONS', {}).update({
+                'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+                'transaction_mode': 'IMMEDIATE',
+            })
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# Cache des agrégats (tableau de bord, statistiques de stock), invalidé par
+# signaux. AGGREGATE_CACHE_BACKEND : locmem (un seul processus), file (partagé
+# par les workers d'une même machine), redis (serveur local, AGGREGATE_CACHE_URL)
+# ou dummy (désactivé). Le TIMEOUT ne fait que libérer les entrées périmées.
+
+AGGREGATE_CACHE_ALIAS = 'aggregates'
+AGGREGATE_CACHE_BACKEND = os.environ.get('AGGREGATE_CACHE_BACKEND', 'locmem')
+_AGGREGATE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'aggregates',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('AGGREGATE_CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('AGGREGATE_CACHE_URL', 'redis://localhost:6379/1'),
+    },
+    'dummy': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    AGGREGATE_CACHE_ALIAS: {
+        **_AGGREGATE_CACHE_BACKENDS[AGGREGATE_CACHE_BACKEND],
+        'TIMEOUT': 24 * 60 * 60,
+        'KEY_PREFIX': 'my_store',
+        'OPTIONS': {'MAX_ENTRIES': 5000} if AGGREGATE_CACHE_BACKEND != 'redis' else {},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -156,6 +249,8 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
     ),
+    # Pagination par curseur, active seulement si ?cursor= ou ?page_size= est fourni
+    'DEFAULT_PAGINATION_CLASS': 'my_store.pagination.OptionalCursorPagination',
 }
 
 SIMPLE_JWT = {
@@ -184,12 +279,43 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    'if-none-match',
     'origin',
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
 ]
 
+# Flux de changements (?since=) : durée de conservation des suppressions
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# Diffusion des changements en temps réel (SSE, /api/events/).
+# InProcessBroker : un seul processus ; RedisBroker : plusieurs workers via
+# un serveur compatible Redis local (SYNC_BROKER_URL)
+SYNC_BROKER = os.environ.get('SYNC_BROKER', 'sync.broker.InProcessBroker')
+SYNC_BROKER_URL = os.environ.get('SYNC_BROKER_URL', 'redis://localhost:6379/0')
+SYNC_SSE_HEARTBEAT_SECONDS = 15
+
+# Exports de registres en tâche de fond (/api/exports/) : threads du processus
+# web (0 = tâches traitées uniquement par `manage.py run_export_jobs`),
+# durée de conservation des fichiers, délai avant reprise d'une tâche bloquée
+EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', '2'))
+EXPORT_RETENTION_HOURS = int(os.environ.get('EXPORT_RETENTION_HOURS', '24'))
+EXPORT_JOB_TIMEOUT_MINUTES = int(os.environ.get('EXPORT_JOB_TIMEOUT_MINUTES', '30'))
+
+# Imports de classeurs Excel (/api/imports/, `manage.py import_ledger`) : threads
+# du processus web (0 = tâches traitées par `manage.py import_ledger --pending`),
+# lignes validées et écrites par transaction, délai avant reprise d'une tâche bloquée
+IMPORT_WORKERS = int(os.environ.get('IMPORT_WORKERS', '1'))
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', '2000'))
+IMPORT_JOB_TIMEOUT_MINUTES = int(os.environ.get('IMPORT_JOB_TIMEOUT_MINUTES', '60'))
+
+# En-têtes lisibles par le frontend (total estimé des listes paginées, ETag)
+CORS_EXPOSE_HEADERS = [
+    'etag',
+    'x-total-count',
+]
+
 # Pour le développement, autoriser toutes les origines (à retirer en production)
 if DEBUG:
     CORS_ALLOW_ALL_ORIGINS = False  # On garde False pour la sécurité, mais on a listé les origines
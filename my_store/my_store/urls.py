@@ -39,6 +39,10 @@ urlpatterns = [
     path('api/', include('argent.urls')),
     path('api/', include('transiteur.urls')),
     path('api/', include('purchases.urls')),
+    path('api/', include('sync.urls')),
+    path('api/', include('exports.urls')),
+    path('api/', include('imports.urls')),
+    path('api/', include('caching.urls')),
 ]
 
 # Serve media files in development
@@ -0,0 +1,197 @@
+"""
+Exports Excel en flux : classeur openpyxl en mode write-only (les lignes sont
+écrites au fil de l'eau au lieu d'être gardées comme objets Cell), lignes lues
+par paquets avec .iterator(), fichier construit dans un SpooledTemporaryFile
+(en mémoire jusqu'à XLSX_SPOOL_MAX_SIZE, sur disque au-delà) puis envoyé par
+morceaux avec FileResponse.
+"""
+import datetime
+import tempfile
+
+from django.http import FileResponse
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+from rest_framework.decorators import action
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+XLSX_SPOOL_MAX_SIZE = 5 * 1024 * 1024
+CHUNK_SIZE = 2000
+
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+TOTAL_FONT = Font(bold=True)
+
+
+def _excel_value(value):
+    # openpyxl refuse les datetimes avec fuseau horaire
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    return value
+
+
+def write_xlsx(output, title, headers, rows, column_widths=None, footer=None):
+    """
+    Écrit un classeur d'une feuille dans `output`.
+
+    rows : itérable de listes, consommé une seule fois.
+    footer : fonction appelée après les lignes, qui retourne les lignes de
+    total (par exemple à partir de sommes cumulées pendant l'itération).
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=title[:31])
+
+    # En mode write-only, largeurs et styles doivent être définis avant les lignes
+    for index, width in enumerate(column_widths or [], 1):
+        ws.column_dimensions[get_column_letter(index)].width = width
+
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.fill = HEADER_FILL
+        cell.font = HEADER_FONT
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    for row in rows:
+        ws.append([_excel_value(value) for value in row])
+
+    for row in (footer() if footer else []):
+        cells = []
+        for value in row:
+            cell = WriteOnlyCell(ws, value=_excel_value(value))
+            cell.font = TOTAL_FONT
+            cell.alignment = Alignment(horizontal="right", vertical="center")
+            cells.append(cell)
+        ws.append(cells)
+
+    wb.save(output)
+
+
+def xlsx_response(filename, title, headers, rows, column_widths=None, footer=None):
+    """Construit le classeur (voir write_xlsx) et le renvoie en téléchargement"""
+    output = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_SIZE)
+    write_xlsx(output, title, headers, rows, column_widths, footer)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+class ExportColumns:
+    """
+    Colonnes d'un export tabulaire, déclarées sur le ViewSet :
+
+        export_columns = [
+            ('Date', 'date', 12),
+            ('Client', Concat('client__first_name', Value(' '), 'client__last_name'), 30),
+            ('Tonnage', 'tonnage', 12),
+        ]
+        export_totals = ['tonnage']
+
+    Chaque colonne est un chemin de champ (les champs à choix sont affichés
+    avec leur libellé) ou une expression ; toutes les valeurs sont lues en une
+    seule requête values_list(). export_totals liste les colonnes sommées dans
+    la ligne TOTAL, calculée pendant l'itération.
+    """
+
+    def __init__(self, model, columns, totals=()):
+        self.model = model
+        self.columns = columns
+        self.totals = list(totals)
+        self.headers = [column[0] for column in columns]
+        self.widths = [column[2] if len(column) > 2 else 15 for column in columns]
+        self.choices = {}
+        for index, (_, source, *_rest) in enumerate(columns):
+            if isinstance(source, str):
+                field = self._resolve_field(source)
+                if field.flatchoices:
+                    self.choices[index] = dict(field.flatchoices)
+
+    def _resolve_field(self, path):
+        model, field = self.model, None
+        for name in path.split('__'):
+            field = model._meta.get_field(name)
+            model = field.related_model
+        return field
+
+    def values(self, queryset):
+        """Requête values_list() des colonnes (expressions annotées en _colN)"""
+        names, annotations = [], {}
+        for index, (_, source, *_rest) in enumerate(self.columns):
+            if isinstance(source, str):
+                names.append(source)
+            else:
+                annotations[f'_col{index}'] = source
+                names.append(f'_col{index}')
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset.values_list(*names)
+
+    def rows(self, queryset, sums):
+        """Lignes formatées ; cumule dans `sums` les colonnes de export_totals"""
+        total_indexes = [self.index(source) for source in self.totals]
+        for values in self.values(queryset).iterator(chunk_size=CHUNK_SIZE):
+            row = list(values)
+            for index, labels in self.choices.items():
+                row[index] = labels.get(row[index], row[index])
+            for index in total_indexes:
+                if row[index] is not None:
+                    sums[index] = sums.get(index, 0) + row[index]
+            yield row
+
+    def footer(self, sums):
+        if not self.totals:
+            return []
+        total = [''] * len(self.columns)
+        total[0] = 'TOTAL'
+        for index, value in sums.items():
+            total[index] = value
+        return [[], total]
+
+    def index(self, source):
+        """Position de la colonne dont la source est `source`"""
+        for index, column in enumerate(self.columns):
+            if column[1] == source:
+                return index
+        raise ValueError(f"Colonne de total inconnue : {source}")
+
+
+class XlsxExportMixin:
+    """
+    Action GET export_xlsx/ pour les ViewSets de registres : mêmes filtres que
+    la liste (get_queryset), colonnes déclarées par export_columns (voir
+    ExportColumns), ordre export_ordering (celui du modèle par défaut).
+    """
+    export_columns = []
+    export_totals = []
+    export_ordering = None
+    export_title = 'Export'
+    export_filename = 'export'
+
+    def get_export_columns(self):
+        return ExportColumns(self.get_queryset().model, self.export_columns, self.export_totals)
+
+    def get_export_queryset(self):
+        queryset = self.get_queryset()
+        if self.export_ordering:
+            queryset = queryset.order_by(*self.export_ordering)
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def export_xlsx(self, request):
+        """Registre filtré au format Excel (.xlsx), généré en flux"""
+        columns = self.get_export_columns()
+        sums = {}
+        date_from = request.query_params.get('date_from', None)
+        date_to = request.query_params.get('date_to', None)
+        filename = f"{self.export_filename}_{date_from or 'all'}_{date_to or 'all'}.xlsx"
+        return xlsx_response(
+            filename,
+            self.export_title,
+            columns.headers,
+            columns.rows(self.get_export_queryset(), sums),
+            column_widths=columns.widths,
+            footer=lambda: columns.footer(sums),
+        )
@@ -39,18 +39,10 @@ class OrderCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         items_data = validated_data.pop('items')
         
-        # Generate unique order number
-        from django.utils import timezone
-        import random
-        timestamp = timezone.now().strftime('%Y%m%d%H%M%S')
-        random_suffix = random.randint(1000, 9999)
-        order_number = f"ORD-{timestamp}-{random_suffix}"
-        
-        # Ensure uniqueness
-        while Order.objects.filter(order_number=order_number).exists():
-            random_suffix = random.randint(1000, 9999)
-            order_number = f"ORD-{timestamp}-{random_suffix}"
-        
+        # Generate unique order number (annual sequence: ORD-2026-00001)
+        from sequences.services import next_number
+        order_number = next_number('ORD', yearly=True)
+
         validated_data['order_number'] = order_number
         order = Order.objects.create(**validated_data)
         
@@ -88,6 +80,9 @@ class OrderListSerializer(serializers.ModelSerializer):
         ]
 
     def get_items_count(self, obj):
+        # Annoté par le plan de requête de la liste (évite un COUNT par ligne)
+        if hasattr(obj, 'nb_items'):
+            return obj.nb_items
         return obj.items.count()
 
 
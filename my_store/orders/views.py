@@ -2,18 +2,30 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Count, Prefetch, Q
 from django.utils import timezone
 from datetime import timedelta
 from .models import Order, OrderItem
+from my_store.query_plans import QueryPlanMixin
+from my_store.conditional import ConditionalGetMixin
+from sync.mixins import DeltaSyncMixin
 from .serializers import (
     OrderSerializer, OrderCreateSerializer, OrderListSerializer, OrderItemSerializer
 )
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(QueryPlanMixin, ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all()
     permission_classes = [IsAuthenticated]
+    # Client et lignes imbriquées : inclus dans l'ETag
+    etag_related = ['customer', 'items']
+    query_plans = {
+        'list': {'select_related': ['customer'], 'annotate': {'nb_items': Count('items')}},
+        'default': {
+            'select_related': ['customer'],
+            'prefetch_related': [Prefetch('items', queryset=OrderItem.objects.select_related('product'))],
+        },
+    }
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from my_store.indexes import CreateTrigramIndex
+
+
+class Migration(migrations.Migration):
+    """Index trigrammes des recherches __icontains (PostgreSQL uniquement, voir my_store.indexes)"""
+
+    dependencies = [
+        ('products', '0002_alter_product_updated_at'),
+    ]
+
+    operations = [
+        CreateTrigramIndex('product', 'name', 'product_name_trgm'),
+    ]
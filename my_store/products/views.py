@@ -3,18 +3,25 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Product, Category
+from my_store.query_plans import QueryPlanMixin
+from my_store.conditional import ConditionalGetMixin
+from sync.mixins import DeltaSyncMixin
 from .serializers import ProductSerializer, ProductListSerializer, CategorySerializer
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
+    query_plans = {}
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(QueryPlanMixin, ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     permission_classes = [IsAuthenticated]
+    query_plans = {
+        'default': {'select_related': ['category']},
+    }
 
     def get_serializer_class(self):
         if self.action == 'list':
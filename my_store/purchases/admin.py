@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Achat, EntreeAchat
+from .models import Achat, EntreeAchat, montants_annotations
 
 
 @admin.register(EntreeAchat)
@@ -10,6 +10,9 @@ class EntreeAchatAdmin(admin.ModelAdmin):
     date_hierarchy = 'date'
     ordering = ['-date', '-created_at']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(**montants_annotations())
+
 
 @admin.register(Achat)
 class AchatAdmin(admin.ModelAdmin):
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-17 05:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0011_clientchargement_client_chargement_date_idx_and_more'),
+        ('products', '0002_alter_product_updated_at'),
+        ('purchases', '0008_alter_achat_updated_at_alter_entreeachat_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='achat',
+            index=models.Index(fields=['-date', '-created_at'], name='achat_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='achat',
+            index=models.Index(fields=['entree', 'date'], name='achat_entree_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entreeachat',
+            index=models.Index(fields=['-date', '-created_at'], name='entree_achat_date_idx'),
+        ),
+    ]
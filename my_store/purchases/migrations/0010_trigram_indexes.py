@@ -0,0 +1,18 @@
+from django.db import migrations
+
+from my_store.indexes import CreateTrigramIndex
+
+
+class Migration(migrations.Migration):
+    """Index trigrammes des recherches __icontains (PostgreSQL uniquement, voir my_store.indexes)"""
+
+    dependencies = [
+        ('purchases', '0009_achat_achat_date_idx_achat_achat_entree_idx_and_more'),
+    ]
+
+    operations = [
+        CreateTrigramIndex('entreeachat', 'numero_entree', 'entree_achat_numero_trgm'),
+        CreateTrigramIndex('entreeachat', 'nom_client', 'entree_achat_client_trgm'),
+        CreateTrigramIndex('achat', 'nom_client', 'achat_client_trgm'),
+        CreateTrigramIndex('achat', 'nom_produit', 'achat_produit_trgm'),
+    ]
@@ -1,6 +1,11 @@
-from django.db import models
+import re
+
+from django.db import models, transaction
+from django.db.models import ExpressionWrapper, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce
 from decimal import Decimal
 from account.models import User
+from my_store.derived import derive
 from customers.models import Customer
 from products.models import Product
 
@@ -71,60 +76,55 @@ class EntreeAchat(models.Model):
         related_name='entrees_achat_created'
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def save(self, *args, **kwargs):
+        from sequences.services import advance_to, next_value
         # Générer automatiquement le numéro d'entrée si non fourni ou vide
         if not self.numero_entree or not self.numero_entree.strip():
-            # Numérotation séquentielle simple commençant à 1
-            last_entree = EntreeAchat.objects.exclude(
-                numero_entree__isnull=True
-            ).exclude(
-                numero_entree=''
-            ).order_by('-id').first()
-            
-            if last_entree and last_entree.numero_entree:
-                try:
-                    # Essayer de convertir le numéro en entier
-                    last_num = int(last_entree.numero_entree)
-                    next_num = last_num + 1
-                except (ValueError, TypeError):
-                    # Si le numéro n'est pas un entier, chercher le plus grand numéro entier
-                    all_numbers = []
-                    for entree in EntreeAchat.objects.exclude(numero_entree__isnull=True).exclude(numero_entree=''):
-                        try:
-                            all_numbers.append(int(entree.numero_entree))
-                        except (ValueError, TypeError):
-                            continue
-                    if all_numbers:
-                        next_num = max(all_numbers) + 1
-                    else:
-                        next_num = 1
-            else:
-                next_num = 1
-            
+            # Numérotation séquentielle simple commençant à 1, sans doublon
+            # même en cas d'enregistrements simultanés
+            next_num = next_value('purchases.entree', initial=dernier_numero_entree)
             # Formater avec des zéros devant (001, 002, ...) jusqu'à 999, puis sans zéros (1000, 1001, ...)
-            if next_num <= 999:
-                self.numero_entree = f"{next_num:03d}"  # Format 001, 002, ..., 999
-            else:
-                self.numero_entree = str(next_num)  # Format 1000, 1001, ... sans zéros
-        
-        super().save(*args, **kwargs)
+            self.numero_entree = f"{next_num:03d}"
+            super().save(*args, **kwargs)
+        else:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                # Numéro saisi à la main : la numérotation automatique reprend après lui
+                if NUMERO_ENTREE_RE.match(self.numero_entree.strip()):
+                    advance_to('purchases.entree', int(self.numero_entree.strip()))
+        # Montants annotés lus avant l'écriture : périmés, recalculés à la demande
+        self.__dict__.pop('_montant_ht', None)
+        self.__dict__.pop('_montant_net', None)
 
     @property
     def montant_ht(self):
         """Montant Hors Taxe (somme de tous les montants des lignes d'achat)"""
+        # Valeur annotée par la base (voir montants_annotations) si disponible
+        if '_montant_ht' in self.__dict__:
+            return self._montant_ht
         return sum(achat.somme_totale for achat in self.achats.all() if achat.somme_totale)
 
+    @montant_ht.setter
+    def montant_ht(self, value):
+        self._montant_ht = value
+
     @property
     def montant_net(self):
         """Montant Net (HT - Autres charges - Avance + Restant)"""
+        if '_montant_net' in self.__dict__:
+            return self._montant_net
         ht = self.montant_ht
         autres_charges = Decimal(self.autres_charges) if self.autres_charges else Decimal('0.00')
         avance = Decimal(self.avance) if self.avance else Decimal('0.00')
         restant = Decimal(self.restant) if self.restant else Decimal('0.00')
         return ht - autres_charges - avance + restant
 
+    @montant_net.setter
+    def montant_net(self, value):
+        self._montant_net = value
+
     def __str__(self):
         client_nom = self.client.full_name if self.client else self.nom_client
         return f"Entrée {self.numero_entree} - {client_nom} - {self.date.strftime('%d/%m/%Y')}"
@@ -133,6 +133,45 @@ class EntreeAchat(models.Model):
         verbose_name = "Entrée d'achat"
         verbose_name_plural = "Entrées d'achat"
         ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['-date', '-created_at'], name='entree_achat_date_idx'),
+        ]
+
+
+# Numéros d'entrée purement numériques (ceux de la séquence et les saisies équivalentes)
+NUMERO_ENTREE_RE = re.compile(r'^[0-9]{1,15}$')
+
+
+def dernier_numero_entree():
+    """Plus grand numéro d'entrée numérique existant (reprise de la séquence)"""
+    return EntreeAchat.objects.filter(
+        numero_entree__regex=NUMERO_ENTREE_RE.pattern
+    ).aggregate(
+        dernier=Max(Cast('numero_entree', models.BigIntegerField()))
+    )['dernier'] or 0
+
+
+def montants_annotations():
+    """
+    Annotations montant_ht / montant_net calculées par la base, mêmes formules
+    que les propriétés d'EntreeAchat : queryset.annotate(**montants_annotations()).
+    La somme des lignes passe par une sous-requête (et non un JOIN + GROUP BY)
+    pour rester compatible avec prefetch_related et aggregate().
+    """
+    montant = models.DecimalField(max_digits=14, decimal_places=2)
+    lignes = Achat.objects.filter(entree=OuterRef('pk')).order_by().values('entree')
+    montant_ht = Coalesce(
+        Subquery(lignes.annotate(total=Sum('somme_totale')).values('total'), output_field=montant),
+        Value(Decimal('0.00')),
+        output_field=montant,
+    )
+    return {
+        'montant_ht': montant_ht,
+        'montant_net': ExpressionWrapper(
+            montant_ht - F('autres_charges') - F('avance') + F('restant'),
+            output_field=montant,
+        ),
+    }
 
 
 class Achat(models.Model):
@@ -213,14 +252,11 @@ class Achat(models.Model):
         related_name='achats_created'
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def save(self, *args, **kwargs):
         # Calcul automatique de la somme totale (quantité × prix unitaire)
-        if self.quantite_kg is not None and self.prix_unitaire is not None:
-            self.somme_totale = Decimal(self.quantite_kg) * Decimal(self.prix_unitaire)
-        else:
-            self.somme_totale = Decimal('0.00')
+        derive([self])
         
         # Si l'achat est lié à une entrée, mettre à jour les infos de l'entrée
         if self.entree:
@@ -241,3 +277,8 @@ class Achat(models.Model):
         verbose_name = "Achat"
         verbose_name_plural = "Achats"
         ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['-date', '-created_at'], name='achat_date_idx'),
+            # Lignes d'une entrée (filtre entree, montant_ht des entrées), par date
+            models.Index(fields=['entree', 'date'], name='achat_entree_idx'),
+        ]
@@ -1,3 +1,22 @@
+from datetime import date
+
 from django.test import TestCase
 
-# Create your tests here.
+from .models import EntreeAchat
+
+
+class NumeroEntreeTests(TestCase):
+    def create(self, numero=None):
+        return EntreeAchat.objects.create(date=date(2025, 1, 2), nom_client="Client", numero_entree=numero)
+
+    def test_numero_saisi_avance_la_sequence(self):
+        self.assertEqual([self.create().numero_entree for _ in range(2)], ['001', '002'])
+        self.create('057')
+        # Un numéro saisi plus petit ou non numérique ne fait pas reculer la séquence
+        self.create('010')
+        self.create('A-99')
+        self.assertEqual(self.create().numero_entree, '058')
+
+    def test_numero_saisi_avant_la_sequence(self):
+        self.create('120')
+        self.assertEqual(self.create().numero_entree, '121')
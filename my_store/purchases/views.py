@@ -1,9 +1,15 @@
-from django.db.models import Q
+from django.db.models import Case, F, Prefetch, Q, Sum, Value, When
+from django.db.models.functions import Concat
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from .models import Achat, EntreeAchat
+from .models import Achat, EntreeAchat, montants_annotations
+from my_store.query_plans import QueryPlanMixin, apply_query_plan
+from my_store.replica import ReplicaReadMixin
+from my_store.conditional import ConditionalGetMixin
+from sync.mixins import DeltaSyncMixin
+from my_store.xlsx import XlsxExportMixin
 from .serializers import (
     AchatSerializer,
     AchatCreateSerializer,
@@ -14,10 +20,22 @@ from .serializers import (
 )
 
 
-class EntreeAchatViewSet(viewsets.ModelViewSet):
+class EntreeAchatViewSet(ReplicaReadMixin, QueryPlanMixin, ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     """ViewSet pour gérer les entrées d'achat"""
     queryset = EntreeAchat.objects.all()
     permission_classes = [AllowAny]
+    # Rapports lus sur le réplica s'il est configuré (voir my_store.replica)
+    replica_actions = ['total']
+    # Client et lignes d'achat imbriquées : inclus dans l'ETag
+    etag_related = ['client', 'achats']
+    query_plans = {
+        'default': {
+            'select_related': ['client', 'created_by'],
+            'prefetch_related': [Prefetch('achats', queryset=Achat.objects.select_related('client', 'produit', 'created_by'))],
+            # montant_ht / montant_net calculés en SQL plutôt que ligne par ligne
+            'annotate': montants_annotations(),
+        },
+    }
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -57,18 +75,49 @@ class EntreeAchatViewSet(viewsets.ModelViewSet):
         else:
             serializer.save(created_by=None)
 
+    def perform_update(self, serializer):
+        serializer.save()
+        # Relire l'entrée avec le plan (montants annotés, lignes d'achat) :
+        # la réponse reflète les valeurs écrites, comme un GET
+        serializer.instance = apply_query_plan(
+            EntreeAchat.objects.all(), self.get_query_plan()
+        ).get(pk=serializer.instance.pk)
+
     @action(detail=False, methods=['get'])
     def total(self, request):
         """Calculer le total des entrées d'achat"""
-        queryset = self.get_queryset()
-        total = sum(entree.montant_net for entree in queryset)
+        queryset = self.get_queryset().annotate(**montants_annotations())
+        total = queryset.aggregate(total=Sum('montant_net'))['total'] or 0
         return Response({'total': float(total)})
 
 
-class AchatViewSet(viewsets.ModelViewSet):
+class AchatViewSet(QueryPlanMixin, ConditionalGetMixin, DeltaSyncMixin, XlsxExportMixin, viewsets.ModelViewSet):
     """ViewSet pour gérer les lignes d'achat"""
     queryset = Achat.objects.all()
     permission_classes = [AllowAny]
+    # Noms affichés depuis ces relations : inclus dans l'ETag
+    etag_related = ['client', 'produit']
+    query_plans = {
+        'default': {'select_related': ['client', 'produit', 'created_by']},
+    }
+    # Export Excel des lignes d'achat (export_xlsx/), mêmes filtres que la liste
+    export_title = "Achats"
+    export_filename = "registre_achats"
+    export_ordering = ['date', 'entree_id', 'id']
+    export_columns = [
+        ('Date', 'date', 12),
+        ("N° d'entrée", 'entree__numero_entree', 12),
+        # Client / produit enregistrés, sinon les noms saisis (comme le serializer)
+        ('Client', Case(
+            When(client__isnull=False, then=Concat('client__first_name', Value(' '), 'client__last_name')),
+            default=F('nom_client'),
+        ), 25),
+        ('Produit', Case(When(produit__isnull=False, then=F('produit__name')), default=F('nom_produit')), 20),
+        ('Quantité (kg)', 'quantite_kg', 14),
+        ('Prix unitaire', 'prix_unitaire', 14),
+        ('Somme totale', 'somme_totale', 15),
+    ]
+    export_totals = ['quantite_kg', 'somme_totale']
 
     def get_serializer_class(self):
         if self.action == 'create':
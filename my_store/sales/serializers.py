@@ -73,6 +73,9 @@ class SaleListSerializer(serializers.ModelSerializer):
         ]
 
     def get_items_count(self, obj):
+        # Annoté par le plan de requête de la liste (évite un COUNT par ligne)
+        if hasattr(obj, 'nb_items'):
+            return obj.nb_items
         return obj.items.count()
 
 
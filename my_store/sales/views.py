@@ -2,19 +2,31 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.http import HttpResponse
-from django.db.models import Sum, Count
+from django.db.models import Sum, Count, Prefetch
 from datetime import datetime
-import io
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
 from .models import Sale, SaleItem
+from my_store.xlsx import xlsx_response
+from my_store.query_plans import QueryPlanMixin
+from my_store.replica import ReplicaReadMixin
+from my_store.conditional import ConditionalGetMixin
+from sync.mixins import DeltaSyncMixin
 from .serializers import SaleSerializer, SaleCreateSerializer, SaleListSerializer, SaleItemSerializer
 
 
-class SaleViewSet(viewsets.ModelViewSet):
+class SaleViewSet(ReplicaReadMixin, QueryPlanMixin, ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Sale.objects.all()
     permission_classes = [IsAuthenticated]
+    # Rapports lus sur le réplica s'il est configuré (voir my_store.replica)
+    replica_actions = ['export_report']
+    # Client et lignes imbriquées : inclus dans l'ETag
+    etag_related = ['customer', 'items']
+    query_plans = {
+        'list': {'select_related': ['customer'], 'annotate': {'nb_items': Count('items')}},
+        'default': {
+            'select_related': ['customer'],
+            'prefetch_related': [Prefetch('items', queryset=SaleItem.objects.select_related('product'))],
+        },
+    }
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -47,76 +59,45 @@ class SaleViewSet(viewsets.ModelViewSet):
         date_from = request.query_params.get('date_from', None)
         date_to = request.query_params.get('date_to', None)
 
-        queryset = Sale.objects.all()
+        # Une seule requête sur les lignes de vente (vente et produit joints),
+        # lue par paquets : plus de requête par vente ni par produit
+        items = SaleItem.objects.all()
         if date_from:
-            queryset = queryset.filter(sale_date__date__gte=date_from)
+            items = items.filter(sale__sale_date__date__gte=date_from)
         if date_to:
-            queryset = queryset.filter(sale_date__date__lte=date_to)
-
-        queryset = queryset.order_by('sale_date')
-
-        # Créer un workbook Excel
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Rapport des Ventes"
-
-        # En-têtes
-        headers = ['Date', 'Heure', 'ID Vente', 'Produit', 'Quantité', 'Prix Unitaire', 'Total', 'Méthode de Paiement']
-        ws.append(headers)
-
-        # Style des en-têtes
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+            items = items.filter(sale__sale_date__date__lte=date_to)
 
-        # Données
-        total_general = 0
-        for sale in queryset:
-            sale_date = sale.sale_date.date()
-            sale_time = sale.sale_date.time()
-            for item in sale.items.all():
-                row = [
+        items = items.order_by('sale__sale_date', 'sale_id', 'id').values_list(
+            'sale__sale_date', 'sale_id', 'product__name', 'quantity', 'unit_price', 'sale__payment_method'
+        )
+        payment_methods = dict(Sale._meta.get_field('payment_method').flatchoices)
+        totals = {'general': 0}
+
+        def rows():
+            for sale_date, sale_id, product_name, quantity, unit_price, payment_method in items.iterator(chunk_size=2000):
+                subtotal = float(quantity * unit_price)
+                totals['general'] += subtotal
+                yield [
                     sale_date.strftime('%d/%m/%Y'),
-                    sale_time.strftime('%H:%M'),
-                    sale.id,
-                    item.product.name,
-                    item.quantity,
-                    float(item.unit_price),
-                    float(item.subtotal),
-                    sale.get_payment_method_display()
+                    sale_date.strftime('%H:%M'),
+                    sale_id,
+                    product_name,
+                    quantity,
+                    float(unit_price),
+                    subtotal,
+                    payment_methods.get(payment_method, payment_method),
                 ]
-                ws.append(row)
-                total_general += float(item.subtotal)
-
-        # Ajouter le total
-        ws.append([])
-        ws.append(['TOTAL GÉNÉRAL', '', '', '', '', '', total_general, ''])
-
-        # Style du total
-        total_row = ws[ws.max_row]
-        for cell in total_row:
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal="right", vertical="center")
 
-        # Ajuster la largeur des colonnes
+        # Classeur write-only, écrit au fil des lignes (voir my_store.xlsx)
+        headers = ['Date', 'Heure', 'ID Vente', 'Produit', 'Quantité', 'Prix Unitaire', 'Total', 'Méthode de Paiement']
         column_widths = [12, 10, 10, 30, 10, 12, 12, 15]
-        for i, width in enumerate(column_widths, 1):
-            ws.column_dimensions[chr(64 + i)].width = width
-
-        # Enregistrer dans un buffer
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-
-        # Créer la réponse HTTP
         filename = f"rapport_ventes_{date_from or 'all'}_{date_to or 'all'}.xlsx"
-        response = HttpResponse(
-            buffer.read(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        return xlsx_response(
+            filename,
+            "Rapport des Ventes",
+            headers,
+            rows(),
+            column_widths=column_widths,
+            footer=lambda: [[], ['TOTAL GÉNÉRAL', '', '', '', '', '', totals['general'], '']],
         )
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return response
 
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-17 04:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Nom de la séquence')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Dernière valeur attribuée')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Séquence',
+                'verbose_name_plural': 'Séquences',
+                'ordering': ['name'],
+            },
+        ),
+    ]
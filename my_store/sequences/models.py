@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class Sequence(models.Model):
+    """
+    Compteur nommé pour la numérotation séquentielle (entrées d'achat,
+    commandes, factures...). Une ligne par séquence, par exemple
+    'purchases.entree', ou le préfixe et l'année pour une séquence annuelle
+    de next_number ('ORD-2026', 'INV-2026').
+    Ne pas modifier directement : passer par sequences.services.
+    """
+    name = models.CharField(max_length=100, unique=True, verbose_name="Nom de la séquence")
+    value = models.BigIntegerField(default=0, verbose_name="Dernière valeur attribuée")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+    class Meta:
+        verbose_name = "Séquence"
+        verbose_name_plural = "Séquences"
+        ordering = ['name']
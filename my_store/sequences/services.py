@@ -0,0 +1,56 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Sequence
+
+
+def next_value(name, initial=None):
+    """
+    Attribue la valeur suivante de la séquence `name` (1, 2, 3...).
+
+    L'incrément est un UPDATE ... SET value = value + 1 : la ligne (ou la base
+    entière sous SQLite) reste verrouillée jusqu'à la fin de la transaction,
+    deux enregistrements simultanés ne peuvent donc pas obtenir le même
+    numéro, et un rollback rend le numéro.
+
+    initial : fonction appelée une seule fois, à la création de la séquence,
+    qui retourne la dernière valeur déjà utilisée (reprise de données
+    existantes). 0 par défaut.
+    """
+    with transaction.atomic():
+        updated = Sequence.objects.filter(name=name).update(value=F('value') + 1, updated_at=timezone.now())
+        if not updated:
+            start = initial() if initial else 0
+            try:
+                with transaction.atomic():
+                    Sequence.objects.create(name=name, value=(start or 0) + 1)
+            except IntegrityError:
+                # Créée entre-temps par une autre transaction : incrémenter la sienne
+                Sequence.objects.filter(name=name).update(value=F('value') + 1, updated_at=timezone.now())
+        return Sequence.objects.filter(name=name).values_list('value', flat=True).get()
+
+
+def advance_to(name, value):
+    """
+    Porte la séquence `name` à `value` au moins (numéro saisi à la main) :
+    UPDATE ... SET value = MAX(value, n), pour que la prochaine valeur
+    attribuée ne le reprenne pas. Sans effet si la séquence n'existe pas
+    encore : sa fonction `initial` lira les numéros déjà enregistrés.
+    """
+    Sequence.objects.filter(name=name, value__lt=value).update(
+        value=Greatest(F('value'), value), updated_at=timezone.now()
+    )
+
+
+def next_number(prefix, width=5, yearly=False, initial=None):
+    """
+    Numéro formaté « PRÉFIXE-N » ou, avec yearly=True, « PRÉFIXE-AAAA-N »
+    (la numérotation repart à 1 chaque année). N est complété par des zéros
+    sur `width` chiffres, puis s'allonge au-delà (ORD-00999, ORD-01000...).
+    """
+    if yearly:
+        prefix = f"{prefix}-{timezone.localdate().year}"
+    value = next_value(prefix, initial=initial)
+    return f"{prefix}-{value:0{width}d}"
@@ -6,6 +6,6 @@ set -o errexit  # Exit on error
 echo "Application des migrations..."
 python manage.py migrate --noinput
 
-echo "Démarrage du serveur Gunicorn..."
-exec gunicorn my_store.wsgi:application
+echo "Démarrage du serveur ASGI (Uvicorn)..."
+exec uvicorn my_store.asgi:application --host 0.0.0.0 --port "${PORT:-8000}"
 
@@ -0,0 +1,163 @@
+from collections import OrderedDict
+
+from django.db.models import Count, Q, Sum
+
+from .models import StockEntry
+
+
+# Mesures par défaut utilisées par les statistiques de stock
+STOCK_MEASURES = {
+    'nombre': Count('id'),
+    'tonnage': Sum('tonnage_total'),
+    'sacs': Sum('nombre_sacs'),
+}
+
+
+def _add(a, b):
+    """Additionne deux valeurs agrégées en traitant None comme 0"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a + b
+
+
+def measure_names(measures, split=None):
+    """Noms des mesures produites par grouped_aggregate (y compris conditionnelles)"""
+    names = list(measures)
+    if split:
+        _, values = split
+        names += [f'{name}_{value}' for value in values for name in measures]
+    return names
+
+
+def grouped_aggregate(queryset, dimensions, measures, split=None):
+    """
+    Exécute UNE seule requête GROUP BY sur les dimensions données.
+
+    - dimensions : liste de champs pour le GROUP BY (ex: ['numero_magasin', 'type_denree'])
+    - measures : dict nom -> agrégat Django (ex: {'nombre': Count('id')})
+    - split : tuple optionnel (champ, valeurs) ; pour chaque valeur, une mesure
+      conditionnelle '<nom>_<valeur>' est ajoutée avec filter=Q(champ=valeur),
+      ce qui permet de séparer par ex. entrées et sorties dans la même passe.
+
+    Retourne la liste des lignes (dicts) produites par values().annotate().
+    """
+    annotations = dict(measures)
+    if split:
+        field, values = split
+        for value in values:
+            for name, aggregate in measures.items():
+                conditional = aggregate.copy()
+                conditional.filter = Q(**{field: value})
+                annotations[f'{name}_{value}'] = conditional
+
+    return list(
+        queryset.order_by().values(*dimensions).annotate(**annotations).order_by(*dimensions)
+    )
+
+
+def rollup(rows, measures, dimension=None):
+    """
+    Cumule en Python les lignes produites par grouped_aggregate.
+
+    Sans dimension, retourne un seul dict de totaux ; avec une dimension,
+    retourne un OrderedDict valeur -> totaux (dans l'ordre des lignes).
+    """
+    grouped = OrderedDict()
+    for row in rows:
+        key = row[dimension] if dimension else None
+        totals = grouped.setdefault(key, dict.fromkeys(measures))
+        for name in measures:
+            totals[name] = _add(totals[name], row[name])
+    if dimension:
+        return grouped
+    return grouped.get(None, dict.fromkeys(measures))
+
+
+def stock_stats(queryset, split_operation=False):
+    """
+    Calcule les statistiques de l'endpoint stock-entries/stats/ en une seule requête :
+    totaux, répartition par magasin et répartition par type de denrée.
+    """
+    split = ('type_operation', [code for code, _ in StockEntry.TYPE_OPERATION_CHOICES]) if split_operation else None
+    dimensions = ['numero_magasin', 'type_denree']
+    rows = grouped_aggregate(queryset, dimensions, STOCK_MEASURES, split=split)
+    measures = measure_names(STOCK_MEASURES, split)
+
+    totals = rollup(rows, measures)
+    par_magasin_rows = rollup(rows, measures, 'numero_magasin')
+    par_type_rows = rollup(rows, measures, 'type_denree')
+
+    def _split(values, data):
+        # Détail entrées / sorties issu des agrégats conditionnels
+        if split_operation:
+            for code, _ in StockEntry.TYPE_OPERATION_CHOICES:
+                data[code] = {
+                    'nombre': values.get(f'nombre_{code}') or 0,
+                    'tonnage': float(values.get(f'tonnage_{code}') or 0),
+                    'sacs': values.get(f'sacs_{code}') or 0,
+                }
+        return data
+
+    def _format(values):
+        return _split(values, {
+            'nombre': values.get('nombre') or 0,
+            'tonnage': float(values.get('tonnage') or 0),
+        })
+
+    stats = _split(totals, {
+        'total_entrees': totals.get('nombre') or 0,
+        'total_tonnage': float(totals.get('tonnage') or 0),
+        'total_sacs': totals.get('sacs') or 0,
+        'par_magasin': {},
+        'par_type_denree': {},
+    })
+
+    # Tous les magasins apparaissent, même sans mouvement
+    for magasin_code, magasin_name in StockEntry.MAGASIN_CHOICES:
+        stats['par_magasin'][magasin_name] = _format(par_magasin_rows.get(magasin_code, {}))
+
+    for type_d, values in par_type_rows.items():
+        stats['par_type_denree'][type_d] = _format(values)
+
+    return stats
+
+
+def stock_details(balances):
+    """
+    Formate la réponse de stock-entries/details/ à partir de soldes
+    {(magasin, denrée, poids): {'nombre_sacs', 'tonnage', 'nombre_operations'}}
+    (issus de StockBalance ou recalculés depuis le registre).
+    """
+    details_by_type = OrderedDict()
+    for (_, type_d, poids), values in sorted(balances.items(), key=lambda item: item[0][1]):
+        if not values['nombre_operations']:
+            continue
+        data = details_by_type.setdefault(type_d, {
+            'sacs_80kg': 0,
+            'sacs_100kg': 0,
+            'total_sacs': 0,
+            'total_tonnage': 0,
+            'nombre_entrees': 0,
+        })
+        if poids == 80:
+            data['sacs_80kg'] += values['nombre_sacs']
+        elif poids == 100:
+            data['sacs_100kg'] += values['nombre_sacs']
+        data['total_sacs'] += values['nombre_sacs']
+        data['total_tonnage'] += float(values['tonnage'])
+        data['nombre_entrees'] += values['nombre_operations']
+
+    # S'assurer que le stock n'est pas négatif
+    return [
+        {
+            'type_denree': type_d,
+            'sacs_80kg': max(0, data['sacs_80kg']),
+            'sacs_100kg': max(0, data['sacs_100kg']),
+            'total_sacs': max(0, data['total_sacs']),
+            'total_tonnage': max(0, round(data['total_tonnage'], 2)),
+            'nombre_entrees': data['nombre_entrees'],
+        }
+        for type_d, data in details_by_type.items()
+    ]
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class StockConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'stock'
+
+    def ready(self):
+        # Maintenir le solde matérialisé (StockBalance) lors des suppressions
+        from .signals import connect_signals
+        connect_signals()
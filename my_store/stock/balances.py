@@ -0,0 +1,195 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, IntegerField, Sum, Value, When
+from django.utils import timezone
+
+from caching.cache import invalidate
+
+from .aggregates import grouped_aggregate
+from .models import StockEntry, StockBalance
+
+
+BALANCE_KEY = ['numero_magasin', 'type_denree', 'poids_par_sac']
+CENTIMES = Decimal('0.01')
+
+
+def _decimal(value):
+    return Decimal(str(value or 0)).quantize(CENTIMES)
+
+
+def balance_key(numero_magasin, type_denree, poids_par_sac):
+    """Clé normalisée (magasin, denrée, poids) d'une ligne StockBalance"""
+    return (str(numero_magasin), type_denree, _decimal(poids_par_sac))
+
+
+def entry_contribution(entry, nombre_sacs=None):
+    """
+    Contribution signée d'une StockEntry au solde : (clé, sacs, tonnage).
+    Les entrées s'ajoutent, les sorties se soustraient.
+    """
+    sign = 1 if entry.type_operation == 'entree' else -1
+    sacs = entry.nombre_sacs if nombre_sacs is None else nombre_sacs
+    tonnage = _decimal(Decimal(sacs) * Decimal(str(entry.poids_par_sac)))
+    key = balance_key(entry.numero_magasin, entry.type_denree, entry.poids_par_sac)
+    return key, sign * sacs, sign * tonnage
+
+
+def apply_deltas(deltas):
+    """
+    Applique un lot de variations {clé: [sacs, tonnage, operations]} à StockBalance.
+    Chaque variation est une mise à jour F() atomique, à exécuter dans la
+    transaction de l'écriture d'origine.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        for (numero_magasin, type_denree, poids_par_sac), (sacs, tonnage, operations) in deltas.items():
+            if not sacs and not tonnage and not operations:
+                continue
+            balance, _ = StockBalance.objects.get_or_create(
+                numero_magasin=numero_magasin,
+                type_denree=type_denree,
+                poids_par_sac=poids_par_sac,
+            )
+            StockBalance.objects.filter(pk=balance.pk).update(
+                nombre_sacs=F('nombre_sacs') + sacs,
+                tonnage=F('tonnage') + tonnage,
+                nombre_operations=F('nombre_operations') + operations,
+                updated_at=now,
+            )
+    # Mises à jour F() : pas de signal, invalider explicitement les agrégats en cache
+    invalidate('stock.StockBalance')
+
+
+def change_deltas(changes):
+    """
+    Variations de solde d'une liste de changements (previous, current) :
+    création (previous=None), modification, suppression (current=None).
+    """
+    deltas = defaultdict(lambda: [0, Decimal('0.00'), 0])
+    for previous, current in changes:
+        if previous is not None:
+            key, sacs, tonnage = entry_contribution(previous)
+            deltas[key][0] -= sacs
+            deltas[key][1] -= tonnage
+            deltas[key][2] -= 1
+        if current is not None:
+            key, sacs, tonnage = entry_contribution(current)
+            deltas[key][0] += sacs
+            deltas[key][1] += tonnage
+            deltas[key][2] += 1
+    return deltas
+
+
+def apply_entry_change(previous, current):
+    """
+    Répercute la création (previous=None), la modification ou la suppression
+    (current=None) d'une StockEntry sur le solde matérialisé.
+    """
+    apply_deltas(change_deltas([(previous, current)]))
+
+
+def adjust_entries_sacs(entries, quantities):
+    """
+    Ajoute (ou retire si négatif) des sacs à plusieurs StockEntry en un seul UPDATE
+    F() ; le tonnage_total suit. entries : {id: StockEntry} tel que lu avant la mise
+    à jour (pour la clé de solde), quantities : {id: variation de sacs}.
+    Les variations correspondantes sont aussi appliquées à StockBalance.
+    """
+    quantities = {entry_id: n for entry_id, n in quantities.items() if n}
+    if not quantities:
+        return
+    variation = Case(
+        *[When(id=entry_id, then=Value(n)) for entry_id, n in quantities.items()],
+        default=Value(0),
+        output_field=IntegerField()
+    )
+    StockEntry.objects.filter(id__in=quantities).update(
+        nombre_sacs=F('nombre_sacs') + variation,
+        tonnage_total=ExpressionWrapper(
+            (F('nombre_sacs') + variation) * F('poids_par_sac'),
+            output_field=DecimalField(max_digits=12, decimal_places=2)
+        ),
+        updated_at=timezone.now(),
+    )
+    invalidate('stock.StockEntry')
+
+    deltas = defaultdict(lambda: [0, Decimal('0.00'), 0])
+    for entry_id, n in quantities.items():
+        key, sacs, tonnage = entry_contribution(entries[entry_id], n)
+        deltas[key][0] += sacs
+        deltas[key][1] += tonnage
+    apply_deltas(deltas)
+
+
+def available_sacs(type_denree, numero_magasin):
+    """Stock disponible (tous poids confondus) pour une denrée dans un magasin"""
+    return StockBalance.objects.filter(
+        type_denree=type_denree,
+        numero_magasin=numero_magasin
+    ).aggregate(total=Sum('nombre_sacs'))['total'] or 0
+
+
+def ledger_balances(queryset=None):
+    """
+    Recalcule les soldes depuis le registre brut (une requête GROUP BY).
+    Retourne un dict {clé: {'nombre_sacs', 'tonnage', 'nombre_operations'}}.
+    """
+    if queryset is None:
+        queryset = StockEntry.objects.all()
+    rows = grouped_aggregate(
+        queryset,
+        BALANCE_KEY,
+        {'sacs': Sum('nombre_sacs'), 'tonnage': Sum('tonnage_total'), 'nombre': Count('id')},
+        split=('type_operation', ['entree', 'sortie']),
+    )
+    balances = {}
+    for row in rows:
+        key = balance_key(row['numero_magasin'], row['type_denree'], row['poids_par_sac'])
+        balances[key] = {
+            'nombre_sacs': (row['sacs_entree'] or 0) - (row['sacs_sortie'] or 0),
+            'tonnage': _decimal(row['tonnage_entree']) - _decimal(row['tonnage_sortie']),
+            'nombre_operations': row['nombre'],
+        }
+    return balances
+
+
+def rebuild_balances():
+    """Reconstruit entièrement StockBalance depuis le registre. Retourne le nombre de lignes."""
+    balances = ledger_balances()
+    with transaction.atomic():
+        StockBalance.objects.all().delete()
+        StockBalance.objects.bulk_create([
+            StockBalance(
+                numero_magasin=numero_magasin,
+                type_denree=type_denree,
+                poids_par_sac=poids_par_sac,
+                **values
+            )
+            for (numero_magasin, type_denree, poids_par_sac), values in balances.items()
+        ], batch_size=1000)
+    invalidate('stock.StockBalance')
+    return len(balances)
+
+
+def verify_balances():
+    """
+    Compare StockBalance au registre brut.
+    Retourne la liste des écarts (clé, attendu, trouvé) ; vide si tout est cohérent.
+    """
+    expected = ledger_balances()
+    found = {
+        balance_key(b.numero_magasin, b.type_denree, b.poids_par_sac): {
+            'nombre_sacs': b.nombre_sacs,
+            'tonnage': _decimal(b.tonnage),
+            'nombre_operations': b.nombre_operations,
+        }
+        for b in StockBalance.objects.all()
+    }
+    empty = {'nombre_sacs': 0, 'tonnage': Decimal('0.00'), 'nombre_operations': 0}
+    differences = []
+    for key in sorted(set(expected) | set(found), key=str):
+        if expected.get(key, empty) != found.get(key, empty):
+            differences.append((key, expected.get(key), found.get(key)))
+    return differences
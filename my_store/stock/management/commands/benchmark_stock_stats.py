@@ -0,0 +1,60 @@
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from stock.aggregates import stock_stats
+from stock.models import StockEntry
+
+
+class _Rollback(Exception):
+    """Annule la transaction de benchmark une fois les mesures prises"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le nombre de requêtes et le temps de stock-entries/stats/ "
+        "en fonction du nombre de types de denrée (les données sont annulées à la fin)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--denrees', default='5,50,500',
+                            help="Nombres de types de denrée à tester, séparés par des virgules")
+        parser.add_argument('--rows-per-denree', type=int, default=20,
+                            help="Nombre de lignes de stock générées par type de denrée")
+
+    def handle(self, *args, **options):
+        magasins = [code for code, _ in StockEntry.MAGASIN_CHOICES]
+        for nb_denrees in [int(n) for n in options['denrees'].split(',') if n.strip()]:
+            try:
+                with transaction.atomic():
+                    entries = [
+                        StockEntry(
+                            date=date.today(),
+                            type_operation='entree' if i % 3 else 'sortie',
+                            type_denree=f"Denrée {d}",
+                            nombre_sacs=10,
+                            poids_par_sac=Decimal('80.00'),
+                            tonnage_total=Decimal('800.00'),
+                            numero_magasin=magasins[i % len(magasins)],
+                        )
+                        for d in range(nb_denrees)
+                        for i in range(options['rows_per_denree'])
+                    ]
+                    StockEntry.objects.bulk_create(entries, batch_size=1000)
+
+                    with CaptureQueriesContext(connection) as ctx:
+                        start = time.perf_counter()
+                        stock_stats(StockEntry.objects.all(), split_operation=True)
+                        elapsed = (time.perf_counter() - start) * 1000
+
+                    self.stdout.write(
+                        f"denrées={nb_denrees:>5} lignes={len(entries):>7} "
+                        f"requêtes={len(ctx.captured_queries)} temps={elapsed:.1f} ms"
+                    )
+                    raise _Rollback()
+            except _Rollback:
+                pass
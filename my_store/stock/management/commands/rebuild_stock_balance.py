@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from stock.balances import rebuild_balances, verify_balances
+
+
+class Command(BaseCommand):
+    help = "Reconstruit et/ou vérifie la table StockBalance à partir du registre StockEntry."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help="Vérifier seulement, sans reconstruire (code de sortie non nul en cas d'écart)")
+
+    def handle(self, *args, **options):
+        if not options['verify']:
+            count = rebuild_balances()
+            self.stdout.write(self.style.SUCCESS(f"{count} soldes de stock reconstruits"))
+
+        differences = verify_balances()
+        for key, expected, found in differences:
+            self.stdout.write(f"Écart {key}: attendu={expected} trouvé={found}")
+        if differences:
+            raise CommandError(f"{len(differences)} écart(s) entre StockBalance et le registre")
+        self.stdout.write(self.style.SUCCESS("StockBalance cohérent avec le registre"))
@@ -0,0 +1,81 @@
+import threading
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, OperationalError
+from rest_framework import serializers
+
+from stock.balances import verify_balances
+from stock.models import StockEntry, CamionChargement
+from stock.serializers import CamionChargementCreateSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Lance des chargements de camion concurrents sur la même entrée de stock "
+        "et vérifie qu'aucune survente n'a lieu. Les données créées sont supprimées à la fin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--loadings', type=int, default=10, help="Chargements par thread")
+        parser.add_argument('--stock', type=int, default=50, help="Sacs disponibles dans l'entrée testée")
+        parser.add_argument('--sacs', type=int, default=3, help="Sacs demandés par chargement")
+
+    def handle(self, *args, **options):
+        entry = StockEntry.objects.create(
+            date=date.today(),
+            type_operation='entree',
+            type_denree='__stress__',
+            nombre_sacs=options['stock'],
+            poids_par_sac=Decimal('80.00'),
+        )
+        results = {'ok': 0, 'refuse': 0, 'verrou': 0}
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                for _ in range(options['loadings']):
+                    serializer = CamionChargementCreateSerializer(data={
+                        'date_chargement': date.today().isoformat(),
+                        'type_denree': '__stress__',
+                        'nombre_sacs': options['sacs'],
+                        'stock_items': [{'stock_entry_id': entry.id, 'nombre_sacs_utilises': options['sacs']}],
+                    })
+                    serializer.is_valid(raise_exception=True)
+                    try:
+                        serializer.save()
+                        outcome = 'ok'
+                    except serializers.ValidationError:
+                        outcome = 'refuse'
+                    except OperationalError:
+                        # SQLite : "database is locked" quand les écritures se chevauchent
+                        outcome = 'verrou'
+                    with lock:
+                        results[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        try:
+            entry.refresh_from_db()
+            chargements = CamionChargement.objects.filter(type_denree='__stress__')
+            sacs_charges = sum(c.nombre_sacs for c in chargements)
+            self.stdout.write(
+                f"chargements acceptés={results['ok']} refusés={results['refuse']} "
+                f"verrouillés={results['verrou']} stock restant={entry.nombre_sacs}"
+            )
+            if entry.nombre_sacs < 0 or entry.nombre_sacs + sacs_charges != options['stock']:
+                raise CommandError("Survente détectée : le stock ne correspond pas aux chargements acceptés")
+            if verify_balances():
+                raise CommandError("StockBalance incohérent après les chargements concurrents")
+            self.stdout.write(self.style.SUCCESS("Aucune survente"))
+        finally:
+            CamionChargement.objects.filter(type_denree='__stress__').delete()
+            entry.delete()
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.9 on 2026-10-17 04:12
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def populate_stock_balance(apps, schema_editor):
+    """Initialiser les soldes à partir du registre StockEntry existant"""
+    StockEntry = apps.get_model('stock', 'StockEntry')
+    StockBalance = apps.get_model('stock', 'StockBalance')
+
+    rows = StockEntry.objects.order_by().values('numero_magasin', 'type_denree', 'poids_par_sac').annotate(
+        sacs_entree=Sum('nombre_sacs', filter=Q(type_operation='entree')),
+        sacs_sortie=Sum('nombre_sacs', filter=Q(type_operation='sortie')),
+        tonnage_entree=Sum('tonnage_total', filter=Q(type_operation='entree')),
+        tonnage_sortie=Sum('tonnage_total', filter=Q(type_operation='sortie')),
+        nombre=Count('id'),
+    )
+    StockBalance.objects.bulk_create([
+        StockBalance(
+            numero_magasin=row['numero_magasin'],
+            type_denree=row['type_denree'],
+            poids_par_sac=row['poids_par_sac'],
+            nombre_sacs=(row['sacs_entree'] or 0) - (row['sacs_sortie'] or 0),
+            tonnage=(row['tonnage_entree'] or Decimal('0.00')) - (row['tonnage_sortie'] or Decimal('0.00')),
+            nombre_operations=row['nombre'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0010_camionchargement_proprietaire'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numero_magasin', models.CharField(choices=[('1', 'Djaradougou'), ('2', 'Ouezzin-ville'), ('3', 'Bamako')], max_length=20, verbose_name='Numéro du magasin')),
+                ('type_denree', models.CharField(max_length=100, verbose_name='Type de denrée')),
+                ('poids_par_sac', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Poids par sac (kg)')),
+                ('nombre_sacs', models.IntegerField(default=0, verbose_name='Nombre de sacs disponibles')),
+                ('tonnage', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Tonnage disponible (kg)')),
+                ('nombre_operations', models.IntegerField(default=0, verbose_name="Nombre d'opérations")),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Solde de stock',
+                'verbose_name_plural': 'Soldes de stock',
+                'ordering': ['type_denree', 'numero_magasin', 'poids_par_sac'],
+                'unique_together': {('numero_magasin', 'type_denree', 'poids_par_sac')},
+            },
+        ),
+        migrations.RunPython(populate_stock_balance, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-17 05:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0012_alter_camionchargement_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='camionchargement',
+            index=models.Index(fields=['-date_chargement', '-created_at'], name='camion_chargement_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockentry',
+            index=models.Index(fields=['-date', '-created_at'], name='stock_entry_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockentry',
+            index=models.Index(fields=['numero_magasin', 'type_denree', 'type_operation'], name='stock_entry_magasin_idx'),
+        ),
+    ]
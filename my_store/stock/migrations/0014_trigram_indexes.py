@@ -0,0 +1,18 @@
+from django.db import migrations
+
+from my_store.indexes import CreateTrigramIndex
+
+
+class Migration(migrations.Migration):
+    """Index trigrammes des recherches __icontains (PostgreSQL uniquement, voir my_store.indexes)"""
+
+    dependencies = [
+        ('stock', '0013_camionchargement_camion_chargement_date_idx_and_more'),
+    ]
+
+    operations = [
+        CreateTrigramIndex('stockentry', 'type_denree', 'stock_entry_denree_trgm'),
+        CreateTrigramIndex('stockentry', 'nom_fournisseur', 'stock_entry_fournisseur_trgm'),
+        CreateTrigramIndex('camionchargement', 'type_denree', 'camion_chargement_denree_trgm'),
+        CreateTrigramIndex('camionchargement', 'numero_camion', 'camion_chargement_camion_trgm'),
+    ]
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from account.models import User
+from my_store.derived import derive
 from decimal import Decimal
 from django.core.exceptions import ValidationError
 
@@ -53,12 +54,20 @@ class StockEntry(models.Model):
         related_name='stock_entries_created'
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def save(self, *args, **kwargs):
-        # Calcul automatique du tonnage total
-        self.tonnage_total = Decimal(self.nombre_sacs) * Decimal(self.poids_par_sac)
-        super().save(*args, **kwargs)
+        # Calcul automatique du tonnage total (règle partagée avec les écritures groupées)
+        derive([self])
+        
+        # Mettre à jour le solde matérialisé (StockBalance) dans la même transaction
+        from .balances import apply_entry_change
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = StockEntry.objects.select_for_update().filter(pk=self.pk).first()
+            super().save(*args, **kwargs)
+            apply_entry_change(previous, self)
     
 
     def __str__(self):
@@ -69,6 +78,50 @@ class StockEntry(models.Model):
         verbose_name = "Entrée de stock"
         verbose_name_plural = "Entrées de stock"
         ordering = ['-date', '-created_at']
+        indexes = [
+            # Liste triée par date (ordre par défaut) et filtres date_from / date_to
+            models.Index(fields=['-date', '-created_at'], name='stock_entry_date_idx'),
+            # Filtres magasin / denrée / opération (stats, transactions_magasin, sorties)
+            models.Index(fields=['numero_magasin', 'type_denree', 'type_operation'], name='stock_entry_magasin_idx'),
+        ]
+
+
+class StockBalance(models.Model):
+    """
+    Solde de stock matérialisé par magasin, type de denrée et poids de sac.
+    Maintenu de façon incrémentale à chaque écriture sur StockEntry
+    (entrées positives, sorties négatives) ; reconstructible avec
+    la commande rebuild_stock_balance.
+    """
+    numero_magasin = models.CharField(
+        max_length=20,
+        choices=StockEntry.MAGASIN_CHOICES,
+        verbose_name="Numéro du magasin"
+    )
+    type_denree = models.CharField(max_length=100, verbose_name="Type de denrée")
+    poids_par_sac = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name="Poids par sac (kg)"
+    )
+    nombre_sacs = models.IntegerField(verbose_name="Nombre de sacs disponibles", default=0)
+    tonnage = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        verbose_name="Tonnage disponible (kg)",
+        default=Decimal('0.00')
+    )
+    nombre_operations = models.IntegerField(verbose_name="Nombre d'opérations", default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.type_denree} - {self.get_numero_magasin_display()} - {self.poids_par_sac}kg : {self.nombre_sacs} sacs"
+
+    class Meta:
+        verbose_name = "Solde de stock"
+        verbose_name_plural = "Soldes de stock"
+        unique_together = ['numero_magasin', 'type_denree', 'poids_par_sac']
+        ordering = ['type_denree', 'numero_magasin', 'poids_par_sac']
 
 
 class CamionChargement(models.Model):
@@ -133,17 +186,13 @@ class CamionChargement(models.Model):
         related_name='camion_chargements_created'
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def save(self, *args, **kwargs):
         # Calcul automatique du tonnage total
         # Seulement si nombre_sacs ET poids_par_sac sont tous les deux remplis
         # Et seulement si le tonnage n'a pas déjà été défini (pour permettre la saisie manuelle)
-        if self.nombre_sacs > 0 and self.poids_par_sac > 0:
-            # Si le tonnage est 0 ou None, le calculer automatiquement
-            if not self.tonnage_total or self.tonnage_total == 0:
-                self.tonnage_total = Decimal(self.nombre_sacs) * Decimal(self.poids_par_sac)
-            # Sinon, le tonnage a été saisi manuellement, on le garde tel quel
+        derive([self])
         super().save(*args, **kwargs)
     
     @property
@@ -160,6 +209,9 @@ class CamionChargement(models.Model):
         verbose_name = "Chargement de camion"
         verbose_name_plural = "Chargements de camion"
         ordering = ['-date_chargement', '-created_at']
+        indexes = [
+            models.Index(fields=['-date_chargement', '-created_at'], name='camion_chargement_date_idx'),
+        ]
 
 
 class ChargementStockItem(models.Model):
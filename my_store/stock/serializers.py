@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from decimal import Decimal
+from django.db import transaction
 from .models import StockEntry, CamionChargement, ChargementStockItem
+from .balances import adjust_entries_sacs, available_sacs
 
 
 class StockEntrySerializer(serializers.ModelSerializer):
@@ -32,28 +34,15 @@ class StockEntryCreateSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         """Valider que les sorties ne dépassent pas le stock disponible"""
-        if data.get('type_operation') == 'sortie':
+        # Enregistrement groupé (bulk/) : contrôle fait sur tout le lot par le ViewSet
+        if data.get('type_operation') == 'sortie' and not self.context.get('bulk'):
             type_denree = data.get('type_denree')
             numero_magasin = data.get('numero_magasin')
             nombre_sacs = data.get('nombre_sacs', 0)
             
             if type_denree and numero_magasin and nombre_sacs > 0:
-                from django.db.models import Sum
-                from .models import StockEntry
-                
-                entrees = StockEntry.objects.filter(
-                    type_operation='entree',
-                    type_denree=type_denree,
-                    numero_magasin=numero_magasin
-                ).aggregate(Sum('nombre_sacs'))['nombre_sacs__sum'] or 0
-                
-                sorties = StockEntry.objects.filter(
-                    type_operation='sortie',
-                    type_denree=type_denree,
-                    numero_magasin=numero_magasin
-                ).aggregate(Sum('nombre_sacs'))['nombre_sacs__sum'] or 0
-                
-                stock_disponible = entrees - sorties
+                # Lecture O(1) du solde matérialisé au lieu de deux Sum() sur tout l'historique
+                stock_disponible = available_sacs(type_denree, numero_magasin)
                 
                 if nombre_sacs > stock_disponible:
                     raise serializers.ValidationError({
@@ -145,39 +134,58 @@ class CamionChargementCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         stock_items_data = validated_data.pop('stock_items', [])
         
-        # Créer le chargement
-        chargement = CamionChargement.objects.create(**validated_data)
+        # Regrouper les quantités demandées par entrée de stock
+        demandes = {}
+        for item_data in stock_items_data:
+            try:
+                stock_entry_id = int(item_data.get('stock_entry_id'))
+                nombre_sacs_utilises = int(item_data.get('nombre_sacs_utilises', 0) or 0)
+            except (TypeError, ValueError):
+                raise serializers.ValidationError("Article de stock invalide: stock_entry_id et nombre_sacs_utilises doivent être des entiers")
+            if nombre_sacs_utilises < 0:
+                raise serializers.ValidationError(f"Nombre de sacs invalide pour l'entrée {stock_entry_id}")
+            demandes[stock_entry_id] = demandes.get(stock_entry_id, 0) + nombre_sacs_utilises
         
-        # Créer les items de stock associés et soustraire du stock
-        from django.db import transaction
+        # Tout se fait dans une seule transaction : création du chargement,
+        # verrouillage des entrées, décrément du stock et création des items
         with transaction.atomic():
-            for item_data in stock_items_data:
-                stock_entry_id = item_data.get('stock_entry_id')
-                nombre_sacs_utilises = item_data.get('nombre_sacs_utilises', 0)
-                
-                try:
-                    stock_entry = StockEntry.objects.get(id=stock_entry_id)
-                    
-                    # Vérifier que le stock est suffisant
-                    if nombre_sacs_utilises > stock_entry.nombre_sacs:
-                        raise serializers.ValidationError(
-                            f"Stock insuffisant pour l'entrée {stock_entry_id}. "
-                            f"Disponible: {stock_entry.nombre_sacs}, Demandé: {nombre_sacs_utilises}"
-                        )
-                    
-                    # Créer l'item de chargement
-                    ChargementStockItem.objects.create(
-                        chargement=chargement,
-                        stock_entry=stock_entry,
-                        nombre_sacs_utilises=nombre_sacs_utilises
-                    )
-                    
-                    # Soustraire du stock
-                    stock_entry.nombre_sacs -= nombre_sacs_utilises
-                    stock_entry.save()
-                    
-                except StockEntry.DoesNotExist:
+            chargement = CamionChargement.objects.create(**validated_data)
+            
+            if not demandes:
+                return chargement
+            
+            # Verrouiller toutes les entrées en une requête, triées par id pour éviter les interblocages
+            entries = {
+                entry.id: entry
+                for entry in StockEntry.objects.select_for_update().filter(id__in=demandes).order_by('id')
+            }
+            
+            for stock_entry_id, nombre_sacs_utilises in demandes.items():
+                stock_entry = entries.get(stock_entry_id)
+                if stock_entry is None:
                     raise serializers.ValidationError(f"Entrée de stock {stock_entry_id} introuvable")
+                # Vérifier que le stock est suffisant
+                if nombre_sacs_utilises > stock_entry.nombre_sacs:
+                    raise serializers.ValidationError(
+                        f"Stock insuffisant pour l'entrée {stock_entry_id}. "
+                        f"Disponible: {stock_entry.nombre_sacs}, Demandé: {nombre_sacs_utilises}"
+                    )
+            
+            # Créer les items de chargement en une seule requête
+            ChargementStockItem.objects.bulk_create([
+                ChargementStockItem(
+                    chargement=chargement,
+                    stock_entry_id=stock_entry_id,
+                    nombre_sacs_utilises=nombre_sacs_utilises
+                )
+                for stock_entry_id, nombre_sacs_utilises in demandes.items()
+            ])
+            
+            # Soustraire du stock en un seul UPDATE (tonnage et solde matérialisé suivent)
+            adjust_entries_sacs(entries, {
+                stock_entry_id: -nombre_sacs_utilises
+                for stock_entry_id, nombre_sacs_utilises in demandes.items()
+            })
         
         return chargement
 
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete
+
+
+def stock_entry_deleted(sender, instance, **kwargs):
+    """Retirer la contribution d'une StockEntry supprimée du solde matérialisé"""
+    from .balances import apply_entry_change
+    apply_entry_change(instance, None)
+
+
+def connect_signals():
+    from .models import StockEntry
+    post_delete.connect(stock_entry_deleted, sender=StockEntry, dispatch_uid='stock_entry_balance')
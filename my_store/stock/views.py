@@ -2,11 +2,20 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from django.db.models import Sum, Q, Count
+from django.db.models import Sum, Q, Count, Prefetch
 from django.db import transaction
 from collections import defaultdict
 import logging
-from .models import StockEntry, CamionChargement, ChargementStockItem
+from .models import StockEntry, StockBalance, CamionChargement, ChargementStockItem
+from my_store.query_plans import QueryPlanMixin
+from my_store.replica import ReplicaReadMixin
+from my_store.conditional import ConditionalGetMixin
+from sync.mixins import DeltaSyncMixin
+from caching.cache import cached_aggregate
+from my_store.xlsx import XlsxExportMixin
+from my_store.bulk import BulkWriteMixin
+from .aggregates import stock_stats, stock_details
+from .balances import adjust_entries_sacs, apply_deltas, balance_key, change_deltas, ledger_balances
 from .serializers import (
     StockEntrySerializer, StockEntryCreateSerializer, StockEntryListSerializer,
     CamionChargementSerializer, CamionChargementCreateSerializer, CamionChargementListSerializer
@@ -15,10 +24,31 @@ from .serializers import (
 logger = logging.getLogger(__name__)
 
 
-class StockEntryViewSet(viewsets.ModelViewSet):
+class StockEntryViewSet(ReplicaReadMixin, QueryPlanMixin, ConditionalGetMixin, DeltaSyncMixin, BulkWriteMixin, XlsxExportMixin, viewsets.ModelViewSet):
     """ViewSet pour gérer les entrées de stock"""
     queryset = StockEntry.objects.all()
     permission_classes = [AllowAny]
+    # Rapports lus sur le réplica s'il est configuré (voir my_store.replica)
+    replica_actions = ['stats', 'details', 'transactions_magasin']
+    query_plans = {
+        'list': {},
+        'default': {'select_related': ['created_by']},
+    }
+    # Export Excel du registre (export_xlsx/), mêmes filtres que la liste
+    export_title = "Entrées de stock"
+    export_filename = "registre_stock"
+    export_ordering = ['date', 'created_at']
+    export_columns = [
+        ('Date', 'date', 12),
+        ('Opération', 'type_operation', 10),
+        ('Magasin', 'numero_magasin', 15),
+        ('Fournisseur / Client', 'nom_fournisseur', 30),
+        ('Denrée', 'type_denree', 15),
+        ('Nombre de sacs', 'nombre_sacs', 14),
+        ('Poids par sac (kg)', 'poids_par_sac', 16),
+        ('Tonnage total (kg)', 'tonnage_total', 16),
+        ('Notes', 'notes', 30),
+    ]
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -60,6 +90,63 @@ class StockEntryViewSet(viewsets.ModelViewSet):
         else:
             serializer.save(created_by=None)
 
+    # Enregistrement groupé (bulk/) : stock contrôlé et soldes mis à jour
+    # une seule fois pour tout le lot
+    def bulk_validate(self, rows, deleted):
+        """
+        Les sorties du lot sont contrôlées dans l'ordre contre le stock disponible
+        (une seule lecture des soldes), en tenant compte des suppressions et des
+        lignes précédentes du lot.
+        """
+        def stock_key(entry):
+            return (entry.type_denree, str(entry.numero_magasin))
+
+        def sacs(entry):
+            return entry.nombre_sacs if entry.type_operation == 'entree' else -entry.nombre_sacs
+
+        entries = [entry for row in rows for entry in (row.previous, row.instance) if entry is not None] + deleted
+        keys = {stock_key(entry) for entry in entries}
+        disponible = defaultdict(int)
+        if keys:
+            soldes = (
+                StockBalance.objects.filter(
+                    type_denree__in={key[0] for key in keys},
+                    numero_magasin__in={key[1] for key in keys},
+                )
+                .values('type_denree', 'numero_magasin')
+                .annotate(total=Sum('nombre_sacs'))
+            )
+            for solde in soldes:
+                disponible[(solde['type_denree'], solde['numero_magasin'])] = solde['total'] or 0
+
+        for entry in deleted:
+            disponible[stock_key(entry)] -= sacs(entry)
+
+        errors = {}
+        for row in rows:
+            entry, previous = row.instance, row.previous
+            if previous is not None:
+                disponible[stock_key(previous)] -= sacs(previous)
+            key = stock_key(entry)
+            if entry.type_operation == 'sortie' and entry.nombre_sacs > disponible[key]:
+                errors[row.index] = {
+                    'non_field_errors': [
+                        f"Stock insuffisant pour effectuer cette sortie. "
+                        f"Stock disponible: {disponible[key]} sacs, "
+                        f"demandé: {entry.nombre_sacs} sacs"
+                    ]
+                }
+                # La ligne n'est pas écrite : l'état précédent reste en stock
+                if previous is not None:
+                    disponible[stock_key(previous)] += sacs(previous)
+                continue
+            disponible[key] += sacs(entry)
+        return errors
+
+    def bulk_after_write(self, created, updated, deleted):
+        # Les suppressions passent par le signal post_delete (apply_entry_change)
+        apply_deltas(change_deltas([(None, entry) for entry in created] + updated))
+
     def destroy(self, request, *args, **kwargs):
         """
         Surcharge de la méthode destroy pour gérer explicitement la suppression.
@@ -126,30 +213,13 @@ class StockEntryViewSet(viewsets.ModelViewSet):
         if fournisseur:
             queryset = queryset.filter(nom_fournisseur__icontains=fournisseur)
         
-        stats = {
-            'total_entrees': queryset.count(),
-            'total_tonnage': float(queryset.aggregate(Sum('tonnage_total'))['tonnage_total__sum'] or 0),
-            'total_sacs': queryset.aggregate(Sum('nombre_sacs'))['nombre_sacs__sum'] or 0,
-            'par_magasin': {},
-            'par_type_denree': {}
-        }
-        
-        # Par magasin
-        for magasin_code, magasin_name in StockEntry.MAGASIN_CHOICES:
-            magasin_queryset = queryset.filter(numero_magasin=magasin_code)
-            stats['par_magasin'][magasin_name] = {
-                'nombre': magasin_queryset.count(),
-                'tonnage': float(magasin_queryset.aggregate(Sum('tonnage_total'))['tonnage_total__sum'] or 0)
-            }
-        
-        # Par type de denrée
-        types_denree = queryset.values_list('type_denree', flat=True).distinct()
-        for type_d in types_denree:
-            type_queryset = queryset.filter(type_denree=type_d)
-            stats['par_type_denree'][type_d] = {
-                'nombre': type_queryset.count(),
-                'tonnage': float(type_queryset.aggregate(Sum('tonnage_total'))['tonnage_total__sum'] or 0)
-            }
+        # Totaux, répartition par magasin et par denrée en une seule requête GROUP BY,
+        # mis en cache par filtres (invalidé à chaque écriture sur le stock)
+        split_operation = request.query_params.get('split_operation', '').lower() in ('1', 'true')
+        stats = cached_aggregate(
+            'stock-stats', request.query_params,
+            lambda: stock_stats(queryset, split_operation=split_operation)
+        )
         
         return Response(stats)
 
@@ -177,73 +247,29 @@ class StockEntryViewSet(viewsets.ModelViewSet):
         if fournisseur:
             queryset = queryset.filter(nom_fournisseur__icontains=fournisseur)
         
-        # Évaluer le queryset en liste pour forcer l'exécution de la requête
-        # et éviter tout problème de cache ou de lazy loading
-        entries_list = list(queryset)
-        
-        # Grouper par type de denrée
-        details_by_type = defaultdict(lambda: {
-            'type_denree': '',
-            'sacs_details': defaultdict(lambda: {'nombre': 0, 'poids': 0}),
-            'total_sacs': 0,
-            'total_tonnage': 0,
-            'entrees': []
-        })
-        
-        for entry in entries_list:
-            type_d = entry.type_denree
-            poids = float(entry.poids_par_sac)
-            # Pour les sorties, on soustrait, pour les entrées on additionne
-            nombre = entry.nombre_sacs if entry.type_operation == 'entree' else -entry.nombre_sacs
-            
-            # Initialiser le type de denrée
-            if not details_by_type[type_d]['type_denree']:
-                details_by_type[type_d]['type_denree'] = type_d
-            
-            # Ajouter les détails des sacs (les sorties sont négatives)
-            poids_key = f"{poids}kg"
-            details_by_type[type_d]['sacs_details'][poids_key]['nombre'] += nombre
-            details_by_type[type_d]['sacs_details'][poids_key]['poids'] = poids
-            
-            # Totaux (les sorties sont négatives)
-            details_by_type[type_d]['total_sacs'] += nombre
-            tonnage = float(entry.tonnage_total) if entry.type_operation == 'entree' else -float(entry.tonnage_total)
-            details_by_type[type_d]['total_tonnage'] += tonnage
-            
-            # Garder une trace des entrées pour référence
-            details_by_type[type_d]['entrees'].append({
-                'id': entry.id,
-                'date': entry.date.isoformat(),
-                'fournisseur': entry.nom_fournisseur,
-                'magasin': entry.get_numero_magasin_display(),
-            })
+        def compute():
+            if date_from or date_to or fournisseur:
+                # Filtres sur l'historique : recalculer depuis le registre (une requête GROUP BY)
+                balances = ledger_balances(queryset)
+            else:
+                # Sinon, lecture directe des soldes matérialisés
+                balance_queryset = StockBalance.objects.all()
+                if magasin:
+                    balance_queryset = balance_queryset.filter(numero_magasin=magasin)
+                if type_denree:
+                    balance_queryset = balance_queryset.filter(type_denree__icontains=type_denree)
+                balances = {
+                    balance_key(b.numero_magasin, b.type_denree, b.poids_par_sac): {
+                        'nombre_sacs': b.nombre_sacs,
+                        'tonnage': b.tonnage,
+                        'nombre_operations': b.nombre_operations,
+                    }
+                    for b in balance_queryset
+                }
+            return stock_details(balances)
         
-        # Formater la réponse
-        result = []
-        for type_d, data in details_by_type.items():
-            # Extraire les sacs de 80kg et 100kg séparément
-            sacs_80kg = 0
-            sacs_100kg = 0
-            
-            for poids_key, detail in data['sacs_details'].items():
-                poids = detail['poids']
-                nombre = detail['nombre']
-                if poids == 80:
-                    sacs_80kg += nombre
-                elif poids == 100:
-                    sacs_100kg += nombre
-            
-            result.append({
-                'type_denree': data['type_denree'],
-                'sacs_80kg': max(0, sacs_80kg),  # S'assurer que le stock n'est pas négatif
-                'sacs_100kg': max(0, sacs_100kg),  # S'assurer que le stock n'est pas négatif
-                'total_sacs': max(0, data['total_sacs']),  # S'assurer que le stock n'est pas négatif
-                'total_tonnage': max(0, round(data['total_tonnage'], 2)),  # S'assurer que le stock n'est pas négatif
-                'nombre_entrees': len(data['entrees']),
-            })
-        
-        # Trier par type de denrée
-        result.sort(key=lambda x: x['type_denree'])
+        # Mis en cache par filtres, invalidé à chaque écriture sur le stock (voir caching.cache)
+        result = cached_aggregate('stock-details', request.query_params, compute)
         
         return Response(result)
 
@@ -258,7 +284,7 @@ class StockEntryViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        queryset = StockEntry.objects.filter(numero_magasin=magasin).order_by('-date', '-created_at')
+        queryset = StockEntry.objects.filter(numero_magasin=magasin).select_related('created_by').order_by('-date', '-created_at')
         
         # Appliquer des filtres optionnels
         date_from = request.query_params.get('date_from', None)
@@ -282,10 +308,40 @@ class StockEntryViewSet(viewsets.ModelViewSet):
         })
 
 
-class CamionChargementViewSet(viewsets.ModelViewSet):
+class CamionChargementViewSet(QueryPlanMixin, ConditionalGetMixin, DeltaSyncMixin, XlsxExportMixin, viewsets.ModelViewSet):
     """ViewSet pour gérer les chargements de camion"""
     queryset = CamionChargement.objects.all()
     permission_classes = [AllowAny]
+    # Lots de stock imbriqués : inclus dans l'ETag
+    etag_related = ['stock_items']
+    query_plans = {
+        'list': {},
+        'destroy': {},
+        'default': {
+            'select_related': ['created_by'],
+            'prefetch_related': [Prefetch('stock_items', queryset=ChargementStockItem.objects.select_related('stock_entry'))],
+        },
+    }
+    # Export du registre des chargements (export_xlsx/ et tâches d'export)
+    export_title = "Chargements camion"
+    export_filename = "chargements_camion"
+    export_ordering = ['date_chargement', 'created_at']
+    export_columns = [
+        ('Date', 'date_chargement', 12),
+        ('Départ', 'ville_depart', 15),
+        ('Destination', 'destination', 15),
+        ('Produit', 'type_denree', 15),
+        ('Nombre de sacs', 'nombre_sacs', 12),
+        ('Tonnage (kg)', 'tonnage_total', 12),
+        ('Camion', 'numero_camion', 12),
+        ('Chauffeur', 'numero_chauffeur', 15),
+        ('Propriétaire', 'proprietaire', 15),
+        ("Date d'arrivée", 'date_arrivee', 12),
+        ('Poids arrivé', 'poids_arrive', 12),
+        ('Dépenses', 'depenses', 14),
+        ('Bénéfices', 'benefices', 14),
+    ]
+    export_totals = ['nombre_sacs', 'tonnage_total', 'depenses', 'benefices']
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -338,18 +394,22 @@ class CamionChargementViewSet(viewsets.ModelViewSet):
         
         try:
             with transaction.atomic():
-                # Récupérer tous les items de stock associés
-                stock_items = ChargementStockItem.objects.filter(chargement=instance)
+                # Récupérer tous les items et leurs entrées de stock en une seule requête
+                stock_items = list(
+                    ChargementStockItem.objects.filter(chargement=instance).select_related('stock_entry')
+                )
                 
-                # Restaurer le stock pour chaque item
+                # Restaurer le stock : un seul UPDATE agrégé par entrée de stock
+                entries = {}
+                restaurations = defaultdict(int)
                 for item in stock_items:
-                    stock_entry = item.stock_entry
-                    stock_entry.nombre_sacs += item.nombre_sacs_utilises
-                    stock_entry.save()
-                    logger.info(
-                        f"Stock restauré: {item.nombre_sacs_utilises} sacs ajoutés "
-                        f"à l'entrée {stock_entry.id}"
-                    )
+                    entries[item.stock_entry_id] = item.stock_entry
+                    restaurations[item.stock_entry_id] += item.nombre_sacs_utilises
+                adjust_entries_sacs(entries, restaurations)
+                logger.info(
+                    f"Stock restauré pour {len(restaurations)} entrée(s): "
+                    f"{sum(restaurations.values())} sacs"
+                )
                 
                 # Supprimer le chargement (les items seront supprimés en cascade)
                 instance.delete()
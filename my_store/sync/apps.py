@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class SyncConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'sync'
+
+    def ready(self):
+        # Enregistrer une trace (tombstone) à chaque suppression d'une ligne synchronisée
+        from .signals import connect_signals
+        connect_signals()
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    File d'attente d'un abonné au flux d'événements (une connexion SSE).
+    Si l'abonné ne lit pas assez vite, les événements en trop sont abandonnés
+    et overflow passe à True : le client doit alors tout resynchroniser.
+    """
+
+    def __init__(self, loop, models=None, maxsize=100):
+        self.loop = loop
+        self.models = set(models) if models else None
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflow = False
+
+    def wants(self, event):
+        return self.models is None or event['model'] in self.models
+
+    def put(self, event):
+        # Toujours appelé dans la boucle de l'abonné
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflow = True
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class InProcessBroker:
+    """
+    Diffusion des événements de changement aux abonnés du processus courant.
+
+    publish() peut être appelé depuis n'importe quel thread (signaux Django
+    exécutés dans le thread des vues synchrones) : la remise dans la file de
+    chaque abonné passe par la boucle asyncio de celui-ci.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+
+    def subscribe(self, models=None):
+        subscription = Subscription(asyncio.get_running_loop(), models)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscriptions)
+
+    def publish(self, event):
+        self.dispatch(event)
+
+    def dispatch(self, event):
+        """Remet l'événement aux abonnés locaux concernés"""
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if s.wants(event)]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # Boucle fermée : connexion terminée sans désabonnement
+                self.unsubscribe(subscription)
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Variante multi-processus : les événements passent par un canal PUBLISH /
+    SUBSCRIBE d'un serveur compatible Redis (Redis, Valkey, KeyDB... en local),
+    puis chaque processus les redistribue à ses propres abonnés.
+    Nécessite le paquet `redis` et SYNC_BROKER_URL.
+    """
+    channel = 'kss:changes'
+
+    def __init__(self, url=None):
+        super().__init__()
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("RedisBroker nécessite le paquet 'redis' (pip install redis)")
+        self.url = url or getattr(settings, 'SYNC_BROKER_URL', 'redis://localhost:6379/0')
+        self._client = redis.Redis.from_url(self.url)
+        self._listener = None
+
+    def subscribe(self, models=None):
+        # Un seul abonnement au serveur par processus, démarré au premier client
+        if self._listener is None:
+            self._listener = threading.Thread(target=self._listen, name='sync-redis-listener', daemon=True)
+            self._listener.start()
+        return super().subscribe(models)
+
+    def publish(self, event):
+        try:
+            self._client.publish(self.channel, json.dumps(event))
+        except Exception:
+            logger.exception("Publication de l'événement impossible sur %s", self.url)
+
+    def _listen(self):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        for message in pubsub.listen():
+            try:
+                self.dispatch(json.loads(message['data']))
+            except (TypeError, ValueError):
+                logger.warning("Événement illisible ignoré : %r", message.get('data'))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Broker configuré par SYNC_BROKER (chemin d'import), InProcessBroker par défaut"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'SYNC_BROKER', 'sync.broker.InProcessBroker')
+                _broker = import_string(path)()
+    return _broker
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+import tracemalloc
+import urllib.request
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+from sync.broker import InProcessBroker
+from sync.views import event_stream
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Test de charge du flux SSE : des centaines d'abonnés inactifs, puis "
+        "diffusion d'événements. Par défaut en mémoire (broker + générateur SSE) ; "
+        "avec --url, ouvre de vraies connexions HTTP vers un serveur uvicorn."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscribers', type=int, default=500, help="Nombre d'abonnés simultanés")
+        parser.add_argument('--events', type=int, default=50, help="Nombre d'événements diffusés")
+        parser.add_argument('--idle', type=float, default=3.0, help="Durée d'inactivité (s) avant diffusion")
+        parser.add_argument('--url', help="URL du flux (ex: http://127.0.0.1:8000/api/events/)")
+
+    def handle(self, *args, **options):
+        if options['url']:
+            asyncio.run(self._run_http(options))
+        else:
+            asyncio.run(self._run_in_process(options))
+
+    # ------------------------------------------------------------------
+    # En mémoire : coût du broker et des générateurs, latence de diffusion
+    # ------------------------------------------------------------------
+    async def _run_in_process(self, options):
+        count, nb_events = options['subscribers'], options['events']
+        broker = InProcessBroker()
+        latencies = []
+        received = [0] * count
+
+        async def consume(index, stream):
+            async for chunk in stream:
+                if chunk.startswith('event: change'):
+                    event = json.loads(chunk.split('data: ', 1)[1])
+                    latencies.append(time.perf_counter() - event['sent'])
+                    received[index] += 1
+                    if received[index] == nb_events:
+                        return
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        tasks = []
+        for index in range(count):
+            stream = event_stream(broker, broker.subscribe(), heartbeat=1)
+            tasks.append(asyncio.create_task(consume(index, stream)))
+        await asyncio.sleep(options['idle'])
+        per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / count
+        tracemalloc.stop()
+
+        self.stdout.write(f"{broker.subscriber_count} abonnés inactifs pendant {options['idle']}s, "
+                          f"~{per_subscriber / 1024:.1f} Ko par abonné")
+
+        # Les signaux publient depuis le thread des vues : même chose ici
+        def publish():
+            for index in range(nb_events):
+                broker.publish({'model': 'customers.customer', 'id': index, 'op': 'update',
+                                'sent': time.perf_counter()})
+                time.sleep(0.01)
+
+        start = time.perf_counter()
+        thread = threading.Thread(target=publish)
+        thread.start()
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=60)
+        thread.join()
+        elapsed = time.perf_counter() - start
+
+        delivered = sum(received)
+        self.stdout.write(f"{delivered}/{count * nb_events} événements remis en {elapsed:.2f}s")
+        self.stdout.write(
+            f"Latence de diffusion : p50 {statistics.median(latencies) * 1000:.2f} ms, "
+            f"p95 {_percentile(latencies, 95) * 1000:.2f} ms, max {max(latencies) * 1000:.2f} ms"
+        )
+        if delivered != count * nb_events:
+            self.stdout.write(self.style.ERROR("Des événements ont été perdus"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Aucun événement perdu"))
+
+    # ------------------------------------------------------------------
+    # HTTP : vraies connexions SSE vers un worker uvicorn
+    # ------------------------------------------------------------------
+    async def _run_http(self, options):
+        url = urlsplit(options['url'])
+        count, nb_events = options['subscribers'], options['events']
+        target = url.path + (f'?{url.query}' if url.query else '')
+        received = [0] * count
+        arrivals = []
+        sent_at = {}
+
+        async def subscribe(index):
+            reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+            writer.write(
+                f'GET {target} HTTP/1.1\r\nHost: {url.netloc}\r\nAccept: text/event-stream\r\n\r\n'.encode()
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            if b' 200 ' not in status_line:
+                raise RuntimeError(status_line.decode().strip())
+            return reader, writer
+
+        async def consume(index, reader):
+            while received[index] < nb_events:
+                line = await reader.readline()
+                if not line:
+                    return
+                if line.startswith(b'data: {'):
+                    event = json.loads(line[6:])
+                    if event.get('op') == 'create':
+                        arrivals.append((event['id'], time.perf_counter()))
+                        received[index] += 1
+
+        connections = await asyncio.gather(*(subscribe(i) for i in range(count)), return_exceptions=True)
+        opened = [c for c in connections if not isinstance(c, Exception)]
+        self.stdout.write(f"{len(opened)}/{count} connexions SSE ouvertes")
+        for error in {str(c) for c in connections if isinstance(c, Exception)}:
+            self.stdout.write(self.style.WARNING(f"Échec : {error}"))
+        await asyncio.sleep(options['idle'])
+
+        tasks = [asyncio.create_task(consume(i, reader)) for i, (reader, _) in enumerate(opened)]
+        base = f'{url.scheme}://{url.netloc}/api/customers/'
+
+        def request(method, path='', body=None):
+            data = json.dumps(body).encode() if body is not None else None
+            req = urllib.request.Request(base + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(req) as response:
+                return json.loads(response.read() or b'null')
+
+        # Chaque création de client déclenche un événement diffusé à tous
+        start = time.perf_counter()
+        created = []
+        for index in range(nb_events):
+            sent = time.perf_counter()
+            customer = await asyncio.to_thread(request, 'POST', body={'nom_prenom': f'Charge SSE {index}'})
+            sent_at[customer['id']] = sent
+            created.append(customer['id'])
+        await asyncio.wait(tasks, timeout=30)
+        elapsed = time.perf_counter() - start
+
+        for pk in created:
+            await asyncio.to_thread(request, 'DELETE', f'{pk}/')
+        for _, writer in opened:
+            writer.close()
+
+        delivered = sum(received)
+        latencies = [arrived - sent_at[pk] for pk, arrived in arrivals if pk in sent_at]
+        self.stdout.write(f"{delivered}/{len(opened) * nb_events} événements remis en {elapsed:.2f}s")
+        if latencies:
+            self.stdout.write(
+                f"Latence requête → événement : p50 {statistics.median(latencies) * 1000:.1f} ms, "
+                f"p95 {_percentile(latencies, 95) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms"
+            )
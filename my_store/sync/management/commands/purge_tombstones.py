@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sync.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Supprime les tombstones plus anciens que SYNC_TOMBSTONE_RETENTION_DAYS."
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=limite).delete()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} tombstone(s) supprimé(s)"))
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.response import Response
+
+from .models import Tombstone
+
+
+class DeltaSyncMixin:
+    """
+    Flux de changements pour les listes d'un ModelViewSet.
+
+    GET <liste>/?since=<curseur> renvoie seulement les lignes créées ou modifiées
+    depuis le curseur (updated_at) et les IDs supprimés depuis (tombstones) :
+
+        {"cursor": "...", "full": false, "results": [...], "deleted": [3, 7]}
+
+    Avec un curseur vide, invalide ou plus ancien que la rétention des tombstones,
+    la liste complète est renvoyée avec "full": true. Sans ?since=, la liste
+    se comporte comme avant.
+    """
+    sync_query_param = 'since'
+
+    def list(self, request, *args, **kwargs):
+        if self.sync_query_param not in request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        now = timezone.now()
+        since = parse_datetime(request.query_params.get(self.sync_query_param) or '')
+        if since is not None and timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        retention = timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+        full = since is None or since < now - retention
+
+        queryset = self.filter_queryset(self.get_queryset())
+        deleted = []
+        if not full:
+            queryset = queryset.filter(updated_at__gte=since)
+            deleted = list(Tombstone.objects.filter(
+                model=queryset.model._meta.label_lower,
+                deleted_at__gte=since
+            ).values_list('object_id', flat=True))
+
+        serializer = self.get_serializer(queryset, many=True)
+        # Marge de sécurité : les écritures en cours de validation au moment de la
+        # requête seront renvoyées au prochain appel (les doublons sont sans effet)
+        cursor = now - timedelta(seconds=getattr(settings, 'SYNC_CURSOR_MARGIN_SECONDS', 2))
+        return Response({
+            'cursor': cursor.isoformat(),
+            'full': full,
+            'results': serializer.data,
+            'deleted': deleted,
+        })
@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """
+    Trace d'une ligne supprimée, pour que le flux de changements (?since=)
+    puisse signaler les suppressions aux appareils qui se synchronisent.
+    """
+    model = models.CharField(max_length=100, verbose_name="Modèle (app_label.model)")
+    object_id = models.BigIntegerField(verbose_name="ID de la ligne supprimée")
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} supprimé le {self.deleted_at:%d/%m/%Y %H:%M}"
+
+    class Meta:
+        verbose_name = "Suppression synchronisée"
+        verbose_name_plural = "Suppressions synchronisées"
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['model', 'deleted_at']),
+        ]
@@ -0,0 +1,50 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+
+# Modèles exposés par le flux de changements (?since=)
+SYNCED_MODELS = [
+    'stock.StockEntry',
+    'stock.CamionChargement',
+    'customers.Customer',
+    'customers.ClientChargement',
+    'employees.Employee',
+    'employees.EmployeeExpense',
+    'expenses.Depense',
+    'argent.ArgentEntry',
+    'transiteur.TransiteurEntry',
+    'purchases.EntreeAchat',
+    'purchases.Achat',
+    'products.Product',
+    'orders.Order',
+    'sales.Sale',
+    'invoices.Invoice',
+]
+
+
+def publish_change(label, pk, op):
+    """Diffuse {model, id, op} aux abonnés SSE une fois la transaction validée"""
+    from .broker import get_broker
+    event = {'model': label, 'id': pk, 'op': op}
+    transaction.on_commit(lambda: get_broker().publish(event))
+
+
+def record_tombstone(sender, instance, **kwargs):
+    from .models import Tombstone
+    label = sender._meta.label_lower
+    Tombstone.objects.create(model=label, object_id=instance.pk)
+    publish_change(label, instance.pk, 'delete')
+
+
+def record_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    publish_change(sender._meta.label_lower, instance.pk, 'create' if created else 'update')
+
+
+def connect_signals():
+    for label in SYNCED_MODELS:
+        model = apps.get_model(label)
+        post_delete.connect(record_tombstone, sender=model, dispatch_uid=f'tombstone_{label}')
+        post_save.connect(record_save, sender=model, dispatch_uid=f'change_{label}')
@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+
+from .broker import get_broker
+
+
+def _sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+async def event_stream(broker, subscription, heartbeat=None):
+    """
+    Générateur SSE d'une connexion : un événement 'change' par modification,
+    un commentaire ': ping' quand rien ne se passe (garde la connexion ouverte
+    à travers les proxys) et 'resync' si des événements ont été perdus.
+    """
+    heartbeat = heartbeat or getattr(settings, 'SYNC_SSE_HEARTBEAT_SECONDS', 15)
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                event = await subscription.get(timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            if subscription.overflow:
+                subscription.overflow = False
+                yield _sse('resync', {})
+            yield _sse('change', event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def events(request):
+    """
+    GET /api/events/?models=customers.customer,employees.employee
+
+    Flux Server-Sent Events des changements {model, id, op} (op : create,
+    update, delete). Le client recharge ensuite seulement ce qui a changé
+    (flux ?since= des listes). Nécessite un serveur ASGI (uvicorn).
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': "Le flux d'événements nécessite un serveur ASGI (uvicorn my_store.asgi:application)"},
+            status=503
+        )
+
+    models = [label.strip().lower() for label in request.GET.get('models', '').split(',') if label.strip()]
+    broker = get_broker()
+    subscription = broker.subscribe(models)
+    response = StreamingHttpResponse(event_stream(broker, subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Désactiver la mise en tampon des proxys (nginx)
+    response['X-Accel-Buffering'] = 'no'
+    return response
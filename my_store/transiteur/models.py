@@ -66,7 +66,7 @@ class TransiteurEntry(models.Model):
         related_name='transiteur_entries_created'
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.date.strftime('%d/%m/%Y')} - {self.numero_camion} - {self.argent_donne or 0} FCFA"
@@ -75,4 +75,8 @@ class TransiteurEntry(models.Model):
         verbose_name = "Entrée transiteur"
         verbose_name_plural = "Entrées transiteur"
         ordering = ['id']
+        indexes = [
+            # Filtres date_from / date_to, liste triée par ID
+            models.Index(fields=['date', 'id'], name='transiteur_entry_date_idx'),
+        ]
 
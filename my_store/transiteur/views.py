@@ -2,18 +2,25 @@ from rest_framework import viewsets
 from rest_framework.permissions import AllowAny
 import logging
 from .models import TransiteurEntry
+from my_store.query_plans import QueryPlanMixin
+from my_store.conditional import ConditionalGetMixin
+from sync.mixins import DeltaSyncMixin
+from my_store.bulk import BulkWriteMixin
 from .serializers import TransiteurEntrySerializer, TransiteurEntryCreateSerializer
 
 logger = logging.getLogger(__name__)
 
 
-class TransiteurEntryViewSet(viewsets.ModelViewSet):
+class TransiteurEntryViewSet(QueryPlanMixin, ConditionalGetMixin, DeltaSyncMixin, BulkWriteMixin, viewsets.ModelViewSet):
     """
     ViewSet pour gérer les entrées transiteur.
     Utilisé par l'onglet "Transiteur" du frontend.
     """
     queryset = TransiteurEntry.objects.all()
     permission_classes = [AllowAny]
+    query_plans = {
+        'default': {'select_related': ['created_by']},
+    }
 
     def get_serializer_class(self):
         if self.action == 'create':
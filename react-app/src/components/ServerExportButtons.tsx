@@ -0,0 +1,52 @@
+import { useState } from "react";
+import { FileSpreadsheet, FileText, Loader2 } from "lucide-react";
+import { Button } from "@/components/ui/button";
+import { useToast } from "@/hooks/use-toast";
+import { useAuth } from "@/contexts/AuthContext";
+import { serverExport, type ExportFormat, type ExportLedger } from "@/lib/serverExport";
+
+interface ServerExportButtonsProps {
+  ledger: ExportLedger;
+  // Mêmes paramètres que la liste de l'API (date_from, date_to, employee...)
+  filters?: Record<string, string | number | undefined | null>;
+}
+
+// Boutons Excel / PDF du registre filtré, générés par le serveur
+export function ServerExportButtons({ ledger, filters = {} }: ServerExportButtonsProps) {
+  const [pending, setPending] = useState<ExportFormat | null>(null);
+  const { toast } = useToast();
+  const { token } = useAuth();
+
+  const handleExport = async (format: ExportFormat) => {
+    setPending(format);
+    try {
+      const job = await serverExport(ledger, format, filters, token);
+      toast({
+        title: "Export terminé",
+        description: `${job.row_count} ligne(s) exportée(s)`,
+      });
+    } catch (error: any) {
+      console.error("Erreur lors de l'export:", error);
+      toast({
+        title: "Erreur",
+        description: error.message || "Impossible d'exporter le registre",
+        variant: "destructive",
+      });
+    } finally {
+      setPending(null);
+    }
+  };
+
+  return (
+    <>
+      <Button variant="outline" onClick={() => handleExport("xlsx")} disabled={pending !== null} className="gap-2">
+        {pending === "xlsx" ? <Loader2 size={16} className="animate-spin" /> : <FileSpreadsheet size={16} />}
+        Excel
+      </Button>
+      <Button variant="outline" onClick={() => handleExport("pdf")} disabled={pending !== null} className="gap-2">
+        {pending === "pdf" ? <Loader2 size={16} className="animate-spin" /> : <FileText size={16} />}
+        PDF
+      </Button>
+    </>
+  );
+}
@@ -0,0 +1,62 @@
+import { useEffect, useRef, useState } from "react";
+import { getApiUrl } from "@/config/api";
+
+export interface ChangeEvent {
+  model: string;
+  id: number;
+  op: "create" | "update" | "delete";
+}
+
+/**
+ * S'abonne au flux temps réel /api/events/ (Server-Sent Events) pour les
+ * modèles donnés (ex: ["customers.customer"]).
+ *
+ * onChange est appelé à chaque changement, et aussi après une reconnexion ou
+ * un "resync" (event = null) pour rattraper ce qui a pu être manqué.
+ * Retourne connected : tant que le flux n'est pas ouvert, garder le
+ * rafraîchissement périodique (useAutoRefresh) comme solution de repli.
+ */
+export function useChangeEvents(models: string[], onChange: (event: ChangeEvent | null) => void) {
+  const [connected, setConnected] = useState(false);
+  const onChangeRef = useRef(onChange);
+  const modelsKey = models.join(",");
+
+  useEffect(() => {
+    onChangeRef.current = onChange;
+  }, [onChange]);
+
+  useEffect(() => {
+    if (typeof EventSource === "undefined") {
+      return;
+    }
+
+    const source = new EventSource(getApiUrl(`events/?models=${encodeURIComponent(modelsKey)}`));
+    let wasConnected = false;
+
+    source.onopen = () => {
+      setConnected(true);
+      // Reconnexion : des changements ont pu avoir lieu pendant la coupure
+      if (wasConnected) {
+        onChangeRef.current(null);
+      }
+      wasConnected = true;
+    };
+    source.onerror = () => {
+      // EventSource se reconnecte tout seul (délai "retry" envoyé par le serveur)
+      setConnected(false);
+    };
+    source.addEventListener("change", (message) => {
+      onChangeRef.current(JSON.parse((message as MessageEvent).data));
+    });
+    source.addEventListener("resync", () => {
+      onChangeRef.current(null);
+    });
+
+    return () => {
+      source.close();
+      setConnected(false);
+    };
+  }, [modelsKey]);
+
+  return connected;
+}
@@ -0,0 +1,69 @@
+// Enregistrement groupé des pages tableur (<registre>/bulk/) : créations,
+// modifications et suppressions envoyées en une seule requête et appliquées
+// dans une seule transaction côté serveur.
+
+import { getApiUrl } from "@/config/api";
+
+export type BulkRef = string | number;
+
+// Ligne à créer (sans id) ou à modifier (avec id, champs partiels acceptés) ;
+// ref est renvoyée telle quelle avec la ligne créée ou son erreur
+export type BulkUpsert = { id?: number; ref?: BulkRef } & Record<string, unknown>;
+
+export interface BulkRowError {
+  operation: "upsert" | "delete";
+  index: number | null;
+  ref: BulkRef | null;
+  id: number | null;
+  errors: Record<string, unknown>;
+}
+
+export interface BulkResult<T> {
+  created: (T & { ref?: BulkRef })[];
+  updated: (T & { ref?: BulkRef })[];
+  deleted: number[];
+  errors: BulkRowError[];
+}
+
+/** Message lisible d'une erreur de ligne (erreurs générales puis par champ) */
+export function formatBulkError(error: BulkRowError): string {
+  return Object.entries(error.errors)
+    .map(([field, value]) => {
+      const message = Array.isArray(value) ? value.join(", ") : String(value);
+      return field === "non_field_errors" ? message : `${field}: ${message}`;
+    })
+    .join("\n");
+}
+
+/**
+ * Envoie le lot à `${endpoint}/bulk/`. Les lignes valides sont enregistrées
+ * même si d'autres sont refusées : les refus sont dans result.errors.
+ * Lève une erreur uniquement si la requête entière est rejetée.
+ */
+export async function bulkSave<T = Record<string, unknown>>(
+  endpoint: string,
+  payload: { upserts?: BulkUpsert[]; deletes?: number[] },
+  token?: string | null
+): Promise<BulkResult<T>> {
+  const response = await fetch(getApiUrl(`${endpoint}/bulk/`), {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: JSON.stringify({ upserts: payload.upserts ?? [], deletes: payload.deletes ?? [] }),
+  });
+
+  if (!response.ok) {
+    let message = `Erreur ${response.status}: ${response.statusText}`;
+    try {
+      const data = await response.json();
+      message = data.error || data.detail || message;
+    } catch {
+      // réponse sans JSON
+    }
+    throw new Error(message);
+  }
+
+  return response.json();
+}
@@ -0,0 +1,38 @@
+// GET conditionnel : renvoie l'ETag reçu (If-None-Match) et réutilise la
+// dernière réponse quand le serveur répond 304 Not Modified.
+
+const cache = new Map<string, { etag: string; body: string }>();
+
+/**
+ * Remplace fetch() pour les lectures d'API : même signature, même Response.
+ * Sur 304, une Response 200 est reconstruite à partir du corps mis en cache,
+ * les appelants n'ont donc rien à changer.
+ */
+export async function conditionalFetch(url: string, init: RequestInit = {}): Promise<Response> {
+  const method = (init.method || "GET").toUpperCase();
+  if (method !== "GET") {
+    return fetch(url, init);
+  }
+
+  const cached = cache.get(url);
+  const headers = new Headers(init.headers);
+  if (cached) {
+    headers.set("If-None-Match", cached.etag);
+  }
+
+  const response = await fetch(url, { ...init, headers });
+  if (response.status === 304 && cached) {
+    return new Response(cached.body, {
+      status: 200,
+      headers: { "Content-Type": "application/json", ETag: cached.etag },
+    });
+  }
+
+  const etag = response.headers.get("ETag");
+  if (response.ok && etag) {
+    cache.set(url, { etag, body: await response.clone().text() });
+  } else {
+    cache.delete(url);
+  }
+  return response;
+}
@@ -0,0 +1,60 @@
+// Synchronisation incrémentale des listes via le flux ?since= de l'API
+
+export interface DeltaResponse<T> {
+  cursor: string;
+  full: boolean;
+  results: T[];
+  deleted: number[];
+}
+
+/**
+ * Fusionne une réponse ?since= dans la liste courante :
+ * - full : la réponse remplace toute la liste
+ * - sinon : les lignes modifiées sont remplacées sur place, les nouvelles
+ *   ajoutées en tête (listes triées du plus récent au plus ancien) et les
+ *   IDs supprimés retirés.
+ */
+export function applyDelta<T extends { id: number }>(current: T[], delta: DeltaResponse<T>): T[] {
+  if (delta.full) {
+    return delta.results;
+  }
+  if (delta.results.length === 0 && delta.deleted.length === 0) {
+    return current;
+  }
+
+  const changed = new Map(delta.results.map((row) => [row.id, row]));
+  const deleted = new Set(delta.deleted);
+  const merged = current
+    .filter((row) => !deleted.has(row.id))
+    .map((row) => {
+      const updated = changed.get(row.id);
+      if (updated) {
+        changed.delete(row.id);
+        return updated;
+      }
+      return row;
+    });
+  return [...changed.values(), ...merged];
+}
+
+/**
+ * Garde le curseur d'un endpoint de liste (ex: "customers/").
+ * url() donne l'endpoint à interroger, receive() enregistre le nouveau curseur.
+ * Le curseur n'avance que si la réponse contient des changements : tant que
+ * rien ne change, l'URL reste la même et le serveur peut répondre 304 (ETag).
+ */
+export function createDeltaSync<T extends { id: number }>(endpoint: string) {
+  let cursor = "";
+  return {
+    url: () => `${endpoint}${endpoint.includes("?") ? "&" : "?"}since=${encodeURIComponent(cursor)}`,
+    receive: (delta: DeltaResponse<T>) => {
+      if (delta.full || delta.results.length > 0 || delta.deleted.length > 0) {
+        cursor = delta.cursor;
+      }
+      return delta;
+    },
+    reset: () => {
+      cursor = "";
+    },
+  };
+}
@@ -0,0 +1,99 @@
+// Exports de registres générés côté serveur (/api/exports/) : la tâche est
+// créée, son état interrogé jusqu'à la fin, puis le fichier téléchargé.
+
+import { getApiUrl } from "@/config/api";
+
+export type ExportFormat = "csv" | "xlsx" | "pdf";
+
+export type ExportLedger =
+  | "stock"
+  | "chargements-camion"
+  | "clients"
+  | "employes"
+  | "depenses"
+  | "achats";
+
+interface ExportJob {
+  id: string;
+  status: "pending" | "running" | "done" | "failed";
+  filename: string;
+  row_count: number;
+  error: string;
+}
+
+const POLL_INTERVAL_MS = 1000;
+const POLL_TIMEOUT_MS = 10 * 60 * 1000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+async function errorMessage(response: Response): Promise<string> {
+  try {
+    const data = await response.json();
+    return data.error || JSON.stringify(data);
+  } catch {
+    return `Erreur ${response.status}`;
+  }
+}
+
+/**
+ * Exporte le registre avec les mêmes filtres que la liste (date_from,
+ * date_to, employee...) et déclenche le téléchargement. Une demande
+ * identique sur des données inchangées réutilise le fichier déjà généré.
+ */
+export async function serverExport(
+  ledger: ExportLedger,
+  format: ExportFormat,
+  filters: Record<string, string | number | undefined | null> = {},
+  token?: string | null,
+): Promise<ExportJob> {
+  const headers: Record<string, string> = {
+    "Content-Type": "application/json",
+    ...(token ? { Authorization: `Bearer ${token}` } : {}),
+  };
+  const cleanFilters = Object.fromEntries(
+    Object.entries(filters)
+      .filter(([, value]) => value !== undefined && value !== null && value !== "")
+      .map(([key, value]) => [key, String(value)]),
+  );
+
+  const response = await fetch(getApiUrl("exports/"), {
+    method: "POST",
+    headers,
+    body: JSON.stringify({ ledger, format, filters: cleanFilters }),
+  });
+  if (!response.ok) {
+    throw new Error(await errorMessage(response));
+  }
+  let job: ExportJob = await response.json();
+
+  const started = Date.now();
+  while (job.status === "pending" || job.status === "running") {
+    if (Date.now() - started > POLL_TIMEOUT_MS) {
+      throw new Error("L'export prend trop de temps, réessayez plus tard");
+    }
+    await sleep(POLL_INTERVAL_MS);
+    const poll = await fetch(getApiUrl(`exports/${job.id}/`), { headers });
+    if (!poll.ok) {
+      throw new Error(await errorMessage(poll));
+    }
+    job = await poll.json();
+  }
+  if (job.status === "failed") {
+    throw new Error(job.error || "Échec de l'export");
+  }
+
+  const download = await fetch(getApiUrl(`exports/${job.id}/download/`), { headers });
+  if (!download.ok) {
+    throw new Error(await errorMessage(download));
+  }
+  const blob = await download.blob();
+  const url = URL.createObjectURL(blob);
+  const link = document.createElement("a");
+  link.href = url;
+  link.download = job.filename;
+  document.body.appendChild(link);
+  link.click();
+  link.remove();
+  URL.revokeObjectURL(url);
+  return job;
+}
@@ -1,5 +1,6 @@
 import { DashboardLayout } from "@/components/layout/DashboardLayout";
 import { PageHeader } from "@/components/ui/PageHeader";
+import { ServerExportButtons } from "@/components/ServerExportButtons";
 import { ShoppingCart, Plus, Trash2, Save, Loader2, X, Download, ArrowLeft } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -926,14 +927,17 @@ export default function Achats() {
         title="Achats"
         icon={ShoppingCart}
         action={
-          <Button 
-            variant="secondary" 
-            onClick={() => navigate(-1)}
-            className="gap-2"
-          >
-            <ArrowLeft size={16} />
-            Retour
-          </Button>
+          <div className="flex gap-2">
+            <ServerExportButtons ledger="achats" />
+            <Button 
+              variant="secondary" 
+              onClick={() => navigate(-1)}
+              className="gap-2"
+            >
+              <ArrowLeft size={16} />
+              Retour
+            </Button>
+          </div>
         }
       />
 
@@ -18,6 +18,7 @@ import { useNavigate } from "react-router-dom";
 import { useAuth } from "@/contexts/AuthContext";
 import { useToast } from "@/hooks/use-toast";
 import { getApiUrl } from "@/config/api";
+import { bulkSave, formatBulkError } from "@/lib/bulkSave";
 
 interface ArgentRow {
   id: number;
@@ -251,7 +252,6 @@ export default function Argent() {
       } else if (isBoss) {
         // Cas boss : sauvegarder toutes les modifications du tableau unique
         const errors: string[] = [];
-        const createdIds = new Map<number, number>(); // Map des IDs temporaires vers les IDs réels créés
         
         // Séparer les nouvelles lignes et les lignes existantes
         // Les nouvelles lignes sont celles dont l'ID n'est pas dans savedIds
@@ -266,183 +266,54 @@ export default function Argent() {
         });
         const existingRows = rows.filter((row) => savedIds.has(row.id));
 
-        // Sauvegarder les nouvelles lignes (POST)
-        for (const row of newRows) {
-          // Ignorer les lignes complètement vides
-          const hasAnyData = 
-            (row.somme !== null && row.somme !== undefined) ||
-            (row.somme_sortie !== null && row.somme_sortie !== undefined);
-          
-          if (!hasAnyData) {
-            continue;
-          }
-          
-          // Déterminer si on a une entrée ou une sortie pour choisir la date appropriée
+        const toPayload = (row: ArgentRow, isNew: boolean) => {
+          // Si on a seulement une sortie, utiliser date_sortie comme date principale
           const hasEntree = row.somme !== null;
-          const hasSortie = row.somme_sortie !== null;
-
-          // Vérifier si cette ligne a déjà été créée dans cette session
-          if (createdIds.has(row.id)) {
-            continue;
-          }
-
-          try {
-            // Si on a seulement une sortie, utiliser date_sortie comme date principale
-            const dateToUse = hasEntree ? (row.date || today) : (row.date_sortie || today);
-            const [day, month, year] = dateToUse.split("/");
-            const isoDate = `${year}-${month}-${day}`;
-            
-            const [daySortie, monthSortie, yearSortie] = row.date_sortie 
-              ? row.date_sortie.split("/")
-              : [null, null, null];
-            const isoDateSortie = row.date_sortie 
-              ? `${yearSortie}-${monthSortie}-${daySortie}` 
-              : null;
-
-            const requestBody = {
-              date: isoDate,
-              nom_recuperant: row.nom_recuperant || "",
-              nom_boss: row.nom_boss || "",
-              lieu_retrait: row.lieu_retrait || "",
-              somme: row.somme !== null && row.somme !== undefined ? row.somme : null,
-              nom_recevant: row.nom_recevant || "",
-              date_sortie: isoDateSortie,
-              somme_sortie: row.somme_sortie,
-            };
-
-            console.log("Envoi de la requête POST argent/ avec:", requestBody);
-
-            const response = await fetch(getApiUrl("argent/"), {
-              method: "POST",
-              headers: {
-                "Content-Type": "application/json",
-                ...(token ? { Authorization: `Bearer ${token}` } : {}),
-              },
-              body: JSON.stringify(requestBody),
-            });
-
-            if (!response.ok) {
-              let errorMessage = `Erreur lors de l'enregistrement de la ligne`;
-              let errorDetails = "";
-              try {
-                const errorData = await response.json();
-                console.error("Réponse d'erreur du serveur:", errorData);
-                // Gérer les erreurs de validation DRF
-                if (errorData.non_field_errors) {
-                  errorMessage = Array.isArray(errorData.non_field_errors)
-                    ? errorData.non_field_errors.join(", ")
-                    : errorData.non_field_errors;
-                } else if (errorData.detail) {
-                  errorMessage = errorData.detail;
-                } else if (errorData.message) {
-                  errorMessage = errorData.message;
-                } else {
-                  // Afficher toutes les erreurs de validation par champ
-                  const fieldErrors = Object.entries(errorData)
-                    .map(([key, value]) => `${key}: ${Array.isArray(value) ? value[0] : value}`)
-                    .join(", ");
-                  if (fieldErrors) {
-                    errorMessage = fieldErrors;
-                  }
-                }
-                errorDetails = JSON.stringify(errorData, null, 2);
-              } catch (e) {
-                errorMessage = `Erreur ${response.status}: ${response.statusText}`;
-              }
-              errors.push(errorMessage);
-              console.error("Erreur lors de l'enregistrement:", errorMessage);
-              console.error("Détails de l'erreur:", errorDetails);
-              console.error("Données envoyées:", requestBody);
-            } else {
-              // Mettre à jour l'ID de la ligne avec l'ID retourné par le serveur
-              const created = await response.json();
-              createdIds.set(row.id, created.id);
-            }
-          } catch (error: any) {
-            errors.push(`Erreur pour la ligne: ${error.message}`);
-          }
-        }
-
-        // Mettre à jour les lignes existantes (PUT)
-        for (const row of existingRows) {
-          try {
-            // Déterminer si on a une entrée ou une sortie pour choisir la date appropriée
-            const hasEntree = row.somme !== null;
-            const hasSortie = row.somme_sortie !== null;
-            
-            // Si on a seulement une sortie, utiliser date_sortie comme date principale
-            const dateToUse = hasEntree ? (row.date || today) : (row.date_sortie || row.date || today);
-            const [day, month, year] = dateToUse.split("/");
-            const isoDate = `${year}-${month}-${day}`;
-            
-            const [daySortie, monthSortie, yearSortie] = row.date_sortie 
-              ? row.date_sortie.split("/")
-              : [null, null, null];
-            const isoDateSortie = row.date_sortie 
-              ? `${yearSortie}-${monthSortie}-${daySortie}` 
-              : null;
-
-            const response = await fetch(getApiUrl(`argent/${row.id}/`), {
-              method: "PUT",
-              headers: {
-                "Content-Type": "application/json",
-                ...(token ? { Authorization: `Bearer ${token}` } : {}),
-              },
-              body: JSON.stringify({
-                date: isoDate,
-                nom_recuperant: row.nom_recuperant || "",
-                nom_boss: row.nom_boss || "",
-                lieu_retrait: row.lieu_retrait || "",
-                somme: row.somme !== null && row.somme !== undefined ? row.somme : null,
-                nom_recevant: row.nom_recevant || "",
-                date_sortie: isoDateSortie,
-                somme_sortie: row.somme_sortie,
-              }),
-            });
-
-            // Si la ligne n'existe pas (404), essayer de la créer avec POST
-            if (response.status === 404) {
-              const postResponse = await fetch(getApiUrl("argent/"), {
-                method: "POST",
-                headers: {
-                  "Content-Type": "application/json",
-                  ...(token ? { Authorization: `Bearer ${token}` } : {}),
-                },
-                body: JSON.stringify({
-                  date: isoDate,
-                  nom_recuperant: row.nom_recuperant || "",
-                  nom_boss: row.nom_boss || "",
-                  lieu_retrait: row.lieu_retrait || "",
-                  somme: row.somme !== null && row.somme !== undefined ? row.somme : null,
-                  nom_recevant: row.nom_recevant || "",
-                  date_sortie: isoDateSortie,
-                  somme_sortie: row.somme_sortie,
-                }),
-              });
-
-              if (!postResponse.ok) {
-                let errorMessage = `Erreur lors de la création de la ligne`;
-                try {
-                  const errorData = await postResponse.json();
-                  errorMessage = errorData.detail || errorData.message || errorMessage;
-                } catch {
-                  // ignore
-                }
-                errors.push(errorMessage);
-              }
-            } else if (!response.ok) {
-              let errorMessage = `Erreur lors de la mise à jour de la ligne`;
-              try {
-                const errorData = await response.json();
-                errorMessage = errorData.detail || errorData.message || errorMessage;
-              } catch {
-                // ignore
-              }
-              errors.push(errorMessage);
-            }
-          } catch (error: any) {
-            errors.push(`Erreur pour la ligne: ${error.message}`);
+          const dateToUse = hasEntree
+            ? (row.date || today)
+            : (row.date_sortie || (isNew ? null : row.date) || today);
+          const [day, month, year] = dateToUse.split("/");
+
+          const [daySortie, monthSortie, yearSortie] = row.date_sortie
+            ? row.date_sortie.split("/")
+            : [null, null, null];
+
+          return {
+            date: `${year}-${month}-${day}`,
+            nom_recuperant: row.nom_recuperant || "",
+            nom_boss: row.nom_boss || "",
+            lieu_retrait: row.lieu_retrait || "",
+            somme: row.somme !== null && row.somme !== undefined ? row.somme : null,
+            nom_recevant: row.nom_recevant || "",
+            date_sortie: row.date_sortie ? `${yearSortie}-${monthSortie}-${daySortie}` : null,
+            somme_sortie: row.somme_sortie,
+          };
+        };
+
+        // Nouvelles lignes et modifications en une seule requête
+        try {
+          const result = await bulkSave("argent", {
+            upserts: [
+              ...newRows.map((row) => ({ ref: row.id, ...toPayload(row, true) })),
+              ...existingRows.map((row) => ({ id: row.id, ...toPayload(row, false) })),
+            ],
+          }, token);
+
+          // Lignes supprimées entre-temps côté serveur : les recréer
+          const missing = new Set(
+            result.errors.filter((error) => error.id !== null && "id" in error.errors).map((error) => error.id)
+          );
+          result.errors
+            .filter((error) => !missing.has(error.id))
+            .forEach((error) => errors.push(formatBulkError(error)));
+          if (missing.size > 0) {
+            const retry = await bulkSave("argent", {
+              upserts: existingRows.filter((row) => missing.has(row.id)).map((row) => toPayload(row, false)),
+            }, token);
+            retry.errors.forEach((error) => errors.push(formatBulkError(error)));
           }
+        } catch (error: any) {
+          errors.push(error.message);
         }
 
         // Afficher les erreurs s'il y en a
@@ -1,5 +1,6 @@
 import { DashboardLayout } from "@/components/layout/DashboardLayout";
 import { PageHeader } from "@/components/ui/PageHeader";
+import { ServerExportButtons } from "@/components/ServerExportButtons";
 import { Truck, Plus, Trash2, Save, Loader2, Check, FileDown, Edit, Download, ArrowLeft } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -1259,6 +1260,7 @@ export default function ChargementCamion() {
             icon={Truck}
             action={
               <div className="flex gap-2">
+                <ServerExportButtons ledger="chargements-camion" />
                 <Button 
                   variant="secondary" 
                   onClick={handleSave} 
@@ -1,5 +1,6 @@
 import { DashboardLayout } from "@/components/layout/DashboardLayout";
 import { PageHeader } from "@/components/ui/PageHeader";
+import { ServerExportButtons } from "@/components/ServerExportButtons";
 import { Receipt, Plus, Trash2, Loader2, Download, StopCircle, Save, ArrowLeft } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -17,6 +18,7 @@ import { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import { useToast } from "@/hooks/use-toast";
 import { getApiUrl } from "@/config/api";
+import { bulkSave, formatBulkError } from "@/lib/bulkSave";
 import jsPDF from "jspdf";
 import autoTable from "jspdf-autotable";
 
@@ -434,67 +436,41 @@ export default function Depenses() {
     setIsSaving(true);
 
     try {
-      const savePromises = rowsToSave.map(async (row) => {
-        const dateISO = convertDateToISO(row.date);
-        
-        const payload = {
-          date: dateISO,
+      // Une seule requête pour tout le lot ; ref relie chaque ligne créée à sa ligne du tableau
+      const result = await bulkSave<{ id: number }>("depenses", {
+        upserts: rowsToSave.map((row) => ({
+          ref: row.id,
+          date: convertDateToISO(row.date),
           nom_depense: row.nom_depense.trim(),
           somme: row.somme || 0,
           notes: row.notes || "",
-        };
-
-        const response = await fetch(getApiUrl("depenses/"), {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify(payload),
-        });
-
-        if (!response.ok) {
-          let errorMessage = "Erreur lors de l'enregistrement";
-          try {
-            const errorData = await response.json();
-            if (errorData.detail) {
-              errorMessage = errorData.detail;
-            } else if (errorData.non_field_errors) {
-              errorMessage = Array.isArray(errorData.non_field_errors) 
-                ? errorData.non_field_errors.join(", ")
-                : errorData.non_field_errors;
-            } else if (typeof errorData === 'object') {
-              const errorMessages = Object.entries(errorData).map(([key, value]) => {
-                if (Array.isArray(value)) {
-                  return `${key}: ${value.join(", ")}`;
-                }
-                return `${key}: ${value}`;
-              });
-              errorMessage = errorMessages.join("\n");
-            }
-          } catch (e) {
-            errorMessage = `Erreur ${response.status}: ${response.statusText}`;
-          }
-          throw new Error(errorMessage);
-        }
-
-        return response.json();
+        })),
       });
 
-      const savedResults = await Promise.all(savePromises);
+      if (result.errors.length > 0) {
+        const positions = new Map(rowsToSave.map((row, index) => [row.id, index + 1]));
+        toast({
+          title: "Erreurs lors de l'enregistrement",
+          description: result.errors
+            .map((error) => `Ligne ${positions.get(Number(error.ref))}: ${formatBulkError(error)}`)
+            .join("\n"),
+          variant: "destructive",
+        });
+      }
 
-      toast({
-        title: "Succès !",
-        description: `${rowsToSave.length} dépense(s) enregistrée(s) avec succès`,
-      });
+      if (result.created.length > 0) {
+        toast({
+          title: "Succès !",
+          description: `${result.created.length} dépense(s) enregistrée(s) avec succès`,
+        });
+      }
 
       // Mettre à jour les lignes sauvegardées directement dans le state
       setRows(prevRows => {
         // Créer un map des IDs des lignes sauvegardées avec leurs nouveaux savedId
         const savedIdsMap = new Map<number, number>();
-        rowsToSave.forEach((row, index) => {
-          if (savedResults[index] && savedResults[index].id) {
-            savedIdsMap.set(row.id, savedResults[index].id);
-          }
+        result.created.forEach((saved) => {
+          savedIdsMap.set(Number(saved.ref), saved.id);
         });
 
         // Mettre à jour les lignes sauvegardées et utiliser le même format d'ID que lors du chargement depuis l'API
@@ -1159,6 +1135,7 @@ export default function Depenses() {
                     </>
                   )}
                 </Button>
+                <ServerExportButtons ledger="depenses" />
                 <Button 
                   variant="secondary" 
                   onClick={() => navigate(-1)}
@@ -18,6 +18,7 @@ import { useState, useEffect } from "react";
 import { useNavigate, useSearchParams } from "react-router-dom";
 import { useToast } from "@/hooks/use-toast";
 import { getApiUrl } from "@/config/api";
+import { bulkSave, formatBulkError } from "@/lib/bulkSave";
 
 interface EntreeStockRow {
   id: number;
@@ -400,9 +401,9 @@ export default function EntreesStock() {
     setIsSaving(true);
 
     try {
-      // Enregistrer chaque ligne
-      const savePromises = rowsToSave.map(async (row) => {
-        const payload = {
+      // Une seule requête pour tout le lot : les sorties sont contrôlées dans l'ordre des lignes
+      const result = await bulkSave("stock-entries", {
+        upserts: rowsToSave.map((row) => ({
           date: row.date,
           type_operation: row.type_operation,
           nom_fournisseur: row.nom_fournisseur || "",
@@ -411,48 +412,16 @@ export default function EntreesStock() {
           poids_par_sac: row.poids_par_sac,
           numero_magasin: row.numero_magasin,
           notes: "",
-        };
-
-        const response = await fetch(getApiUrl("stock-entries/"), {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify(payload),
-        });
-
-        if (!response.ok) {
-          let errorMessage = "Erreur lors de la Enregistrement";
-          try {
-          const errorData = await response.json();
-            // Gérer les erreurs de validation Django (qui peuvent être dans non_field_errors ou comme un dict)
-            if (errorData.non_field_errors) {
-              errorMessage = Array.isArray(errorData.non_field_errors) 
-                ? errorData.non_field_errors.join(", ")
-                : errorData.non_field_errors;
-            } else if (errorData.detail) {
-              errorMessage = errorData.detail;
-            } else if (typeof errorData === 'object') {
-              // Si c'est un objet avec des clés (erreurs de validation de champs)
-              const errorMessages = Object.entries(errorData).map(([key, value]) => {
-                if (Array.isArray(value)) {
-                  return `${key}: ${value.join(", ")}`;
-                }
-                return `${key}: ${value}`;
-              });
-              errorMessage = errorMessages.join("\n");
-            }
-          } catch (e) {
-            // Si on ne peut pas parser le JSON, utiliser le message d'erreur par défaut
-            errorMessage = `Erreur ${response.status}: ${response.statusText}`;
-          }
-          throw new Error(errorMessage);
-        }
-
-        return response.json();
+        })),
       });
 
-      await Promise.all(savePromises);
+      if (result.errors.length > 0) {
+        throw new Error(
+          result.errors
+            .map((error) => `Ligne ${(error.index ?? 0) + 1}: ${formatBulkError(error)}`)
+            .join("\n")
+        );
+      }
 
       // Nettoyer le stockage local : les lignes viennent maintenant de l'API
       localStorage.removeItem(STORAGE_KEY);
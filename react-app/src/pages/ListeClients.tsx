@@ -15,11 +15,14 @@ import {
   AlertDialogHeader,
   AlertDialogTitle,
 } from "@/components/ui/alert-dialog";
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import { useToast } from "@/hooks/use-toast";
 import { getApiUrl } from "@/config/api";
 import { useAutoRefresh } from "@/hooks/useAutoRefresh";
+import { useChangeEvents } from "@/hooks/useChangeEvents";
+import { conditionalFetch } from "@/lib/conditionalFetch";
+import { applyDelta, createDeltaSync, DeltaResponse } from "@/lib/deltaSync";
 
 interface Client {
   id: number;
@@ -34,6 +37,8 @@ interface Client {
 
 export default function ListeClients() {
   const [clients, setClients] = useState<Client[]>([]);
+  // Curseur du flux ?since= : seuls les changements sont rechargés
+  const clientsSync = useRef(createDeltaSync<Client>("customers/"));
   const [isLoading, setIsLoading] = useState(true);
   const [isDialogOpen, setIsDialogOpen] = useState(false);
   const [isSaving, setIsSaving] = useState(false);
@@ -51,10 +56,10 @@ export default function ListeClients() {
   const fetchClients = async () => {
     setIsLoading(true);
     try {
-      const response = await fetch(getApiUrl("customers/"));
+      const response = await conditionalFetch(getApiUrl(clientsSync.current.url()));
       if (response.ok) {
-        const data = await response.json();
-        setClients(data);
+        const data: DeltaResponse<Client> = clientsSync.current.receive(await response.json());
+        setClients((current) => applyDelta(current, data));
       } else {
         throw new Error("Erreur lors du chargement des clients");
       }
@@ -74,8 +79,11 @@ export default function ListeClients() {
     fetchClients();
   }, []);
 
-  // Rafraîchissement automatique toutes les 10 secondes
-  useAutoRefresh(fetchClients, 10000);
+  // Changements poussés par le serveur (SSE) : seul le delta est rechargé
+  const liveEvents = useChangeEvents(["customers.customer"], () => fetchClients());
+
+  // Rafraîchissement automatique : toutes les 10 secondes sans flux temps réel, 60 s sinon
+  useAutoRefresh(fetchClients, liveEvents ? 60000 : 10000);
 
   const handleAddClient = async () => {
     if (!newClient.nom_prenom.trim()) {
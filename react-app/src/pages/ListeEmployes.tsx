@@ -15,12 +15,15 @@ import {
   AlertDialogHeader,
   AlertDialogTitle,
 } from "@/components/ui/alert-dialog";
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import { useToast } from "@/hooks/use-toast";
 import { getApiUrl } from "@/config/api";
 import { useAuth } from "@/contexts/AuthContext";
 import { useAutoRefresh } from "@/hooks/useAutoRefresh";
+import { useChangeEvents } from "@/hooks/useChangeEvents";
+import { conditionalFetch } from "@/lib/conditionalFetch";
+import { applyDelta, createDeltaSync, DeltaResponse } from "@/lib/deltaSync";
 
 interface Employee {
   id: number;
@@ -44,6 +47,8 @@ interface UserOption {
 
 export default function ListeEmployes() {
   const [employees, setEmployees] = useState<Employee[]>([]);
+  // Curseur du flux ?since= : seuls les changements sont rechargés
+  const employeesSync = useRef(createDeltaSync<Employee>("employees/"));
   const [isLoading, setIsLoading] = useState(true);
   const [isDialogOpen, setIsDialogOpen] = useState(false);
   const [isSaving, setIsSaving] = useState(false);
@@ -74,7 +79,7 @@ export default function ListeEmployes() {
   const fetchEmployees = async () => {
     setIsLoading(true);
     try {
-      const response = await fetch(getApiUrl("employees/"), {
+      const response = await conditionalFetch(getApiUrl(employeesSync.current.url()), {
         headers: {
           "Content-Type": "application/json",
           ...(token ? { Authorization: `Bearer ${token}` } : {}),
@@ -82,9 +87,10 @@ export default function ListeEmployes() {
       });
       if (response.ok) {
         const data = await response.json();
-        // S'assurer que les données sont un tableau
-        if (Array.isArray(data)) {
-          setEmployees(data);
+        // S'assurer que les données sont une réponse ?since= valide
+        if (Array.isArray(data?.results)) {
+          const delta: DeltaResponse<Employee> = employeesSync.current.receive(data);
+          setEmployees((current) => applyDelta(current, delta));
         } else {
           console.error("Les données reçues ne sont pas un tableau:", data);
           setEmployees([]);
@@ -189,11 +195,16 @@ export default function ListeEmployes() {
 
   // Charger la liste des employés au montage et quand le token change
   useEffect(() => {
+    // La visibilité dépend de l'utilisateur : repartir d'une liste complète
+    employeesSync.current.reset();
     fetchEmployees();
   }, [token]);
 
-  // Rafraîchissement automatique toutes les 10 secondes
-  useAutoRefresh(fetchEmployees, 10000);
+  // Changements poussés par le serveur (SSE) : seul le delta est rechargé
+  const liveEvents = useChangeEvents(["employees.employee"], () => fetchEmployees());
+
+  // Rafraîchissement automatique : toutes les 10 secondes sans flux temps réel, 60 s sinon
+  useAutoRefresh(fetchEmployees, liveEvents ? 60000 : 10000);
 
   // Charger la liste des utilisateurs dès que le token est disponible
   useEffect(() => {
@@ -435,6 +446,8 @@ export default function ListeEmployes() {
 
       setIsVisibilityDialogOpen(false);
       setEmployeeToEdit(null);
+      // Un employé devenu privé disparaît sans tombstone : recharger la liste complète
+      employeesSync.current.reset();
       fetchEmployees(); // Recharger la liste
     } catch (error: any) {
       let errorMessage = "Impossible de mettre à jour la visibilité";
@@ -1,5 +1,6 @@
 import { DashboardLayout } from "@/components/layout/DashboardLayout";
 import { PageHeader } from "@/components/ui/PageHeader";
+import { ServerExportButtons } from "@/components/ServerExportButtons";
 import { Users, Plus, Trash2, Save, Loader2, ArrowLeft } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -17,6 +18,7 @@ import { useState, useEffect } from "react";
 import { useNavigate, useParams } from "react-router-dom";
 import { useToast } from "@/hooks/use-toast";
 import { getApiUrl } from "@/config/api";
+import { bulkSave, formatBulkError } from "@/lib/bulkSave";
 import { useAuth } from "@/contexts/AuthContext";
 import jsPDF from "jspdf";
 import autoTable from "jspdf-autotable";
@@ -525,13 +527,10 @@ export default function SuiviEmployes() {
     setIsSaving(true);
 
     try {
-      // Enregistrer chaque ligne
-      const savePromises = rowsToSave.map(async (row) => {
-        // Convertir la date au format ISO pour l'API
-        const dateISO = convertDateToISO(row.date);
-        
-        const payload = {
-          date: dateISO,
+      // Une seule requête pour tout le lot : les soldes sont recalculés une fois côté serveur
+      const result = await bulkSave("employee-expenses", {
+        upserts: rowsToSave.map((row) => ({
+          date: convertDateToISO(row.date),
           employee: currentEmployee.id,
           somme_remise: row.somme_remise ?? 0,
           nom_depense: row.nom_depense ?? "",
@@ -539,45 +538,16 @@ export default function SuiviEmployes() {
           prix: row.prix ?? null,
           somme_depense: row.somme_depense ?? 0,
           notes: "",
-        };
-
-        const response = await fetch(getApiUrl("employee-expenses/"), {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify(payload),
-        });
-
-        if (!response.ok) {
-          let errorMessage = "Erreur lors de la Enregistrement";
-          try {
-            const errorData = await response.json();
-            if (errorData.detail) {
-              errorMessage = errorData.detail;
-            } else if (errorData.non_field_errors) {
-              errorMessage = Array.isArray(errorData.non_field_errors) 
-                ? errorData.non_field_errors.join(", ")
-                : errorData.non_field_errors;
-            } else if (typeof errorData === 'object') {
-              const errorMessages = Object.entries(errorData).map(([key, value]) => {
-                if (Array.isArray(value)) {
-                  return `${key}: ${value.join(", ")}`;
-                }
-                return `${key}: ${value}`;
-              });
-              errorMessage = errorMessages.join("\n");
-            }
-          } catch (e) {
-            errorMessage = `Erreur ${response.status}: ${response.statusText}`;
-          }
-          throw new Error(errorMessage);
-        }
-
-        return response.json();
+        })),
       });
 
-      await Promise.all(savePromises);
+      if (result.errors.length > 0) {
+        throw new Error(
+          result.errors
+            .map((error) => `Ligne ${(error.index ?? 0) + 1}: ${formatBulkError(error)}`)
+            .join("\n")
+        );
+      }
 
       toast({
         title: "Succès !",
@@ -947,6 +917,9 @@ export default function SuiviEmployes() {
             icon={Users}
             action={
               <div className="flex gap-2">
+                {currentEmployee && (
+                  <ServerExportButtons ledger="employes" filters={{ employee: currentEmployee.id }} />
+                )}
                 {currentEmployee && (
                   <Button
                     onClick={() => {
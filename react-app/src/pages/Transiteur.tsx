@@ -18,6 +18,7 @@ import { useNavigate } from "react-router-dom";
 import { useAuth } from "@/contexts/AuthContext";
 import { useToast } from "@/hooks/use-toast";
 import { getApiUrl } from "@/config/api";
+import { bulkSave, formatBulkError } from "@/lib/bulkSave";
 
 interface TransiteurRow {
   id: number;
@@ -158,131 +159,46 @@ export default function Transiteur() {
       });
       const existingRows = rows.filter((row) => savedIds.has(row.id));
 
-      // Sauvegarder les nouvelles lignes (POST)
-      for (const row of newRows) {
-          try {
-            const today = getTodayDate();
-            const dateToUse = row.date || today;
-            const [day, month, year] = dateToUse.split("/");
-            const isoDate = `${year}-${month}-${day}`;
-
-            const response = await fetch(getApiUrl("transiteur/"), {
-              method: "POST",
-              headers: {
-                "Content-Type": "application/json",
-                ...(token ? { Authorization: `Bearer ${token}` } : {}),
-              },
-              body: JSON.stringify({
-                date: isoDate,
-                nom_produit: row.nom_produit || "",
-                numero_camion: row.numero_camion || "",
-                numero_chauffeur: row.numero_chauffeur || "",
-                ville_depart: row.ville_depart || "",
-                ville_arrivant: row.ville_arrivant || "",
-                depenses: row.depenses !== null && row.depenses !== undefined ? row.depenses : null,
-                argent_donne: row.argent_donne !== null && row.argent_donne !== undefined ? row.argent_donne : null,
-              }),
-            });
-
-            if (!response.ok) {
-              let errorMessage = `Erreur lors de l'enregistrement de la ligne`;
-              try {
-                const errorData = await response.json();
-                if (errorData.non_field_errors) {
-                  errorMessage = Array.isArray(errorData.non_field_errors)
-                    ? errorData.non_field_errors.join(", ")
-                    : errorData.non_field_errors;
-                } else if (errorData.detail) {
-                  errorMessage = errorData.detail;
-                } else if (errorData.message) {
-                  errorMessage = errorData.message;
-                } else {
-                  const fieldErrors = Object.entries(errorData)
-                    .map(([key, value]) => `${key}: ${Array.isArray(value) ? value[0] : value}`)
-                    .join(", ");
-                  if (fieldErrors) {
-                    errorMessage = fieldErrors;
-                  }
-                }
-              } catch (e) {
-                errorMessage = `Erreur ${response.status}: ${response.statusText}`;
-              }
-              errors.push(errorMessage);
-            }
-          } catch (error: any) {
-            errors.push(`Erreur pour la ligne: ${error.message}`);
-          }
-        }
-
-      // Mettre à jour les lignes existantes (PUT)
-      for (const row of existingRows) {
-          try {
-            const today = getTodayDate();
-            const dateToUse = row.date || today;
-            const [day, month, year] = dateToUse.split("/");
-            const isoDate = `${year}-${month}-${day}`;
-
-            const response = await fetch(getApiUrl(`transiteur/${row.id}/`), {
-              method: "PUT",
-              headers: {
-                "Content-Type": "application/json",
-                ...(token ? { Authorization: `Bearer ${token}` } : {}),
-              },
-              body: JSON.stringify({
-                date: isoDate,
-                nom_produit: row.nom_produit || "",
-                numero_camion: row.numero_camion || "",
-                numero_chauffeur: row.numero_chauffeur || "",
-                ville_depart: row.ville_depart || "",
-                ville_arrivant: row.ville_arrivant || "",
-                depenses: row.depenses !== null && row.depenses !== undefined ? row.depenses : null,
-                argent_donne: row.argent_donne !== null && row.argent_donne !== undefined ? row.argent_donne : null,
-              }),
-            });
-
-            if (response.status === 404) {
-              const postResponse = await fetch(getApiUrl("transiteur/"), {
-                method: "POST",
-                headers: {
-                  "Content-Type": "application/json",
-                  ...(token ? { Authorization: `Bearer ${token}` } : {}),
-                },
-                  body: JSON.stringify({
-                    date: isoDate,
-                    nom_produit: row.nom_produit || "",
-                    numero_camion: row.numero_camion || "",
-                    numero_chauffeur: row.numero_chauffeur || "",
-                    ville_depart: row.ville_depart || "",
-                    ville_arrivant: row.ville_arrivant || "",
-                    depenses: row.depenses !== null && row.depenses !== undefined ? row.depenses : null,
-                    argent_donne: row.argent_donne !== null && row.argent_donne !== undefined ? row.argent_donne : null,
-                  }),
-                });
-
-              if (!postResponse.ok) {
-                let errorMessage = `Erreur lors de la création de la ligne`;
-                try {
-                  const errorData = await postResponse.json();
-                  errorMessage = errorData.detail || errorData.message || errorMessage;
-                } catch {
-                  // ignore
-                }
-                errors.push(errorMessage);
-              }
-            } else if (!response.ok) {
-              let errorMessage = `Erreur lors de la mise à jour de la ligne`;
-              try {
-                const errorData = await response.json();
-                errorMessage = errorData.detail || errorData.message || errorMessage;
-              } catch {
-                // ignore
-              }
-              errors.push(errorMessage);
-            }
-          } catch (error: any) {
-            errors.push(`Erreur pour la ligne: ${error.message}`);
-          }
+      const toPayload = (row: TransiteurRow) => {
+        const dateToUse = row.date || getTodayDate();
+        const [day, month, year] = dateToUse.split("/");
+        return {
+          date: `${year}-${month}-${day}`,
+          nom_produit: row.nom_produit || "",
+          numero_camion: row.numero_camion || "",
+          numero_chauffeur: row.numero_chauffeur || "",
+          ville_depart: row.ville_depart || "",
+          ville_arrivant: row.ville_arrivant || "",
+          depenses: row.depenses !== null && row.depenses !== undefined ? row.depenses : null,
+          argent_donne: row.argent_donne !== null && row.argent_donne !== undefined ? row.argent_donne : null,
+        };
+      };
+
+      // Nouvelles lignes et modifications en une seule requête
+      try {
+        const result = await bulkSave("transiteur", {
+          upserts: [
+            ...newRows.map((row) => ({ ref: row.id, ...toPayload(row) })),
+            ...existingRows.map((row) => ({ id: row.id, ...toPayload(row) })),
+          ],
+        }, token);
+
+        // Lignes supprimées entre-temps côté serveur : les recréer
+        const missing = new Set(
+          result.errors.filter((error) => error.id !== null && "id" in error.errors).map((error) => error.id)
+        );
+        result.errors
+          .filter((error) => !missing.has(error.id))
+          .forEach((error) => errors.push(formatBulkError(error)));
+        if (missing.size > 0) {
+          const retry = await bulkSave("transiteur", {
+            upserts: existingRows.filter((row) => missing.has(row.id)).map(toPayload),
+          }, token);
+          retry.errors.forEach((error) => errors.push(formatBulkError(error)));
         }
+      } catch (error: any) {
+        errors.push(error.message);
+      }
 
       if (errors.length > 0) {
         toast({